@@ -0,0 +1,111 @@
+# ================================================
+# Benchmark: FileChatMessageHistory vs JSONLChatMessageHistory
+# ================================================
+"""
+Appends a long conversation one message at a time, the way
+ConversationBufferMemory does, and reports the total time, the cost of the
+last 1,000 appends, a fresh load from disk, and a read of `messages`.
+
+FileChatMessageHistory gets slower with every message, so it stops at
+--baseline-messages (a 10,000-message run takes it over 20 minutes).
+
+Then several processes append to one file at once, and the script counts how
+many messages survived.
+
+No API calls are made. Run from this folder:
+    python benchmark_chat_history.py --messages 10000 --baseline-messages 3000
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from langchain_community.chat_message_histories import FileChatMessageHistory
+from langchain_core.messages import AIMessage, HumanMessage
+
+from jsonl_chat_history import JSONLChatMessageHistory
+
+BACKENDS = {
+    "json file": lambda path: FileChatMessageHistory(path),
+    "jsonl": lambda path: JSONLChatMessageHistory(path),
+}
+
+
+def message(i):
+    text = f"message {i}: " + "some conversation text " * 4
+    return HumanMessage(content=text) if i % 2 == 0 else AIMessage(content=text)
+
+
+def run(name, path, count):
+    history = BACKENDS[name](path)
+    start = time.perf_counter()
+    last_start = start
+    for i in range(count):
+        if i == max(count - 1000, 0):
+            last_start = time.perf_counter()
+        history.add_message(message(i))
+    end = time.perf_counter()
+    if hasattr(history, "close"):
+        history.close()
+
+    load_start = time.perf_counter()
+    history = BACKENDS[name](path)
+    loaded = len(history.messages)  # FileChatMessageHistory parses on read; JSONL on open
+    load_s = time.perf_counter() - load_start
+    read_start = time.perf_counter()
+    history.messages
+    read_s = time.perf_counter() - read_start
+    if hasattr(history, "close"):
+        history.close()
+
+    print(f"  {name:<10} total {end - start:7.2f} s  last 1000 {(end - last_start) / min(count, 1000) * 1000:7.3f} ms/msg  "
+          f"load {load_s * 1000:7.1f} ms  read {read_s * 1000:6.2f} ms  "
+          f"{os.path.getsize(path) / 1e6:5.1f} MB  {loaded} messages")
+
+
+def _writer(name, path, worker, count):
+    history = BACKENDS[name](path)
+    try:
+        for i in range(count):
+            history.add_message(message(worker * count + i))
+    except ValueError:
+        raise SystemExit(1)  # read another writer's half-written file
+    if hasattr(history, "close"):
+        history.close()
+
+
+def concurrent(name, path, processes, count):
+    workers = [multiprocessing.Process(target=_writer, args=(name, path, w, count)) for w in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    crashed = sum(worker.exitcode != 0 for worker in workers)
+    try:
+        survived = len(BACKENDS[name](path).messages)
+    except ValueError:
+        survived = "unreadable"
+    print(f"  {name:<10} {processes} x {count} appends ➜ {survived} messages in the file, {crashed} writers crashed")
+
+
+def main(messages, baseline_messages, processes):
+    with tempfile.TemporaryDirectory() as folder:
+        print("Messages appended one at a time")
+        run("json file", os.path.join(folder, "messages.json"), min(messages, baseline_messages))
+        run("jsonl", os.path.join(folder, "short.jsonl"), min(messages, baseline_messages))
+        if messages > baseline_messages:
+            run("jsonl", os.path.join(folder, "messages.jsonl"), messages)
+
+        print(f"\n{processes} processes appending to one file")
+        concurrent("json file", os.path.join(folder, "shared.json"), processes, 250)
+        concurrent("jsonl", os.path.join(folder, "shared.jsonl"), processes, 250)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--baseline-messages", type=int, default=3_000)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+    main(args.messages, args.baseline_messages, args.processes)
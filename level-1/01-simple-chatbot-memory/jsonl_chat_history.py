@@ -0,0 +1,196 @@
+"""
+Append-only chat history: one JSON line per message.
+
+FileChatMessageHistory stores the conversation as one JSON array, so every new
+message rereads, re-parses and rewrites the whole file (quadratic over a long
+conversation), and two processes writing at once can lose or corrupt it.
+JSONLChatMessageHistory keeps the same BaseChatMessageHistory interface but:
+
+    - appends each message as one line, so a write costs the same at message
+      10,000 as at message 1
+    - fsyncs in batches (every fsync_every messages or fsync_interval seconds)
+      instead of after every line
+    - serves reads from an in-memory tail, catching up on lines other
+      processes appended since the last read
+    - holds an exclusive lock on <file>.lock while writing, so several
+      processes can share one history file
+    - compact() rewrites the file without corrupt lines, optionally keeping
+      only the newest messages
+"""
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class JSONLChatMessageHistory(BaseChatMessageHistory):
+    def __init__(
+        self,
+        file_path: str,
+        tail_size: Optional[int] = None,
+        fsync_every: int = 32,
+        fsync_interval: float = 1.0,
+    ):
+        """tail_size limits how many recent messages `messages` keeps in memory (None = all)."""
+        self.file_path = file_path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._tail: deque = deque(maxlen=tail_size)
+        self._lock_file = open(file_path + ".lock", "a+b")
+        self._file = None
+        self._offset = 0  # bytes of the file already parsed into the tail
+        self._torn = False  # the file ends mid-line (a writer crashed)
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        with self._locked():
+            self._sync()
+
+    # ----------------------------------------
+    # File handling
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is not None:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._lock_file.seek(0)
+            msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _reopen(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.file_path, "a+b")
+        self._tail.clear()
+        self._offset = 0
+        self._torn = False
+
+    def _sync(self):
+        """Parse lines appended since the last read (by this or another process). Call with the lock held."""
+        try:
+            replaced = self._file is None or os.stat(self.file_path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            replaced = True
+        if replaced or os.fstat(self._file.fileno()).st_size < self._offset:
+            self._reopen()  # compacted or cleared elsewhere: start over
+        self._file.seek(self._offset)
+        data = self._file.read()
+        if not data:
+            return
+        self._offset += len(data)
+        lines = data.split(b"\n")
+        # With the lock held nobody is mid-write, so an unterminated last line is from a crash
+        self._torn = lines[-1] != b""
+        self._tail.extend(self._parse(lines[:-1]))
+
+    @staticmethod
+    def _parse(lines: List[bytes]) -> List[BaseMessage]:
+        messages = []
+        for line in lines:
+            try:
+                messages.extend(messages_from_dict([json.loads(line)]))
+            except (ValueError, KeyError, TypeError):
+                continue  # corrupt line: skip it, compact() drops it for good
+        return messages
+
+    def _fsync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    # ----------------------------------------
+    # BaseChatMessageHistory
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        with self._locked():
+            self._sync()
+            return list(self._tail)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        data = b"".join(
+            json.dumps(message_to_dict(message), ensure_ascii=False).encode("utf-8") + b"\n"
+            for message in messages
+        )
+        with self._locked():
+            self._sync()
+            if self._torn:
+                data = b"\n" + data  # end the crashed writer's partial line first
+                self._torn = False
+            self._file.write(data)
+            self._file.flush()
+            self._offset += len(data)
+            self._tail.extend(messages)
+            self._unsynced += len(messages)
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._fsync()
+
+    def clear(self) -> None:
+        with self._locked():
+            self._sync()
+            self._file.truncate(0)
+            self._fsync()
+            self._reopen()
+
+    # ----------------------------------------
+    # Extras
+
+    def iter_all(self) -> Iterator[BaseMessage]:
+        """Every message in the file, read from disk (the tail may hold only the newest)."""
+        with open(self.file_path, "rb") as f:
+            for line in f:
+                yield from self._parse([line])
+
+    def compact(self, keep_last: Optional[int] = None) -> None:
+        """Rewrite the file without corrupt lines, keeping only the newest keep_last messages if given."""
+        with self._locked():
+            self._sync()
+            self._fsync()
+            kept = deque(self.iter_all(), maxlen=keep_last)
+            temp_path = self.file_path + ".compact"
+            with open(temp_path, "wb") as f:
+                for message in kept:
+                    f.write(json.dumps(message_to_dict(message), ensure_ascii=False).encode("utf-8") + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.file_path)  # atomic: readers see the old or the new file
+            self._reopen()
+            self._sync()
+
+    def flush(self) -> None:
+        """fsync anything written since the last batch."""
+        if self._unsynced:
+            with self._locked():
+                self._fsync()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+        self._lock_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
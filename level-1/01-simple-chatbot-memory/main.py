@@ -44,11 +44,12 @@ print("\n----------\n")
 # Import core components for creating a memory-enabled chain
 from langchain.chains import LLMChain  # Main abstraction that combines LLM, prompt, and memory into a single callable object
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, MessagesPlaceholder  # Used to structure the messages and memory into a reusable prompt format
-from langchain.memory import ConversationBufferMemory, FileChatMessageHistory  # Implements memory for the chat; uses a file-based history so that memory persists between runs
+from langchain.memory import ConversationBufferMemory  # Implements memory for the chat
+from jsonl_chat_history import JSONLChatMessageHistory  # Append-only file history so that memory persists between runs
 
 # Create a memory object to store conversation history
 memory = ConversationBufferMemory(
-    chat_memory=FileChatMessageHistory("messages.json"),  # File-based memory for persistence
+    chat_memory=JSONLChatMessageHistory("messages.jsonl"),  # One JSON line per message, appended
     memory_key="messages",
     return_messages=True
 )
@@ -104,9 +105,13 @@ print("\n----------\n")
    - Represents a message from the user to the chatbot.
    - Must be wrapped before sending to `chatbot.invoke()`.
 
-3. Memory (ConversationBufferMemory + FileChatMessageHistory)
+3. Memory (ConversationBufferMemory + JSONLChatMessageHistory)
    - Remembers past interactions.
-   - File-based memory (`messages.json`) allows persistence across sessions.
+   - File-based memory (`messages.jsonl`) allows persistence across sessions.
+   - LangChain's FileChatMessageHistory rewrites the whole file for every message;
+     JSONLChatMessageHistory (jsonl_chat_history.py) appends one line instead, so
+     long conversations stay fast and several processes can share the file.
+   - `compact(keep_last=N)` trims the file when it gets long.
 
 4. ChatPromptTemplate and MessagesPlaceholder
    - Used to build dynamic prompts.
@@ -0,0 +1,106 @@
+# ================================================
+# Benchmark: dict of ChatMessageHistory vs SessionStore
+# ================================================
+"""
+Creates 100,000 sessions with a short conversation each and reports the
+memory each store holds afterwards (Python allocations, via tracemalloc)
+and the time per session, including tracemalloc's overhead:
+
+  dict       the tutorial's {session_id: ChatMessageHistory()} (never evicts)
+  compact    SessionStore with room for every session (records only)
+  bounded    SessionStore capped at --max-sessions (LRU eviction)
+  spill      bounded, with evicted sessions spilled to SQLite, then a sample
+             of old sessions read back to check nothing was lost
+
+No API calls are made. Run from this folder:
+    python benchmark_session_store.py --sessions 100000 --max-sessions 10000
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.messages import AIMessage, HumanMessage
+
+from session_store import SessionStore
+
+
+def allocated_mb():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] / 1e6
+
+
+def conversation(session, turns):
+    for turn in range(turns):
+        yield HumanMessage(content=f"Session {session}, question {turn}: what is my favorite color?")
+        yield AIMessage(content=f"Your favorite color is color number {session % 97} (turn {turn}).")
+
+
+def fill(get_session_history, sessions, turns):
+    before = allocated_mb()
+    start = time.perf_counter()
+    for session in range(sessions):
+        history = get_session_history(str(session))
+        history.messages  # RunnableWithMessageHistory reads the history before each turn
+        history.add_messages(list(conversation(session, turns)))
+    elapsed = time.perf_counter() - start
+    return allocated_mb() - before, elapsed
+
+
+def report(name, memory, elapsed, sessions, live):
+    print(f"  {name:<8} {memory:8.1f} MB  {memory * 1e6 / max(live, 1):7.0f} B/session  "
+          f"{elapsed / sessions * 1e6:6.1f} µs/session  {live} sessions in memory")
+
+
+def main(sessions, turns, max_sessions):
+    tracemalloc.start()
+    print(f"{sessions} sessions x {turns * 2} messages")
+
+    store = {}
+
+    def dict_history(session_id):
+        if session_id not in store:
+            store[session_id] = ChatMessageHistory()
+        return store[session_id]
+
+    memory, elapsed = fill(dict_history, sessions, turns)
+    report("dict", memory, elapsed, sessions, len(store))
+    store.clear()
+
+    compact = SessionStore(max_sessions=sessions, ttl=None)
+    memory, elapsed = fill(compact.get_session_history, sessions, turns)
+    report("compact", memory, elapsed, sessions, len(compact))
+    del compact
+
+    bounded = SessionStore(max_sessions=max_sessions, ttl=None)
+    memory, elapsed = fill(bounded.get_session_history, sessions, turns)
+    report("bounded", memory, elapsed, sessions, len(bounded))
+    del bounded
+
+    with tempfile.TemporaryDirectory() as folder:
+        spill = SessionStore(max_sessions=max_sessions, ttl=None, spill_path=os.path.join(folder, "sessions.sqlite"))
+        memory, elapsed = fill(spill.get_session_history, sessions, turns)
+        report("spill", memory, elapsed, sessions, len(spill))
+        start = time.perf_counter()
+        sample = range(0, sessions - max_sessions, max(1, (sessions - max_sessions) // 1000))
+        intact = sum(
+            [message.content for message in spill.get_session_history(str(session)).messages]
+            == [message.content for message in conversation(session, turns)]
+            for session in sample
+        )
+        print(f"           reloaded {len(sample)} spilled sessions in "
+              f"{(time.perf_counter() - start) / max(len(sample), 1) * 1e6:.0f} µs each, {intact} intact; "
+              f"spill file {os.path.getsize(os.path.join(folder, 'sessions.sqlite')) / 1e6:.1f} MB")
+        spill.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--max-sessions", type=int, default=10_000)
+    args = parser.parse_args()
+    main(args.sessions, args.turns, args.max_sessions)
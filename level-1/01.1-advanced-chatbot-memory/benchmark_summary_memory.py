@@ -0,0 +1,100 @@
+# ================================================
+# Benchmark: prompt growth over a long conversation
+# ================================================
+"""
+Plays a 500-turn conversation through RunnableWithMessageHistory with three
+memory strategies and records how many tokens each turn's prompt holds:
+
+  full     the whole history every turn (chatbot_with_message_history)
+  last-N   limited_memory_of_messages, last 10 messages
+  summary  RollingSummaryMemory, 1,000-token budget, background summaries
+
+The chat model and the summarizer are fakes with a fixed latency, so the
+numbers show prompt size and any time a turn spent waiting for a summary,
+not real model quality. No API calls are made. Run from this folder:
+    python benchmark_summary_memory.py --turns 500 --chat-latency 0.2 --summary-latency 0.5
+"""
+import argparse
+import logging
+import random
+import time
+
+from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+from langchain_core.runnables.history import RunnableWithMessageHistory
+
+from summary_memory import RollingSummaryMemory, default_token_counter
+
+# langchain-core 0.1 logs a harmless "Parent run ... not found" for every history turn
+logging.getLogger("langchain_core.tracers.base").setLevel(logging.ERROR)
+
+WORDS = "blue scooter Amsterdam coffee weekend project deadline garden piano travel museum recipe".split()
+
+prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", "You are a helpful assistant. Answer all questions to the best of your ability."),
+        MessagesPlaceholder(variable_name="messages"),
+    ]
+)
+
+
+def fake_chatbot(count, latency, sizes):
+    def respond(prompt_value):
+        messages = prompt_value.to_messages()
+        sizes.append(sum(count(str(message.content)) + 4 for message in messages))
+        time.sleep(latency)
+        return AIMessage(content=" ".join(random.choices(WORDS, k=40)))
+
+    return RunnableLambda(respond)
+
+
+def run(name, build_chain, turns, count, chat_latency):
+    histories = {}
+    sizes = []
+    chain = build_chain(fake_chatbot(count, chat_latency, sizes))
+    with_history = RunnableWithMessageHistory(
+        chain,
+        lambda session_id: histories.setdefault(session_id, ChatMessageHistory()),
+        input_messages_key="messages",
+    )
+    config = {"configurable": {"session_id": "bench"}}
+    start = time.perf_counter()
+    for turn in range(turns):
+        question = f"Turn {turn}: " + " ".join(random.choices(WORDS, k=25))
+        with_history.invoke({"messages": [HumanMessage(content=question)]}, config=config)
+    elapsed = time.perf_counter() - start
+    marks = [1, 10, 100, 250, turns]
+    growth = "  ".join(f"t{mark}={sizes[mark - 1]:>6}" for mark in marks if mark <= turns)
+    print(f"  {name:<8} prompt tokens {growth}  max {max(sizes):>6}  total {sum(sizes):>9}  "
+          f"{elapsed / turns * 1000:6.1f} ms/turn")
+
+
+def main(turns, chat_latency, summary_latency, max_tokens):
+    random.seed(0)
+    count = default_token_counter()
+
+    def summarizer(prompt_value):
+        time.sleep(summary_latency)
+        return " ".join(random.choices(WORDS, k=90))
+
+    memory = RollingSummaryMemory(RunnableLambda(summarizer), max_tokens=max_tokens, token_counter=count)
+
+    print(f"{turns} turns, chat model {chat_latency * 1000:.0f} ms, summarizer {summary_latency * 1000:.0f} ms")
+    run("full", lambda chatbot: prompt | chatbot, turns, count, chat_latency)
+    run("last-N", lambda chatbot: RunnablePassthrough.assign(messages=lambda x: x["messages"][-10:]) | prompt | chatbot,
+        turns, count, chat_latency)
+    run("summary", lambda chatbot: memory.assign("messages") | prompt | chatbot, turns, count, chat_latency)
+    print(f"  summary stats: {memory.stats}")
+    memory.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--chat-latency", type=float, default=0.2)
+    parser.add_argument("--summary-latency", type=float, default=0.5)
+    parser.add_argument("--max-tokens", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.turns, args.chat_latency, args.summary_latency, args.max_tokens)
@@ -45,10 +45,11 @@ print("\n----------\n")
 # 💾 Add Memory to the ChatBot
 # --------------------
 
-# ChatMessageHistory is an in-memory message history store provided by LangChain Community.
-# It acts like a mini "notebook" that remembers previous messages in a chat session.
-# This is useful when you want your chatbot to recall what was said earlier.
-from langchain_community.chat_message_histories import ChatMessageHistory
+# SessionStore (session_store.py) keeps an in-memory message history per chat session.
+# Each history acts like a mini "notebook" that remembers previous messages in a chat session.
+# Unlike a plain dictionary of ChatMessageHistory objects, it forgets old and idle sessions,
+# so a long-running server doesn't slowly run out of memory.
+from session_store import SessionStore
 
 # BaseChatMessageHistory is an abstract base class for all message history implementations.
 # It defines the required structure and methods a memory class should have.
@@ -60,18 +61,17 @@ from langchain_core.chat_history import BaseChatMessageHistory
 # This is key for building chatbots that remember things!
 from langchain_core.runnables.history import RunnableWithMessageHistory
 
-# 1.Simple memory store as (a python dictonary) to hold session history
-chatbotMemory = {}
+# 1. Bounded memory store to hold session history:
+#    at most 10,000 sessions (least recently used go first), sessions idle for an hour
+#    are dropped, and each session keeps its last 100 messages.
+#    Pass spill_path="sessions.sqlite" to save evicted sessions to disk instead of forgetting them.
+chatbotMemory = SessionStore(max_sessions=10_000, ttl=3600, max_messages=100)
 
 # 2. Fetch or create a session's chat history
 # Define a function to retrieve or initialize chat history for a given session
 def get_session_history(session_id: str) -> BaseChatMessageHistory:
-    # Check if this session ID already exists in our memory dictionary
-    if session_id not in chatbotMemory:
-        # If it doesn't exist, create a new ChatMessageHistory instance for it
-        chatbotMemory[session_id] = ChatMessageHistory()
-    # Return the chat history associated with this session ID
-    return chatbotMemory[session_id]
+    # The store creates a new history the first time it sees a session ID
+    return chatbotMemory.get_session_history(session_id)
 
 # 3. Wrap chatbot with memory support
 chatbot_with_message_history = RunnableWithMessageHistory(
@@ -163,7 +163,9 @@ print(response.content)
 print("\n----------\n")
 
 # Show/Print the chatbot memory
-print(chatbotMemory)
+for session_id in ("001", "002"):
+    print(session_id, chatbotMemory[session_id].messages)
+print(chatbotMemory.stats)
 
 # --------------------
 # 🧠 Limited Memory Chain
@@ -243,6 +245,41 @@ print("\n----------\n")
 print(response.content)
 print("\n----------\n")
 
+# --------------------
+# 🧮 Token-Budget Memory with a Rolling Summary
+# --------------------
+
+# Full memory sends the whole history every turn (the prompt keeps growing), and
+# last-N memory forgets everything older. RollingSummaryMemory keeps the newest
+# messages that fit in a token budget and folds older ones into a running summary.
+# Summaries are written in a background thread, so they are usually ready before
+# the budget needs them.
+from summary_memory import RollingSummaryMemory
+
+summary_memory = RollingSummaryMemory(chatbot, max_tokens=1000)
+
+summaryMemoryChain = summary_memory.assign("messages") | prompt | chatbot
+
+chatbot_with_summary_memory = RunnableWithMessageHistory(
+    summaryMemoryChain,
+    get_session_history,
+    input_messages_key="messages",
+)
+
+response = chatbot_with_summary_memory.invoke(
+    {
+        "messages": [HumanMessage(content="what is my favorite city?")],
+    },
+    config=session1,
+)
+print("\n----------\n")
+print("what is my favorite city? (chatbot with a 1,000-token budget and a rolling summary)")
+print("\n----------\n")
+print(response.content)
+print("\n----------\n")
+print("Running summary for session1:", summary_memory.summary("001") or "(not needed yet)")
+summary_memory.close()  # stop the background summarizer threads
+
 
 # --------------------
 # 📚 BEGINNER NOTES (Put in .py as comments)
@@ -264,7 +301,10 @@ NOTES: LangChain Chatbot with Memory
    Without memory, the chatbot cannot recall anything from previous interactions. It treats each message in isolation.
 
 5. 💾 Adding Memory:
-   Using `RunnableWithMessageHistory` and `ChatMessageHistory`, we can persist chat history by session.
+   Using `RunnableWithMessageHistory` and `SessionStore`, we can keep chat history by session.
+   A plain dictionary would keep every session forever; `SessionStore` caps the number of sessions,
+   drops idle ones, caps messages per session, and stores messages compactly (see
+   benchmark_session_store.py: ~1.3 KB per session instead of ~5.6 KB).
 
 6. 🪪 Sessions:
    We simulate sessions using a `session_id` (like "001", "002"). Each session can remember its own conversation history.
@@ -275,7 +315,12 @@ NOTES: LangChain Chatbot with Memory
 8. 🧠 Limited Memory Chains:
    Sometimes we want the chatbot to remember only a few recent messages. We use a function to truncate the memory to the last N messages.
 
-9. 🧪 Comparing Behaviors:
+9. 🧮 Token-Budget Memory:
+   `RollingSummaryMemory` (summary_memory.py) counts tokens locally with tiktoken and keeps the newest
+   messages that fit in the budget, plus a summary of everything older. The summary is updated in the
+   background and cached per session, so prompt size stays flat no matter how long the chat gets.
+
+10. 🧪 Comparing Behaviors:
    We compare how the chatbot responds with full memory vs. limited memory to see the effect of chat history.
 
 This is a great starting point for understanding how LangChain handles chat, memory, and multi-session context!
@@ -0,0 +1,236 @@
+"""
+Token-budget memory with a rolling summary, for RunnableWithMessageHistory.
+
+Sending the whole history every turn makes each prompt longer than the last,
+and keeping the last N messages forgets everything before them. With
+RollingSummaryMemory the prompt holds:
+
+    [summary of the older conversation] + the newest messages that fit in max_tokens
+
+Tokens are counted locally with tiktoken (no API call). When the messages
+outside the newest keep_tokens add up to at least summarize_tokens, they are
+folded into the running summary by a background thread, so by the time the
+window actually needs them gone the summary is usually ready. A turn only
+waits for the summarizer if the history outgrew the budget before it
+finished. The running summary is cached per session.
+
+    memory = RollingSummaryMemory(summarizer_llm, max_tokens=1000)
+    chain = memory.assign("messages") | prompt | chatbot
+    RunnableWithMessageHistory(chain, get_session_history, input_messages_key="messages")
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import BaseMessage, SystemMessage, get_buffer_string
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableConfig, RunnableLambda, RunnablePassthrough
+
+SUMMARY_PROMPT = PromptTemplate.from_template(
+    """Progressively summarize the conversation, adding onto the previous summary and returning a new summary.
+Keep names, preferences and facts the user shared. Use at most {max_words} words.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:"""
+)
+
+
+def default_token_counter(model: str = "gpt-4-turbo") -> Callable[[str], int]:
+    """tiktoken's count for model, or ~4 characters per token if its encoding can't be loaded."""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.encoding_for_model(model)
+        return lambda text: len(encoding.encode(text))
+    except Exception as error:  # not installed, or the encoding file can't be downloaded
+        print(f"⚠️ tiktoken unavailable ({type(error).__name__}); estimating 4 characters per token")
+        return lambda text: (len(text) + 3) // 4
+
+
+class _SessionSummary:
+    __slots__ = ("summary", "anchor", "upto", "pending", "lock")
+
+    def __init__(self):
+        self.summary = ""
+        self.anchor: Tuple = ()  # (type, content) of the last messages folded into the summary
+        self.upto = 0  # where the anchor ended in the history at the time
+        self.pending: Optional[Future] = None
+        self.lock = threading.Lock()
+
+
+class RollingSummaryMemory:
+    def __init__(
+        self,
+        llm: BaseLanguageModel,
+        max_tokens: int = 1000,
+        keep_tokens: Optional[int] = None,
+        summarize_tokens: Optional[int] = None,
+        summary_words: int = 100,
+        token_counter: Optional[Callable[[str], int]] = None,
+        wait_timeout: float = 30.0,
+        max_sessions: int = 10_000,
+    ):
+        """
+        max_tokens        budget for summary + recent messages (the prompt's own system text comes on top)
+        keep_tokens       newest tokens never summarized (default max_tokens // 4)
+        summarize_tokens  summarize once this many older tokens have piled up (default max_tokens // 4)
+
+        Summary + keep_tokens + summarize_tokens should stay well under max_tokens: the gap is
+        how many turns the background summary has to finish before a turn must wait for it.
+        """
+        self.chain = SUMMARY_PROMPT | llm | StrOutputParser()
+        self.max_tokens = max_tokens
+        self.keep_tokens = keep_tokens or max_tokens // 4
+        self.summarize_tokens = summarize_tokens or max_tokens // 4
+        self.summary_words = summary_words
+        self.count = token_counter or default_token_counter()
+        self.wait_timeout = wait_timeout
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, _SessionSummary]" = OrderedDict()
+        self._token_cache: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="summary")
+        self.stats = {"turns": 0, "summaries": 0, "waits": 0, "dropped": 0}
+        self._stats_lock = threading.Lock()  # sessions and summarizer threads update stats concurrently
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[stat] += amount
+
+    def close(self, wait: bool = True):
+        """Stop the summarizer threads (after the summaries in flight if wait)."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    # ----------------------------------------
+    # Tokens
+
+    def message_tokens(self, message: BaseMessage) -> int:
+        key = (message.type, str(message.content))
+        if key not in self._token_cache:
+            if len(self._token_cache) > 100_000:
+                self._token_cache.clear()
+            self._token_cache[key] = self.count(key[1]) + 4  # role and separators
+        return self._token_cache[key]
+
+    def prompt_tokens(self, messages: Sequence[BaseMessage]) -> int:
+        return sum(self.message_tokens(message) for message in messages)
+
+    # ----------------------------------------
+    # Sessions
+
+    def _session(self, session_id: str) -> _SessionSummary:
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = self._sessions[session_id] = _SessionSummary()
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(session_id)
+            return state
+
+    def summary(self, session_id: str) -> str:
+        return self._session(session_id).summary
+
+    @staticmethod
+    def _fingerprint(messages: Sequence[BaseMessage]) -> Tuple:
+        return tuple((message.type, str(message.content)) for message in messages[-2:])
+
+    @classmethod
+    def _start(cls, messages: Sequence[BaseMessage], state: _SessionSummary) -> int:
+        """Index of the first message not yet in the summary."""
+        if not state.anchor:
+            return 0
+        if cls._fingerprint(messages[:state.upto]) == state.anchor:
+            return state.upto  # the usual case: history only grew since
+        width = len(state.anchor)
+        for end in range(min(state.upto, len(messages)), width - 1, -1):
+            if cls._fingerprint(messages[end - width:end]) == state.anchor:
+                return end  # oldest messages were dropped (e.g. a message cap)
+        return 0  # the anchor itself was dropped: all of the history is newer
+
+    def _collect(self, state: _SessionSummary, wait: bool = False):
+        future = state.pending
+        if future is None or (not future.done() and not wait):
+            return
+        try:
+            state.summary, state.anchor, state.upto = future.result(timeout=self.wait_timeout)
+        except Exception as error:
+            if not future.done():
+                # Timed out waiting: keep it for a later turn instead of recomputing it
+                print(f"⚠️ Summary not ready after {self.wait_timeout} s; using the current summary")
+                return
+            print(f"⚠️ Summary update failed: {error}")
+        state.pending = None
+
+    def _summarize(self, summary: str, messages: List[BaseMessage], upto: int) -> Tuple[str, Tuple, int]:
+        new_summary = self.chain.invoke({
+            "summary": summary or "(none yet)",
+            "new_lines": get_buffer_string(messages),
+            "max_words": self.summary_words,
+        })
+        self._count("summaries")
+        return new_summary.strip(), self._fingerprint(messages), upto
+
+    # ----------------------------------------
+    # Trimming
+
+    def trim(self, messages: Sequence[BaseMessage], session_id: str) -> List[BaseMessage]:
+        """Summary + the newest messages that fit max_tokens; schedules the next summary in the background."""
+        state = self._session(session_id)
+        with state.lock:
+            self._count("turns")
+            self._collect(state)
+            start = self._start(messages, state)
+            prefix = self._prefix(state)
+            if state.pending is not None and self.prompt_tokens(prefix + list(messages[start:])) > self.max_tokens:
+                self._count("waits")  # the summarizer fell behind: wait rather than overflow
+                self._collect(state, wait=True)
+                start = self._start(messages, state)
+                prefix = self._prefix(state)
+
+            window = list(messages[start:])
+            budget = self.max_tokens - self.prompt_tokens(prefix)
+            dropped = 0
+            while len(window) > 1 and self.prompt_tokens(window) > budget:
+                window.pop(0)  # still too long: drop the oldest unsummarized message
+                dropped += 1
+            if dropped:
+                self._count("dropped", dropped)
+
+            self._schedule(state, messages, start)
+            return prefix + window
+
+    @staticmethod
+    def _prefix(state: _SessionSummary) -> List[BaseMessage]:
+        if not state.summary:
+            return []
+        return [SystemMessage(content=f"Summary of the earlier conversation: {state.summary}")]
+
+    def _schedule(self, state: _SessionSummary, messages: Sequence[BaseMessage], start: int):
+        if state.pending is not None:
+            return
+        # Everything older than the newest keep_tokens is due for summarizing
+        split, recent = len(messages), 0
+        while split > start and recent + self.message_tokens(messages[split - 1]) <= self.keep_tokens:
+            split -= 1
+            recent += self.message_tokens(messages[split])
+        older = list(messages[start:split])
+        if older and self.prompt_tokens(older) >= self.summarize_tokens:
+            state.pending = self._executor.submit(self._summarize, state.summary, older, split)
+
+    def assign(self, key: str = "messages") -> RunnablePassthrough:
+        """Runnable that replaces input[key] with the trimmed messages for the configured session."""
+
+        def trim_input(inputs: dict, config: RunnableConfig) -> List[BaseMessage]:
+            session_id = config.get("configurable", {}).get("session_id", "default")
+            return self.trim(inputs[key], session_id)
+
+        return RunnablePassthrough.assign(**{key: RunnableLambda(trim_input)})
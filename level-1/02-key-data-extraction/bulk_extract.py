@@ -0,0 +1,407 @@
+# ================================================
+# Bulk extraction: millions of short texts through structured output
+# ================================================
+"""
+main.py extracts people from one text per LLM call. For a large file of
+short reviews that means one request (and one copy of the instructions and
+schema) per review. This runner:
+
+  - streams records from a JSONL or CSV file (nothing is loaded up front)
+  - packs several short texts into one call, numbered [0], [1], ...; the
+    model returns a List of results, each tagged with its text's index
+  - runs packs with bounded async concurrency and a requests-per-second limit
+  - writes results as they arrive: JSONL, or Parquet part files (needs pyarrow)
+  - checkpoints every record (ok or failed) so a rerun resumes where it
+    stopped and retries only the records that failed; a record counts as
+    done only once its row is on disk, and rows written just before a crash
+    are found in the output on resume, so none is lost or written twice
+  - retries failed calls with backoff; texts the model skipped in a pack are
+    re-packed and tried again
+
+Run from this folder:
+    python bulk_extract.py reviews.jsonl --output people.jsonl --pack-size 8 --concurrency 8 --rps 5
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+
+class Person(BaseModel):
+    """Information about a person."""
+
+    name: Optional[str] = Field(default=None, description="The name of the person")
+    lastname: Optional[str] = Field(default=None, description="The lastname of the person if known")
+    country: Optional[str] = Field(default=None, description="The country of the person if known")
+
+
+class IndexedData(BaseModel):
+    """Extracted data about people in one of the numbered texts."""
+
+    index: int = Field(description="The number in brackets before the text, e.g. 3 for [3]")
+    people: List[Person]
+
+
+class PackedData(BaseModel):
+    """Extracted data for every numbered text, one entry per text."""
+
+    results: List[IndexedData]
+
+
+SYSTEM_PROMPT = (
+    "You are an expert extraction algorithm. "
+    "Only extract relevant information from the text. "
+    "If you do not know the value of an attribute asked to extract, "
+    "return null for the attribute's value. "
+    "You will receive several texts, each starting with its number in brackets. "
+    "Return exactly one result per text, with that number as its index."
+)
+
+
+def build_chain(llm):
+    """prompt | llm with the packed schema; include_raw keeps the message for token usage."""
+    from langchain_core.prompts import ChatPromptTemplate
+
+    prompt = ChatPromptTemplate.from_messages([("system", SYSTEM_PROMPT), ("human", "{text}")])
+    return prompt | llm.with_structured_output(schema=PackedData, include_raw=True)
+
+
+def default_token_counter(model: str = "gpt-4o") -> Callable[[str], int]:
+    """tiktoken's count for model, or ~4 characters per token if its encoding can't be loaded."""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.encoding_for_model(model)
+        return lambda text: len(encoding.encode(text))
+    except Exception as error:  # not installed, or the encoding file can't be downloaded
+        print(f"⚠️ tiktoken unavailable ({type(error).__name__}); estimating 4 characters per token")
+        return lambda text: (len(text) + 3) // 4
+
+
+# ----------------------------------------
+# Input
+
+def read_records(path: str, text_field: str = "text", id_field: Optional[str] = "id") -> Iterator[Tuple[str, str]]:
+    """Yield (record id, text) from a JSONL or CSV file; the line number is the id if id_field is missing."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows: Iterable[dict] = csv.DictReader(f) if path.endswith(".csv") else (json.loads(line) for line in f if line.strip())
+        for number, row in enumerate(rows):
+            text = row.get(text_field)
+            if not text:
+                continue
+            record_id = row.get(id_field) if id_field else None
+            yield str(record_id if record_id not in (None, "") else number), text
+
+
+def pack_records(records: Iterable[Tuple[str, str]], pack_size: int, max_chars: int) -> Iterator[List[Tuple[str, str]]]:
+    """Group records into packs of up to pack_size texts and about max_chars characters."""
+    pack, chars = [], 0
+    for record in records:
+        if pack and (len(pack) >= pack_size or chars + len(record[1]) > max_chars):
+            yield pack
+            pack, chars = [], 0
+        pack.append(record)
+        chars += len(record[1])
+    if pack:
+        yield pack
+
+
+def format_pack(pack: List[Tuple[str, str]]) -> str:
+    return "\n\n".join(f"[{index}] {text}" for index, (_, text) in enumerate(pack))
+
+
+# ----------------------------------------
+# Output and checkpoint
+
+# Writers return the ids of the rows that reached disk; only those are checkpointed.
+# written_ids holds the ids already in the output when the writer was opened.
+
+class JSONLWriter:
+    def __init__(self, path: str):
+        self.written_ids = set()
+        if os.path.exists(path):
+            with open(path, "rb+") as f:
+                end = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # half-written last row: cut it off before appending
+                    self.written_ids.add(json.loads(line)["id"])
+                    end += len(line)
+                f.truncate(end)
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, rows: List[dict]) -> List[str]:
+        self.file.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+        self.file.flush()
+        return [row["id"] for row in rows]
+
+    def close(self) -> List[str]:
+        self.file.close()
+        return []
+
+
+class ParquetWriter:
+    """Writes <folder>/part-<run>-<n>.parquet files of up to rows_per_file rows."""
+
+    def __init__(self, folder: str, rows_per_file: int = 50_000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as error:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow (or write .jsonl)") from error
+        self.pa, self.pq = pyarrow, pyarrow.parquet
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.rows_per_file = rows_per_file
+        self.run = time.strftime("%Y%m%d-%H%M%S")
+        self.parts = 0
+        self.buffer: List[dict] = []
+        self.written_ids = set()
+        for name in os.listdir(folder):
+            if name.startswith("part-") and name.endswith(".parquet"):
+                table = self.pq.read_table(os.path.join(folder, name), columns=["id"])
+                self.written_ids.update(table.column("id").to_pylist())
+
+    def write(self, rows: List[dict]) -> List[str]:
+        # Rows are only buffered here: they are not durable until their part file is written
+        self.buffer.extend(rows)
+        if len(self.buffer) >= self.rows_per_file:
+            return self._flush()
+        return []
+
+    def _flush(self) -> List[str]:
+        if not self.buffer:
+            return []
+        table = self.pa.Table.from_pylist(self.buffer)
+        path = os.path.join(self.folder, f"part-{self.run}-{self.parts:05d}.parquet")
+        self.pq.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)  # a crash never leaves a half-written part file
+        ids = [row["id"] for row in self.buffer]
+        self.parts += 1
+        self.buffer = []
+        return ids
+
+    def close(self) -> List[str]:
+        return self._flush()
+
+
+class Checkpoint:
+    """Append-only log of finished record ids: {"id": ..., "ok": true|false}."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done, self.failed = set(), set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # half-written last line
+                    if entry["ok"]:
+                        self.done.add(entry["id"])
+                        self.failed.discard(entry["id"])
+                    else:
+                        self.failed.add(entry["id"])
+        self.file = open(path, "a", encoding="utf-8")
+
+    def record(self, ids: List[str], ok: bool, error: str = ""):
+        self.file.write("".join(json.dumps({"id": record_id, "ok": ok, "error": error}) + "\n" for record_id in ids))
+        self.file.flush()
+        (self.done.update if ok else self.failed.update)(ids)
+
+    def close(self):
+        self.file.close()
+
+
+# ----------------------------------------
+# Runner
+
+class RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class BulkExtractor:
+    def __init__(
+        self,
+        chain,
+        writer,
+        checkpoint: Checkpoint,
+        concurrency: int = 8,
+        requests_per_second: Optional[float] = None,
+        max_retries: int = 3,
+        token_counter: Optional[Callable[[str], int]] = None,
+    ):
+        self.chain = chain
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(requests_per_second, burst=concurrency) if requests_per_second else None
+        self.max_retries = max_retries
+        self.count = token_counter or default_token_counter()
+        self.overhead_tokens = self.count(SYSTEM_PROMPT) + self.count(json.dumps(PackedData.model_json_schema()))
+        self.stats = {"records": 0, "failed": 0, "calls": 0, "retried_calls": 0, "repacked": 0,
+                      "input_tokens": 0, "output_tokens": 0}
+
+    def _usage(self, raw, text: str, parsed: Optional[PackedData]) -> Tuple[int, int]:
+        usage = getattr(raw, "usage_metadata", None) or (getattr(raw, "response_metadata", None) or {}).get("token_usage")
+        if usage:
+            return usage.get("input_tokens", usage.get("prompt_tokens", 0)), usage.get("output_tokens", usage.get("completion_tokens", 0))
+        output = parsed.model_dump_json() if parsed is not None else ""
+        return self.overhead_tokens + self.count(text), self.count(output)
+
+    async def _call(self, pack: List[Tuple[str, str]]) -> Dict[int, IndexedData]:
+        text = format_pack(pack)
+        for attempt in range(self.max_retries + 1):
+            if self.limiter:
+                await self.limiter.acquire()
+            self.stats["calls"] += 1
+            try:
+                result = await self.chain.ainvoke({"text": text})
+                if result.get("parsing_error") or result.get("parsed") is None:
+                    raise ValueError(f"unparseable output: {result.get('parsing_error')}")
+                input_tokens, output_tokens = self._usage(result.get("raw"), text, result["parsed"])
+                self.stats["input_tokens"] += input_tokens
+                self.stats["output_tokens"] += output_tokens
+                return {item.index: item for item in result["parsed"].results if 0 <= item.index < len(pack)}
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                self.stats["retried_calls"] += 1
+                await asyncio.sleep(min(30.0, 0.5 * 2 ** attempt) * (0.5 + random.random()))  # backoff with jitter
+
+    async def _run_pack(self, pack: List[Tuple[str, str]], tries: int) -> List[Tuple[str, str]]:
+        """Extract one pack; returns the records the model skipped (to be re-packed)."""
+        try:
+            by_index = await self._call(pack)
+        except Exception as error:
+            self.checkpoint.record([record_id for record_id, _ in pack], ok=False, error=str(error)[:200])
+            self.stats["failed"] += len(pack)
+            return []
+        rows, ok_ids, skipped = [], [], []
+        for index, (record_id, text) in enumerate(pack):
+            if index in by_index:
+                rows.append({"id": record_id, "people": [person.model_dump() for person in by_index[index].people]})
+                ok_ids.append(record_id)
+            elif tries < self.max_retries:
+                skipped.append((record_id, text))
+            else:
+                self.checkpoint.record([record_id], ok=False, error="missing from model output")
+                self.stats["failed"] += 1
+        # Only rows already on disk are checkpointed; buffered ones are checkpointed when flushed
+        self.checkpoint.record(self.writer.write(rows), ok=True)
+        self.stats["records"] += len(ok_ids)
+        self.stats["repacked"] += len(skipped)
+        return skipped
+
+    async def run(self, records: Iterable[Tuple[str, str]], pack_size: int = 8, max_chars: int = 6000):
+        start = time.perf_counter()
+        recovered = self.writer.written_ids - self.checkpoint.done
+        if recovered:
+            # Written, but the run stopped before they were checkpointed: don't extract them twice
+            print(f"🔁 {len(recovered)} records found in the output but not in the checkpoint")
+            self.checkpoint.record(sorted(recovered), ok=True)
+        todo = ((record_id, text) for record_id, text in records if record_id not in self.checkpoint.done)
+        packs = pack_records(todo, pack_size, max_chars)
+        retry_queue: List[Tuple[Tuple[str, str], int]] = []
+        running = set()
+        while True:
+            # Keep `concurrency` packs in flight; skipped texts go back in before new ones
+            while len(running) < self.concurrency:
+                if len(retry_queue) >= pack_size or (retry_queue and packs is None):
+                    batch, retry_queue = retry_queue[:pack_size], retry_queue[pack_size:]
+                    pack, tries = [record for record, _ in batch], max(t for _, t in batch) + 1
+                elif packs is not None:
+                    pack, tries = next(packs, None), 0
+                    if pack is None:
+                        packs = None
+                        continue
+                else:
+                    break
+                running.add(asyncio.ensure_future(self._tagged(pack, tries)))
+            if not running:
+                break
+            finished, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                skipped, tries = task.result()
+                retry_queue.extend((record, tries) for record in skipped)
+        self.stats["seconds"] = time.perf_counter() - start
+        return self.stats
+
+    def close(self):
+        """Flush the writer, checkpoint the rows it flushed, and close both."""
+        self.checkpoint.record(self.writer.close(), ok=True)
+        self.checkpoint.close()
+
+    async def _tagged(self, pack, tries):
+        return await self._run_pack(pack, tries), tries
+
+    def report(self) -> str:
+        stats = self.stats
+        done = max(stats["records"], 1)
+        return (f"{stats['records']} records in {stats['seconds']:.1f} s ({stats['records'] / stats['seconds']:.1f} records/s), "
+                f"{stats['failed']} failed, {stats['calls']} calls ({stats['retried_calls']} retried, "
+                f"{stats['repacked']} records re-packed), "
+                f"{stats['input_tokens'] / done:.0f} input + {stats['output_tokens'] / done:.0f} output tokens/record")
+
+
+def open_writer(path: str):
+    return ParquetWriter(path) if path.endswith(".parquet") else JSONLWriter(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", help="JSONL or CSV file of texts")
+    parser.add_argument("--output", default="people.jsonl", help=".jsonl file or .parquet folder")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--pack-size", type=int, default=8)
+    parser.add_argument("--max-chars", type=int, default=6000, help="max characters of text per call")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=None, help="max requests per second")
+    parser.add_argument("--max-retries", type=int, default=3)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv, find_dotenv
+    from langchain_openai import ChatOpenAI
+
+    _ = load_dotenv(find_dotenv())
+    chain = build_chain(ChatOpenAI(model="gpt-4o-2024-08-06"))
+    checkpoint = Checkpoint(args.output.rstrip("/") + ".checkpoint.jsonl")
+    if checkpoint.done or checkpoint.failed:
+        print(f"🔁 Resuming: {len(checkpoint.done)} records done, {len(checkpoint.failed - checkpoint.done)} to retry")
+    writer = open_writer(args.output)
+    extractor = BulkExtractor(chain, writer, checkpoint, args.concurrency, args.rps, args.max_retries)
+    try:
+        asyncio.run(extractor.run(read_records(args.input, args.text_field, args.id_field), args.pack_size, args.max_chars))
+    finally:
+        extractor.close()
+    print("✅ " + extractor.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -118,5 +118,10 @@ print("\n----------\n")
 7. **Printing Results**
    - Extracted results are printed for clarity. Each block is separated to make outputs easy to read.
 
+8. **Going Bulk**
+   - One call per text repeats the instructions and schema for every record. For large JSONL/CSV files,
+     `bulk_extract.py` packs several numbered texts into one call (an indexed `List` schema),
+     runs calls concurrently with a rate limit, writes results as they arrive and can resume after a crash.
+
 This script is perfect if you're starting out with LangChain and want to learn how to do basic information extraction using OpenAI models.
 """
@@ -0,0 +1,143 @@
+# ================================================
+# Benchmark: tiered vs LLM-only classification
+# ================================================
+"""
+Classifies a synthetic corpus of English and Spanish political opinions
+(each passage generated with a known sentiment, tendency and language) with:
+
+  LLM, 1 per call     every passage in its own call (main.py, but concurrent)
+  LLM, packed         every passage, 10 per call
+  tiered              local tiers for language and sentiment, then 10 per call,
+                      asking the LLM only for the fields still open
+
+and reports passages/s, LLM calls, output tokens, and for each local tier how
+often it answered, how often its answer matched the passage's true label and
+how many output tokens it saved. Political tendency has no local tier, so
+every passage still reaches the LLM; about a third of the passages are
+written without lexicon words (sarcasm, vague references), so sentiment is
+left to the LLM for those too.
+
+The LLM is a fake that returns the true labels for the fields it is asked
+for, and sleeps for a fixed time per call plus a time per output token
+(estimated as 4 characters of JSON). No API calls are made. Run from this folder:
+    python benchmark_tiered_classifier.py --passages 20000 --latency 0.5 --baseline-passages 1000
+"""
+import argparse
+import random
+import re
+import time
+
+from langchain_core.runnables import RunnableLambda
+
+from tiered_classifier import LOCAL_TIERS, TieredClassifier, estimated_tokens
+
+SENTIMENT = {
+    ("english", "happy"): ["I'm so proud and hopeful about where we are heading.", "This is wonderful news, I love it.",
+                           "Great leadership, I'm confident and optimistic."],
+    ("english", "sad"): ["I'm heartbroken and worried about our future.", "What a disaster, I feel betrayed and hopeless.",
+                         "This is terrible, the worst failure in years."],
+    ("english", "neutral"): ["The debate is scheduled for Tuesday evening.", "Voters will choose a new governor in the fall."],
+    ("spanish", "happy"): ["Estoy feliz y muy optimista con el futuro.", "Es una noticia excelente, me encanta."],
+    ("spanish", "sad"): ["Estoy triste y preocupado por nuestra familia.", "Es un desastre, me siento traicionado."],
+    ("spanish", "neutral"): ["El debate será el martes por la noche.", "Los votantes elegirán un nuevo gobernador."],
+}
+SUBTLE_SENTIMENT = {
+    "english": ["Oh sure, another brilliant plan from the people who brought us the last one.", "Well, that went about as expected."],
+    "spanish": ["Claro, otro plan brillante de los mismos de siempre.", "Bueno, ya veremos qué pasa."],
+}
+POLITICS = {
+    ("english", "conservative"): ["We need border security, lower taxes and traditional values.", "Trump will make America great again."],
+    ("english", "liberal"): ["Climate change and healthcare reform must come first.", "Biden is fighting for social justice."],
+    ("english", "independent"): ["Neither party speaks for me, I vote third party.", "I'm an independent and both parties disappoint me."],
+    ("spanish", "conservative"): ["Necesitamos seguridad fronteriza y menos impuestos.", "Defiendo los valores tradicionales."],
+    ("spanish", "liberal"): ["El cambio climático y la justicia social son lo primero.", "Apoyo la reforma de salud."],
+    ("spanish", "independent"): ["Ningún partido me representa.", "Soy independiente, ambos partidos fallan."],
+}
+SUBTLE_POLITICS = {
+    "english": ["You know who I'm voting for.", "This administration has had its chance."],
+    "spanish": ["Ya saben por quién voy a votar.", "Este gobierno ya tuvo su oportunidad."],
+}
+
+
+def make_corpus(passages, subtle_share):
+    corpus = {}
+    while len(corpus) < passages:
+        language = random.choice(["english", "spanish"])
+        sentiment = random.choice(["happy", "sad", "neutral"])
+        tendency = random.choice(["conservative", "liberal", "independent"])
+        subtle = random.random() < subtle_share
+        parts = [random.choice(SUBTLE_SENTIMENT[language] if subtle and sentiment != "neutral" else SENTIMENT[language, sentiment]),
+                 random.choice(SUBTLE_POLITICS[language] if subtle else POLITICS[language, tendency])]
+        random.shuffle(parts)
+        text = " ".join(parts) + f" (#{len(corpus)})"
+        corpus[text] = {"sentiment": sentiment, "political_tendency": tendency, "language": language}
+    return corpus
+
+
+class FakeStructuredLLM:
+    """Stands in for ChatOpenAI(...).with_structured_output(packed_schema(fields))."""
+
+    def __init__(self, truth, latency, per_token):
+        self.truth = truth
+        self.latency = latency
+        self.per_token = per_token
+
+    def with_structured_output(self, schema):
+        item = schema.model_fields["results"].annotation.__args__[0]
+        fields = [field for field in item.model_fields if field != "index"]
+
+        def classify(prompt_value):
+            passages = re.findall(r"^\[(\d+)\] (.+)$", prompt_value.to_string(), re.MULTILINE)
+            results = [item(index=int(index), **{field: self.truth[text][field] for field in fields}) for index, text in passages]
+            time.sleep(self.latency + self.per_token * sum(estimated_tokens(result.model_dump()) for result in results))
+            return schema(results=results)
+
+        return RunnableLambda(classify)
+
+
+def run(label, classifier, texts, truth):
+    results = classifier.classify_many(texts)
+    correct = sum(result is not None and result.model_dump() == truth[text] for text, result in zip(texts, results))
+    stats = classifier.stats
+    print(f"  {label:<20} {stats['passages'] / stats['seconds']:8.0f} passages/s  {stats['llm_calls']:6} LLM calls  "
+          f"{stats['llm_passages'] / stats['passages']:5.0%} of passages to LLM  "
+          f"{stats['llm_tokens'] / stats['passages']:5.1f} output tokens/passage  {correct / len(texts):6.1%} correct")
+
+
+def main(passages, subtle_share, latency, per_token, concurrency, baseline_passages):
+    random.seed(0)
+    truth = make_corpus(passages, subtle_share)
+    texts = list(truth)
+    llm = FakeStructuredLLM(truth, latency, per_token)
+    print(f"{passages} passages ({subtle_share:.0%} without clear cues), LLM {latency * 1000:.0f} ms/call "
+          f"+ {per_token * 1000:.0f} ms/output token, {concurrency} concurrent calls")
+    sample = texts[:baseline_passages]
+    print(f"  (LLM-only rows run on the first {len(sample)} passages)")
+    run("LLM, 1 per call", TieredClassifier(llm, pack_size=1, max_concurrency=concurrency, local_tiers={}), sample, truth)
+    run("LLM, packed", TieredClassifier(llm, pack_size=10, max_concurrency=concurrency, local_tiers={}), sample, truth)
+    tiered = TieredClassifier(llm, pack_size=10, max_concurrency=concurrency)
+    run("tiered", tiered, texts, truth)
+
+    print("  local tiers (hit rate / precision when they answer / output tokens saved per passage):")
+    for field, tier in LOCAL_TIERS.items():
+        answers = [(tier(text), truth[text][field]) for text in texts]
+        hits = [(label, true) for label, true in answers if label is not None]
+        print(f"    {field:<20} {len(hits) / len(texts):5.0%}  {sum(label == true for label, true in hits) / max(len(hits), 1):6.1%}  "
+              f"{tiered.stats[f'tokens_saved_{field}'] / len(texts):5.1f}")
+    start = time.perf_counter()
+    for text in texts:
+        for tier in LOCAL_TIERS.values():
+            tier(text)
+    print(f"    all local tiers: {len(texts) / (time.perf_counter() - start):,.0f} passages/s on one core")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--passages", type=int, default=20000)
+    parser.add_argument("--subtle-share", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--per-token", type=float, default=0.01, help="seconds per output token")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--baseline-passages", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.passages, args.subtle_share, args.latency, args.per_token, args.concurrency, args.baseline_passages)
@@ -117,6 +117,19 @@ print(response)
 
 print("\n----------\n")
 
+# Step 14: Batch mode — local tiers for language and sentiment, packed LLM calls for the fields still open
+from tiered_classifier import TieredClassifier
+
+classifier = TieredClassifier(ChatOpenAI(temperature=0, model="gpt-4o-2024-08-06"), pack_size=10)
+results = classifier.classify_many([trump_follower, biden_follower])
+print("Tiered batch classification:")
+print("\n----------\n")
+for result in results:
+    print(result)
+print(classifier.report())
+
+print("\n----------\n")
+
 ######################################################
 #  Notes 
 ######################################################
@@ -141,6 +154,12 @@ print("\n----------\n")
 
 8. 📞 `.invoke({...})`: Executes the chain with a given input, letting the LLM respond with structured, schema-conforming output.
 
+9. 🪜 `TieredClassifier` (tiered_classifier.py): For many passages, fields a cheap local check can settle (language from
+   stopwords, strongly polar sentiment from a lexicon) are answered locally; political tendency is always left to the LLM,
+   since mentioning a politician doesn't tell which side the writer is on. Passages are sent to the LLM several per call
+   with `.batch(...)`, and the LLM is only asked for the fields still open, so every local answer is output the LLM
+   doesn't generate. `classifier.report()` shows how often each tier answered and roughly how many tokens it saved.
+
 This project is a simple but powerful example of building structured text analysis using LangChain + Pydantic v2 + OpenAI — perfect for automating tagging, classification, or even preparing inputs for downstream apps.
 """
 
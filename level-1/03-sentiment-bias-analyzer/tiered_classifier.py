@@ -0,0 +1,251 @@
+"""
+Tiered classification: answer what a local check can, send only the rest to the LLM.
+
+main.py sends every passage to GPT-4o, even for a field like
+`language: Literal["spanish", "english"]` that a stopword count settles.
+TieredClassifier fills each field of the Classification schema from the
+cheapest tier that is confident:
+
+    1. language            stopword / accent counts (English vs Spanish)
+    2. sentiment           a small lexicon scorer with negation; only strong scores count
+    3. LLM                 passages with any field still open, several per call,
+                           calls run with .batch(max_concurrency=...)
+
+The LLM is only asked for the fields still open: passages are grouped by
+their open fields, and each group gets a structured-output schema with just
+those fields, so every local answer is a field the LLM does not generate.
+political_tendency has no local tier: a keyword only says what a passage
+mentions, not which side the writer is on ("never voting for X again"), so
+every passage still reaches the LLM, and the local tiers save output tokens
+rather than calls. report() estimates how many.
+
+    classifier = TieredClassifier(ChatOpenAI(temperature=0, model="gpt-4o-2024-08-06"))
+    results = classifier.classify_many(passages)
+    print(classifier.report())
+"""
+import json
+import math
+import re
+import time
+from typing import Dict, List, Literal, Optional, Sequence, Tuple, Type
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from pydantic import BaseModel, Field, create_model
+
+
+class Classification(BaseModel):
+    sentiment: Literal["happy", "neutral", "sad"] = Field(description="The sentiment of the text")
+    political_tendency: Literal["conservative", "liberal", "independent"] = Field(
+        description="The political tendency of the user"
+    )
+    language: Literal["spanish", "english"] = Field(description="The language the text is written in")
+
+
+class IndexedClassification(Classification):
+    index: int = Field(description="The number in brackets before the passage, e.g. 3 for [3]")
+
+
+class PackedClassification(BaseModel):
+    results: List[IndexedClassification]
+
+
+def packed_schema(fields: Sequence[str]) -> Type[BaseModel]:
+    """PackedClassification with only the given Classification fields."""
+    item = create_model(
+        "IndexedClassification",
+        index=(int, IndexedClassification.model_fields["index"]),
+        **{field: (Classification.model_fields[field].annotation, Classification.model_fields[field]) for field in fields},
+    )
+    return create_model("PackedClassification", results=(List[item], ...))
+
+
+def estimated_tokens(values: Dict) -> int:
+    """Rough output tokens for these fields as JSON (about 4 characters per token)."""
+    return math.ceil(len(json.dumps(values)) / 4)
+
+
+packed_prompt = ChatPromptTemplate.from_template(
+    """
+Extract the desired information from each of the following numbered passages.
+
+Only extract the properties mentioned in the 'Classification' function.
+Return exactly one result per passage, with the passage's number as its index.
+
+Passages:
+{input}
+"""
+)
+
+WORD = re.compile(r"[a-záéíóúñü']+")
+
+# ----------------------------------------
+# Tier 1: language
+
+ENGLISH_WORDS = set("the and is are was were to of in that it for with this we our his their be have has not you my on at as but will so they what who".split())
+SPANISH_WORDS = set("el la los las de que y en un una es son por con para su sus al lo como más pero del este esta nuestro nuestra muy se nos ya hay también".split())
+SPANISH_CHARS = set("ñáéíóú¿¡")
+
+
+def detect_language(text: str, min_hits: int = 3, min_share: float = 0.8) -> Optional[str]:
+    """'english' or 'spanish' when the stopword counts clearly agree, else None."""
+    words = WORD.findall(text.lower())
+    english = sum(word in ENGLISH_WORDS for word in words)
+    spanish = sum(word in SPANISH_WORDS for word in words) + sum(char in SPANISH_CHARS for char in text.lower())
+    if english + spanish < min_hits:
+        return None
+    if english >= min_share * (english + spanish):
+        return "english"
+    if spanish >= min_share * (english + spanish):
+        return "spanish"
+    return None
+
+
+# ----------------------------------------
+# Tier 2: sentiment
+
+SENTIMENT_LEXICON = {
+    # english
+    "happy": 2, "great": 2, "love": 3, "wonderful": 3, "excellent": 3, "confident": 2, "hope": 1,
+    "hopeful": 2, "proud": 2, "strong": 1, "good": 1, "glad": 2, "thrilled": 3, "amazing": 3,
+    "progress": 1, "optimistic": 2, "best": 2, "vital": 1, "benefits": 1, "compassionate": 2,
+    "sad": -2, "terrible": -3, "awful": -3, "hate": -3, "angry": -2, "disappointed": -2,
+    "worried": -2, "fear": -2, "afraid": -2, "failed": -2, "failure": -2, "worst": -3, "crisis": -2,
+    "disaster": -3, "heartbroken": -3, "hopeless": -3, "betrayed": -3, "miserable": -3, "bad": -2,
+    # spanish
+    "feliz": 2, "orgulloso": 2, "excelente": 3, "maravilloso": 3, "esperanza": 1, "confío": 2,
+    "bueno": 1, "mejor": 2, "progreso": 1, "encanta": 3, "fuerte": 1, "optimista": 2,
+    "triste": -2, "odio": -3, "enojado": -2, "decepcionado": -2, "preocupado": -2,
+    "miedo": -2, "fracaso": -2, "peor": -3, "desastre": -3, "traicionado": -3, "malo": -2,
+}
+NEGATIONS = set("not no never nothing nobody isn't aren't wasn't don't doesn't didn't can't won't nunca ni nada nadie tampoco".split())
+
+
+def lexicon_sentiment(text: str, threshold: float = 0.6, min_hits: int = 2) -> Optional[str]:
+    """'happy' or 'sad' for clearly polar text, else None (neutral and mixed text is left to the LLM)."""
+    words = WORD.findall(text.lower())
+    total, hits, negated_until = 0, 0, -1
+    for position, word in enumerate(words):
+        if word in NEGATIONS or word.endswith("n't"):
+            negated_until = position + 3  # flips the next three words
+            continue
+        score = SENTIMENT_LEXICON.get(word)
+        if score:
+            total += -score if position <= negated_until else score
+            hits += 1
+    if hits < min_hits:
+        return None
+    compound = total / math.sqrt(total * total + 15)  # VADER's normalization to [-1, 1]
+    if compound >= threshold:
+        return "happy"
+    if compound <= -threshold:
+        return "sad"
+    return None
+
+
+LOCAL_TIERS = {"language": detect_language, "sentiment": lexicon_sentiment}
+
+
+# ----------------------------------------
+# Pipeline
+
+class TieredClassifier:
+    def __init__(self, llm, pack_size: int = 10, max_concurrency: int = 8, local_tiers: Optional[Dict] = None):
+        """llm is a chat model that supports with_structured_output; local_tiers maps field -> text -> label | None."""
+        self.llm = llm
+        self.chains = {}  # open fields -> chain that asks for just those
+        self.pack_size = pack_size
+        self.max_concurrency = max_concurrency
+        self.local_tiers = LOCAL_TIERS if local_tiers is None else local_tiers
+        self.stats = {"passages": 0, "llm_passages": 0, "llm_calls": 0, "llm_tokens": 0, "failed": 0, "seconds": 0.0}
+        self.stats.update({f"local_{field}": 0 for field in self.local_tiers})
+        self.stats.update({f"tokens_saved_{field}": 0 for field in self.local_tiers})
+
+    def _local(self, text: str) -> Dict[str, str]:
+        found = {}
+        for field, tier in self.local_tiers.items():
+            label = tier(text)
+            if label is not None:
+                found[field] = label
+                self.stats[f"local_{field}"] += 1
+                self.stats[f"tokens_saved_{field}"] += estimated_tokens({field: label})
+        return found
+
+    def _invoke(self, request: Dict, config: RunnableConfig) -> BaseModel:
+        return self.chains[request["fields"]].invoke({"input": request["input"]}, config)
+
+    def _llm(self, texts: Sequence[str], groups: Dict[Tuple[str, ...], List[int]], pack_size: int) -> Dict[int, BaseModel]:
+        """Classify texts with packed LLM calls, one schema per group of open fields.
+
+        groups maps open fields -> positions in texts; returns {position: result} for what came back.
+        """
+        packs = [
+            (fields, positions[start:start + pack_size])
+            for fields, positions in groups.items()
+            for start in range(0, len(positions), pack_size)
+        ]
+        for fields in groups:
+            if fields not in self.chains:
+                self.chains[fields] = packed_prompt | self.llm.with_structured_output(packed_schema(fields))
+        self.stats["llm_calls"] += len(packs)
+        requests = [
+            {"fields": fields, "input": "\n\n".join(f"[{index}] {texts[position]}" for index, position in enumerate(pack))}
+            for fields, pack in packs
+        ]
+        # One batch across all groups, so max_concurrency covers every call
+        outputs = RunnableLambda(self._invoke).batch(requests, config={"max_concurrency": self.max_concurrency},
+                                                     return_exceptions=True)
+        found = {}
+        for (_, pack), output in zip(packs, outputs):
+            if isinstance(output, Exception):
+                print(f"⚠️ LLM call failed: {output}")
+                continue
+            for item in output.results:
+                if 0 <= item.index < len(pack):
+                    found[pack[item.index]] = item
+                    self.stats["llm_tokens"] += estimated_tokens(item.model_dump())
+        return found
+
+    def classify_many(self, texts: Sequence[str]) -> List[Optional[Classification]]:
+        """One Classification per text (None if the LLM failed it twice)."""
+        start = time.perf_counter()
+        local = [self._local(text) for text in texts]
+        groups = {}
+        for position, fields in enumerate(local):
+            open_fields = tuple(field for field in Classification.model_fields if field not in fields)
+            if open_fields:
+                groups.setdefault(open_fields, []).append(position)
+        self.stats["passages"] += len(texts)
+        self.stats["llm_passages"] += sum(len(positions) for positions in groups.values())
+
+        answers = self._llm(texts, groups, self.pack_size)
+        missing = {fields: [p for p in positions if p not in answers] for fields, positions in groups.items()}
+        missing = {fields: positions for fields, positions in missing.items() if positions}
+        if missing:  # skipped in a pack or a failed call: one more try, one passage per call
+            answers.update(self._llm(texts, missing, 1))
+
+        results = []
+        for position, fields in enumerate(local):
+            if position in answers:
+                fields = {**answers[position].model_dump(exclude={"index"}), **fields}
+            if len(fields) == len(Classification.model_fields):
+                results.append(Classification(**fields))
+            else:
+                results.append(None)
+                self.stats["failed"] += 1
+        self.stats["seconds"] += time.perf_counter() - start
+        return results
+
+    def classify(self, text: str) -> Optional[Classification]:
+        return self.classify_many([text])[0]
+
+    def report(self) -> str:
+        stats = self.stats
+        passages = max(stats["passages"], 1)
+        local = ", ".join(
+            f"{field} {stats[f'local_{field}'] / passages:.0%} (~{stats[f'tokens_saved_{field}']:,} output tokens saved)"
+            for field in self.local_tiers
+        )
+        return (f"{stats['passages']} passages in {stats['seconds']:.1f} s ({stats['passages'] / max(stats['seconds'], 1e-9):.0f}/s); "
+                f"answered locally: {local}; LLM: {stats['llm_passages'] / passages:.0%} of passages "
+                f"in {stats['llm_calls']} calls, ~{stats['llm_tokens']:,} output tokens; {stats['failed']} failed")
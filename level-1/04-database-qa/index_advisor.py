@@ -0,0 +1,272 @@
+"""
+Index advisor driven by the query log.
+
+ReadOnlySQLite(..., query_log="data/query_log.jsonl") appends every executed
+statement and its time to a JSONL log. This script reads that log, groups the
+queries by shape (literals replaced with ?), and runs EXPLAIN QUERY PLAN on
+each. For queries that scan a whole table it proposes a covering index:
+
+    equality columns (city = ?)  ➜  GROUP BY / ORDER BY columns  ➜
+    one range column (diameter > ?)  ➜  the other columns the query reads
+
+so SQLite can seek straight to the matching rows and answer from the index
+without touching the table. Proposals are ranked by the time their queries
+took in the log.
+
+With --apply the indexes are created in a working copy of the database (the
+original is never modified) and the logged queries are replayed against both
+files for a before/after latency report.
+
+Run from the repository root, like main.py: both resolve data/ against the
+current folder, so the advisor reads the log main.py wrote.
+    python level-1/04-database-qa/index_advisor.py
+    python level-1/04-database-qa/index_advisor.py --apply data/street_tree_db.indexed.sqlite
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import statistics
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sql_executor import normalize_sql
+
+MAX_INDEX_COLUMNS = 6  # wider covering indexes cost more space than they save
+
+CLAUSE = re.compile(r"\b(select|from|where|group\s+by|having|order\s+by|limit)\b", re.IGNORECASE)
+EQUALITY = re.compile(r"^\(*\s*\"?(\w+)\"?\s*(?:==?|\bIS\b|\bIN\b)", re.IGNORECASE)
+RANGE = re.compile(r"^\(*\s*\"?(\w+)\"?\s*(?:<=?|>=?|\bBETWEEN\b|\bLIKE\b|\bGLOB\b)", re.IGNORECASE)
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?\"?(\w+)\"?(?: AS \w+)?$")
+
+
+@dataclass
+class IndexProposal:
+    table: str
+    columns: Tuple[str, ...]
+    queries: List[str] = field(default_factory=list)
+    seconds: float = 0.0  # logged time of the queries it would help
+
+    @property
+    def name(self) -> str:
+        return "idx_" + "_".join((self.table,) + self.columns)
+
+    @property
+    def create_sql(self) -> str:
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        return f'CREATE INDEX IF NOT EXISTS "{self.name}" ON "{self.table}" ({columns})'
+
+
+# ----------------------------------------
+# Query log
+
+def query_shape(sql: str) -> str:
+    """The query with literals replaced by ?, so city = 'Oakland' and city = 'Fresno' group together."""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", normalize_sql(sql))
+    return re.sub(r"(?<![\w.])\d+(?:\.\d+)?\b", "?", sql)
+
+
+def load_workload(log_path: str) -> Dict[str, dict]:
+    """Logged queries grouped by shape: {shape: {"count", "seconds", "examples": {sql: count}}}."""
+    workload: Dict[str, dict] = defaultdict(lambda: {"count": 0, "seconds": 0.0, "examples": defaultdict(int)})
+    with open(log_path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a half-written last line
+            shape = workload[query_shape(entry["sql"])]
+            shape["count"] += 1
+            shape["seconds"] += entry["seconds"]
+            shape["examples"][entry["sql"]] += 1
+    return dict(workload)
+
+
+# ----------------------------------------
+# Analysis
+
+def _clauses(sql: str) -> Optional[Dict[str, str]]:
+    """Split a single-table SELECT into its clauses; None for anything more complex."""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    if not sql.lower().startswith("select") or sql.lower().count("select") > 1:
+        return None  # not a query, or has subqueries
+    parts = CLAUSE.split(sql)
+    clauses = {}
+    for keyword, body in zip(parts[1::2], parts[2::2]):
+        clauses[re.sub(r"\s+", " ", keyword.lower())] = body.strip()
+    from_clause = clauses.get("from", "")
+    if not from_clause or "," in from_clause or re.search(r"\bjoin\b", from_clause, re.IGNORECASE):
+        return None
+    return clauses
+
+
+def _referenced(text: str, columns: Dict[str, str]) -> List[str]:
+    found = []
+    for token in re.findall(r"\"?(\w+)\"?", text):
+        column = columns.get(token.lower())
+        if column and column not in found:
+            found.append(column)
+    return found
+
+
+def propose_index(conn: sqlite3.Connection, sql: str) -> Optional[IndexProposal]:
+    """A covering index for sql if its plan scans a whole table, else None."""
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()]
+    scanned = [match.group(1) for match in map(FULL_SCAN.match, plan) if match]
+    clauses = _clauses(sql)
+    if not scanned or clauses is None:
+        return None
+    table = re.match(r"\"?(\w+)\"?", clauses["from"]).group(1)
+    if table not in scanned or table.lower().startswith("sqlite_"):
+        return None  # SQLite's own tables can't be indexed
+    columns = {row[1].lower(): row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+
+    equality, ranges = [], []
+    for predicate in re.split(r"\bAND\b", clauses.get("where", ""), flags=re.IGNORECASE):
+        for pattern, target in ((EQUALITY, equality), (RANGE, ranges)):
+            match = pattern.match(predicate.strip())
+            if match and match.group(1).lower() in columns:
+                column = columns[match.group(1).lower()]
+                if column not in equality + ranges:
+                    target.append(column)
+                break
+    if re.search(r"\bOR\b", clauses.get("where", ""), re.IGNORECASE):
+        equality, ranges = [], []  # a single index can't serve both sides of an OR
+    ordering = _referenced(clauses.get("group by", "") or clauses.get("order by", ""), columns)
+
+    key = equality + [column for column in ordering if column not in equality]
+    if ranges and not ordering:
+        key.append(ranges[0])
+    if not key:
+        return None  # nothing to seek or sort on
+
+    if re.search(r"(^|,)\s*\*", clauses["select"]):
+        covering = []  # SELECT * needs the table anyway
+    else:
+        read = _referenced(" ".join(clauses.get(name, "") for name in ("select", "where", "having", "order by")), columns)
+        covering = [column for column in read if column not in key]
+    if len(key) + len(covering) <= MAX_INDEX_COLUMNS:
+        key += covering
+    return IndexProposal(table=table, columns=tuple(key[:MAX_INDEX_COLUMNS]))
+
+
+def advise(db_path: str, workload: Dict[str, dict]) -> List[IndexProposal]:
+    """Proposals for the logged workload, most logged time first, without redundant prefixes."""
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    proposals: Dict[Tuple[str, Tuple[str, ...]], IndexProposal] = {}
+    for shape, stats in workload.items():
+        sql = max(stats["examples"], key=stats["examples"].get)
+        try:
+            proposal = propose_index(conn, sql)
+        except sqlite3.Error:
+            continue  # the log can contain SQL that no longer compiles
+        if proposal is None:
+            continue
+        proposal = proposals.setdefault((proposal.table, proposal.columns), proposal)
+        proposal.queries.append(shape)
+        proposal.seconds += stats["seconds"]
+    conn.close()
+
+    # An index that is a prefix of a wider one on the same table is redundant
+    kept = []
+    for proposal in sorted(proposals.values(), key=lambda p: len(p.columns), reverse=True):
+        wider = next((
+            other for other in kept
+            if other.table == proposal.table and other.columns[:len(proposal.columns)] == proposal.columns
+        ), None)
+        if wider is None:
+            kept.append(proposal)
+        else:
+            wider.queries += proposal.queries
+            wider.seconds += proposal.seconds
+    return sorted(kept, key=lambda p: p.seconds, reverse=True)
+
+
+# ----------------------------------------
+# Apply and replay
+
+def apply_indexes(db_path: str, working_copy: str, proposals: List[IndexProposal]):
+    """Copy db_path to working_copy and create the proposed indexes there."""
+    source = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    target = sqlite3.connect(working_copy)
+    source.backup(target)
+    source.close()
+    for proposal in proposals:
+        start = time.perf_counter()
+        try:
+            target.execute(proposal.create_sql)
+        except sqlite3.Error as error:
+            print(f"⚠️ Skipping {proposal.name}: {error}")
+            continue
+        print(f"🔨 {proposal.name} built in {time.perf_counter() - start:.2f} s")
+    target.execute("ANALYZE")  # lets the planner choose between the new indexes
+    target.commit()
+    target.close()
+
+
+def replay(db_path: str, queries: List[str], repeat: int) -> Dict[str, float]:
+    """Median seconds per query over repeat runs, reading every row, no result cache."""
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    timings = {}
+    for sql in queries:
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql).fetchall()
+            runs.append(time.perf_counter() - start)
+        timings[sql] = statistics.median(runs)
+    conn.close()
+    return timings
+
+
+def report(db_path: str, working_copy: str, workload: Dict[str, dict], repeat: int):
+    examples = {max(stats["examples"], key=stats["examples"].get): stats["count"] for stats in workload.values()}
+    before = replay(db_path, list(examples), repeat)
+    after = replay(working_copy, list(examples), repeat)
+    conn = sqlite3.connect(f"file:{os.path.abspath(working_copy)}?mode=ro", uri=True)
+
+    print(f"\n{'before':>10} {'after':>10} {'speedup':>8}  query / plan after")
+    for sql, count in sorted(examples.items(), key=lambda item: before[item[0]] * item[1], reverse=True):
+        plan = "; ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql))
+        print(f"{before[sql] * 1000:8.2f}ms {after[sql] * 1000:8.2f}ms {before[sql] / max(after[sql], 1e-9):7.1f}x  "
+              f"{sql[:90]}  (x{count})\n{'':31}{plan}")
+    conn.close()
+
+    total_before = sum(before[sql] * count for sql, count in examples.items())
+    total_after = sum(after[sql] * count for sql, count in examples.items())
+    print(f"\nReplayed workload ({sum(examples.values())} logged queries): "
+          f"{total_before:.3f} s ➜ {total_after:.3f} s ({total_before / max(total_after, 1e-9):.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="data/street_tree_db.sqlite")
+    parser.add_argument("--log", default="data/query_log.jsonl")
+    parser.add_argument("--apply", metavar="WORKING_COPY", help="create the indexes in this copy and replay the log")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workload = load_workload(args.log)
+    print(f"📒 {sum(stats['count'] for stats in workload.values())} logged queries, {len(workload)} distinct shapes")
+    proposals = advise(args.db, workload)
+    if not proposals:
+        print("✅ No full table scans worth indexing.")
+        return
+    for proposal in proposals:
+        print(f"\n💡 {proposal.create_sql};\n   helps {len(proposal.queries)} query shape(s), "
+              f"{proposal.seconds:.3f} s in the log")
+        for shape in proposal.queries[:3]:
+            print(f"     {shape[:100]}")
+
+    if args.apply:
+        if os.path.abspath(args.apply) == os.path.abspath(args.db):
+            parser.error("--apply must name a working copy, not the original database")
+        apply_indexes(args.db, args.apply, proposals)
+        report(args.db, args.apply, workload, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,7 @@ _ = load_dotenv(find_dotenv())
 openai_api_key = os.environ["OPENAI_API_KEY"]
 
 # LangChain imports
-from langchain_openai import ChatOpenAI
-from langchain_community.utilities import SQLDatabase
-from langchain_community.tools import QuerySQLDatabaseTool
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
@@ -16,10 +14,13 @@ from langchain_core.runnables import RunnablePassthrough
 # Initialize LLM
 llm = ChatOpenAI(model="gpt-4o-2024-08-06")
 
-# Connect to SQLite DB
+# Connect to SQLite DB (read-only; schema info is cached until the file changes)
+from sql_executor import ReadOnlySQLite
+
 sqlite_db_path = "data/street_tree_db.sqlite"
-db = SQLDatabase.from_uri(f"sqlite:///{sqlite_db_path}")
-schema = db.get_table_info()
+# Every executed query is logged with its time; index_advisor.py suggests indexes from the log
+db = ReadOnlySQLite(sqlite_db_path, row_limit=1000, timeout=5.0, query_log="data/query_log.jsonl")
+schema = db.table_info()
 
 # SQL generation prompt (STRICT)
 sql_prompt = PromptTemplate.from_template(
@@ -35,18 +36,30 @@ SQL:"""
 )
 
 write_query_chain = sql_prompt | llm | StrOutputParser()
-execute_query_tool = QuerySQLDatabaseTool(db=db)
 
 # Question to ask
 question = "List the species of trees that are present in San Francisco"
 
-# Generate SQL
-sql_query = write_query_chain.invoke({"question": question, "schema": schema})
-sql_query = sql_query.strip().strip("`").replace("```sql", "").replace("```", "").strip()
-print("\nGenerated SQL Query:\n", sql_query)
+# Question ➜ SQL cache (exact and similar questions skip the LLM; every query is checked with EXPLAIN first)
+from sql_cache import InvalidSQLError, SQLQueryCache
+
+sql_cache = SQLQueryCache("data/sql_cache.json", db, OpenAIEmbeddings())
 
-# Execute SQL
-query_result = execute_query_tool.invoke({"query": sql_query})
+# Generate SQL
+try:
+    sql_query, sql_source = sql_cache.get_sql(
+        question,
+        lambda q: write_query_chain.invoke({"question": q, "schema": schema}),
+    )
+except InvalidSQLError as error:
+    # No point asking the LLM to explain a query that can't run
+    print("\nGenerated SQL is invalid:\n", error)
+    print("\n" + sql_cache.report())
+    raise SystemExit(1)
+print(f"\nGenerated SQL Query ({sql_source}):\n", sql_query)
+
+# Execute SQL (capped at 1000 rows and 5 seconds; repeated queries come from cache)
+query_result = db.run_text(sql_query)
 print("\nRaw SQL Result:\n", query_result)
 
 # Final answer generation prompt (NO schema)
@@ -72,6 +85,7 @@ print("Final Answer:")
 print("\n----------\n")
 print(response)
 print("\n----------\n")
+print(sql_cache.report())
 
 
 """
@@ -83,8 +97,8 @@ We use a `.env` file to store our OpenAI API key so we don’t hardcode secrets
 🧠 ChatOpenAI
 This class is how LangChain connects to OpenAI’s GPT models. We specify which model we want to use (e.g., "gpt-4o").
 
-💾 SQLDatabase
-This LangChain utility allows us to connect to an SQLite database using its file path. The database schema is automatically read.
+💾 ReadOnlySQLite (sql_executor.py)
+Opens the SQLite file read-only and builds the schema description (tables plus a few sample rows) for the prompt, in the same format as LangChain's `SQLDatabase`. The description is cached next to the database and only rebuilt when the file changes.
 
 🧾 PromptTemplate
 We create a template that tells the LLM what kind of SQL query to generate. This gives the model a clear, consistent format to follow.
@@ -92,8 +106,14 @@ We create a template that tells the LLM what kind of SQL query to generate. This
 🔁 RunnablePassthrough and .assign()
 These tools help us build a chain of steps. We assign intermediate values like the generated SQL and its result before passing them further down the chain.
 
-🧪 QuerySQLDataBaseTool
-This tool takes SQL text and runs it against the connected database, returning the result (like rows from a table).
+🗂️ SQLQueryCache (sql_cache.py)
+Writing SQL is the slow, paid step, and many questions repeat. The cache reuses SQL for the exact same question, and for similar questions (compared by embeddings) it reuses the SQL with the new value filled in: "trees in Oakland" reuses the query written for "trees in San Francisco". Slot values are only taken from values that exist in the database. Every query, cached or new, is checked with `EXPLAIN QUERY PLAN` before it runs, so broken SQL stops here instead of costing a second LLM call. `sql_cache.report()` prints hit rates and average latency per path.
+
+🧪 Running the SQL
+`db.run_text()` runs the generated SQL and returns the rows as text, like LangChain's `QuerySQLDataBaseTool`. LLM-written SQL is untrusted, so the connection can't write, each query is capped in rows and time, and repeated queries are answered from a cache. `db.stream()` yields very large results in batches instead.
+
+📒 Query log and index_advisor.py
+The tree database ships without secondary indexes, so a question like "species in San Francisco" scans the whole table. Each executed query is appended to `data/query_log.jsonl` with its time. `python level-1/04-database-qa/index_advisor.py` (from the repository root) reads the log, finds full table scans with `EXPLAIN QUERY PLAN`, and proposes covering indexes. With `--apply <copy>` it builds them in a copy of the database and replays the logged queries against both files for a before/after report; point `sqlite_db_path` at the copy to use it.
 
 🧩 Chain Structure
 We break the problem into three steps:
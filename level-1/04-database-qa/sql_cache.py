@@ -0,0 +1,219 @@
+"""
+Question ➜ SQL cache, so repeated questions skip the SQL-writing LLM call.
+
+Lookups go through three steps:
+
+    1. exact match on the normalized question
+    2. embedding similarity against earlier questions, with literal values
+       masked out: "trees in Oakland" reuses the SQL written for "trees in
+       San Francisco", with 'Oakland' filled into the city slot
+    3. otherwise the LLM writes the SQL
+
+Slots are string literals in the SQL (city = 'San Francisco') whose value also
+appears in the question. A new question fills a slot with whichever value of
+that column it mentions, so only values that exist in the database are used.
+A similar question only reuses SQL when every slot is filled this way and its
+numbers match: SQL without slots is reused for exact matches only.
+
+Every SQL string, cached or freshly generated, is checked with EXPLAIN QUERY
+PLAN before it runs, so broken SQL fails fast instead of reaching the answer
+LLM. The cache and its hit/latency stats are saved to a JSON file.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from sql_executor import ReadOnlySQLite, normalize_sql
+
+MAX_SLOT_VALUES = 10_000  # columns with more distinct values are not used as slots
+
+# column = 'literal' (also ==, LIKE); group 1 is the column, group 2 the literal
+SLOT_PATTERN = re.compile(r"\"?(\w+)\"?\s*(?:==?|LIKE)\s*'((?:[^']|'')*)'", re.IGNORECASE)
+FENCED_SQL = re.compile(r"```(?:sql)?\s*(.*?)```", re.IGNORECASE | re.DOTALL)
+NUMBER = re.compile(r"(?<![\w.])\d+(?:\.\d+)?(?!\w)")
+
+
+class InvalidSQLError(ValueError):
+    pass
+
+
+def extract_sql(llm_output: str) -> str:
+    """Pull the SQL out of an LLM reply, with or without a ```sql fence."""
+    fenced = FENCED_SQL.search(llm_output)
+    sql = fenced.group(1) if fenced else llm_output
+    return sql.strip().strip("`").strip()
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", "", question.lower()).split())
+
+
+class SQLQueryCache:
+    def __init__(
+        self,
+        path: str,
+        db: ReadOnlySQLite,
+        embeddings: Embeddings,
+        similarity_threshold: float = 0.92,
+    ):
+        self.path = path
+        self.db = db
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self._domains: Dict[str, List[str]] = {}
+        self.schema_hash = hashlib.sha256(db.table_info().encode("utf-8")).hexdigest()
+        self.entries: List[dict] = []
+        self.stats = {"exact": 0, "similar": 0, "miss": 0, "invalid": 0, "seconds": {"exact": 0.0, "similar": 0.0, "miss": 0.0}}
+        self._load()
+
+    # ----------------------------------------
+    # Persistence
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.stats = saved.get("stats", self.stats)
+        if saved.get("schema_hash") == self.schema_hash:  # SQL written for an older schema is dropped
+            self.entries = saved.get("entries", [])
+
+    def save(self):
+        with open(self.path, "w") as f:
+            json.dump({"schema_hash": self.schema_hash, "entries": self.entries, "stats": self.stats}, f)
+
+    # ----------------------------------------
+    # Slots
+
+    def _column_values(self, column: str) -> List[str]:
+        """Distinct text values of column (across tables that have it), longest first."""
+        if column not in self._domains:
+            values = set()
+            tables = [row[0] for row in self.db.run("SELECT name FROM sqlite_master WHERE type = 'table'", log=False).rows]
+            for table in tables:
+                columns = [row[1] for row in self.db.run(f'PRAGMA table_info("{table}")', log=False).rows]
+                if column not in columns:
+                    continue
+                for rows in self.db.stream(f'SELECT DISTINCT "{column}" FROM "{table}" LIMIT {MAX_SLOT_VALUES + 1}'):
+                    values.update(str(value) for (value,) in rows if isinstance(value, str) and value.strip())
+            self._domains[column] = sorted(values, key=len, reverse=True) if len(values) <= MAX_SLOT_VALUES else []
+        return self._domains[column]
+
+    @staticmethod
+    def _mentions(question: str, value: str) -> bool:
+        return re.search(r"(?<!\w)" + re.escape(value) + r"(?!\w)", question, re.IGNORECASE) is not None
+
+    def _slots(self, question: str, sql: str) -> List[dict]:
+        # Literals the question itself mentions are the question's parameters
+        slots = []
+        for match in SLOT_PATTERN.finditer(sql):
+            column, value = match.group(1), match.group(2).replace("''", "'")
+            if self._mentions(question, value) and value in self._column_values(column):
+                slots.append({"column": column, "value": value})
+        return slots
+
+    def _mask(self, question: str, columns: List[str]) -> str:
+        for column in columns:
+            for value in self._column_values(column):
+                if self._mentions(question, value):
+                    question = re.sub(r"(?<!\w)" + re.escape(value) + r"(?!\w)", f"<{column}>", question, flags=re.IGNORECASE)
+        return question
+
+    def _fill(self, entry: dict, question: str) -> Optional[str]:
+        if not entry["slots"]:
+            return None  # nothing to substitute: only an exact match may reuse this SQL
+        columns = [slot["column"] for slot in entry["slots"]]
+        if sorted(NUMBER.findall(self._mask(question, columns))) != sorted(NUMBER.findall(self._mask(entry["question"], columns))):
+            return None  # a number outside the slots differs, and numbers are not slots
+        sql = entry["sql"]
+        for slot in entry["slots"]:
+            found = [value for value in self._column_values(slot["column"]) if self._mentions(question, value)]
+            if len(found) != 1:
+                return None  # the new question doesn't name exactly one value for this slot
+            old = "'" + slot["value"].replace("'", "''") + "'"
+            sql = sql.replace(old, "'" + found[0].replace("'", "''") + "'")
+        return sql
+
+    # ----------------------------------------
+    # Lookup
+
+    def _slot_columns(self) -> List[str]:
+        return sorted({slot["column"] for entry in self.entries for slot in entry["slots"]})
+
+    def lookup(self, question: str) -> Tuple[Optional[str], str]:
+        """Return (sql, "exact" | "similar") from the cache, or (None, "miss")."""
+        key = normalize_question(question)
+        for entry in self.entries:
+            if entry["key"] == key:
+                return entry["sql"], "exact"
+        if not self.entries:
+            return None, "miss"
+
+        vector = np.asarray(self.embeddings.embed_query(self._mask(question, self._slot_columns())), dtype=np.float32)
+        matrix = np.asarray([entry["vector"] for entry in self.entries], dtype=np.float32)
+        scores = matrix @ vector / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector) + 1e-12)
+        for index in np.argsort(-scores):
+            if scores[index] < self.similarity_threshold:
+                break
+            sql = self._fill(self.entries[index], question)
+            if sql is not None:
+                return sql, "similar"
+        return None, "miss"
+
+    def add(self, question: str, sql: str):
+        slots = self._slots(question, sql)
+        masked = self._mask(question, sorted({slot["column"] for slot in slots} | set(self._slot_columns())))
+        self.entries.append({
+            "key": normalize_question(question),
+            "question": question,
+            "sql": sql,
+            "slots": slots,
+            "vector": self.embeddings.embed_query(masked),
+        })
+
+    def validate(self, sql: str):
+        try:
+            self.db.explain(sql)
+        except (sqlite3.Error, TimeoutError) as error:
+            raise InvalidSQLError(f"{error}\nSQL: {sql}") from error
+
+    def get_sql(self, question: str, generate: Callable[[str], str]) -> Tuple[str, str]:
+        """SQL for question from the cache or from generate(question), validated either way.
+
+        Returns (sql, source) where source is "exact", "similar" or "miss".
+        Raises InvalidSQLError if the SQL doesn't compile against the database.
+        """
+        start = time.perf_counter()
+        sql, source = self.lookup(question)
+        if sql is None:
+            sql = normalize_sql(extract_sql(generate(question)))
+        try:
+            self.validate(sql)
+        except InvalidSQLError:
+            self.stats["invalid"] += 1
+            self.save()
+            raise
+        if source == "miss":
+            self.add(question, sql)
+        self.stats[source] += 1
+        self.stats["seconds"][source] += time.perf_counter() - start
+        self.save()
+        return sql, source
+
+    def report(self) -> str:
+        lookups = sum(self.stats[source] for source in ("exact", "similar", "miss"))
+        if not lookups:
+            return "No questions answered yet."
+        lines = [f"{lookups} questions, {len(self.entries)} cached queries, {self.stats['invalid']} rejected by EXPLAIN"]
+        for source in ("exact", "similar", "miss"):
+            count = self.stats[source]
+            average = self.stats["seconds"][source] / count * 1000 if count else 0.0
+            lines.append(f"  {source:<8} {count:5d} ({count / lookups:6.1%})  avg {average:8.1f} ms")
+        return "\n".join(lines)
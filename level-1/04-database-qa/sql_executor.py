@@ -0,0 +1,223 @@
+"""
+Read-only, cached SQL execution for the NL ➜ SQL pipeline.
+
+SQLDatabase reflects the whole schema and runs sample-row queries every time
+the script starts, and QuerySQLDatabaseTool runs whatever SQL the LLM wrote
+with no timeout, no row cap and no caching. ReadOnlySQLite replaces both for
+a local SQLite file:
+
+    - the table-info string (CREATE TABLE + 3 sample rows, same format as
+      SQLDatabase.get_table_info) is cached on disk and rebuilt only when the
+      database file's mtime or size changes
+    - connections are opened read-only (mode=ro, PRAGMA query_only) with
+      memory-mapped I/O, and reused per thread
+    - every statement gets a row limit and a timeout
+    - results are cached by normalized SQL (comments and whitespace
+      dropped) until the file changes; the SQL itself runs as written
+    - large results can be streamed in batches instead of built into one string
+    - executed statements and their timings can be appended to a JSONL query
+      log, which index_advisor.py reads to suggest indexes
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+SAMPLE_ROWS = 3
+SAMPLE_VALUE_CHARS = 100  # SQLDatabase truncates sample values the same way
+
+
+@dataclass(frozen=True)
+class QueryResult:
+    columns: Tuple[str, ...]
+    rows: Tuple[tuple, ...]
+    truncated: bool  # True when the row limit cut the result short
+
+    def to_text(self, max_chars: int = 20_000) -> str:
+        """Rows as text for an LLM prompt, cut off at max_chars."""
+        text = str([tuple(row) for row in self.rows])
+        if len(text) > max_chars:
+            text = text[:max_chars] + " ..."
+        if self.truncated:
+            text += f"\n(only the first {len(self.rows)} rows are shown)"
+        return text
+
+
+# String literals and quoted identifiers are kept as they are; comments become a space
+SQL_TOKENS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?(?:\*/|$))", re.DOTALL)
+
+
+def normalize_sql(sql: str) -> str:
+    """Cache key for sql: comments dropped, whitespace outside literals collapsed, no trailing semicolon."""
+    pieces, code = [], ""
+    for index, part in enumerate(SQL_TOKENS.split(sql)):
+        if index % 2 and not part.startswith(("--", "/*")):  # a quoted literal
+            pieces += [re.sub(r"\s+", " ", code), part]
+            code = ""
+        else:
+            code += " " if index % 2 else part
+    pieces.append(re.sub(r"\s+", " ", code))
+    return "".join(pieces).strip().rstrip(";").strip()
+
+
+class ReadOnlySQLite:
+    def __init__(
+        self,
+        path: str,
+        row_limit: int = 1000,
+        timeout: float = 5.0,
+        mmap_size: int = 256 * 1024 * 1024,
+        cache_size: int = 256,
+        query_log: Optional[str] = None,
+    ):
+        self.path = path
+        self.row_limit = row_limit
+        self.timeout = timeout
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.query_log = query_log
+        self._local = threading.local()
+        self._results: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ----------------------------------------
+    # Connections
+
+    def _version(self) -> Tuple[float, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime, stat.st_size
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            uri = "file:" + os.path.abspath(self.path) + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            # SQLite calls this every N VM steps; a true return aborts the running statement
+            conn.set_progress_handler(lambda: time.monotonic() > self._local.deadline, 10_000)
+            self._local.conn = conn
+            self._local.deadline = float("inf")
+        return conn
+
+    def _fetch(self, fetch, timeout: Optional[float]):
+        """Call fetch() (execute or fetchmany) with the statement timeout armed."""
+        timeout = self.timeout if timeout is None else timeout
+        self._local.deadline = time.monotonic() + timeout
+        try:
+            return fetch()
+        except sqlite3.OperationalError as error:
+            if str(error) == "interrupted":
+                raise TimeoutError(f"SQL statement took longer than {timeout} s") from error
+            raise
+        finally:
+            self._local.deadline = float("inf")
+
+    # ----------------------------------------
+    # Schema
+
+    def _build_table_info(self) -> str:
+        conn = self.connection()
+        tables = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        ).fetchall()
+        sections = []
+        for name, create_sql in tables:
+            cursor = conn.execute(f'SELECT * FROM "{name}" LIMIT {SAMPLE_ROWS}')
+            columns = [column[0] for column in cursor.description]
+            rows = [
+                "\t".join(str(value)[:SAMPLE_VALUE_CHARS] for value in row)
+                for row in cursor.fetchall()
+            ]
+            sample = "\n".join([f"{SAMPLE_ROWS} rows from {name} table:", "\t".join(columns), *rows])
+            sections.append(f"{create_sql.strip()}\n\n/*\n{sample}\n*/")
+        return "\n\n".join(sections)
+
+    def table_info(self) -> str:
+        """Schema and sample rows for the prompt, rebuilt only when the file changes."""
+        mtime, size = self._version()
+        cache_path = self.path + ".table_info.json"
+        try:
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if cached["mtime"] == mtime and cached["size"] == size:
+                return cached["table_info"]
+        except (OSError, ValueError, KeyError):
+            pass
+        table_info = self._build_table_info()
+        try:
+            with open(cache_path, "w") as f:
+                json.dump({"mtime": mtime, "size": size, "table_info": table_info}, f)
+        except OSError:
+            pass  # read-only location: just don't cache
+        return table_info
+
+    # ----------------------------------------
+    # Queries
+
+    def run(self, sql: str, timeout: Optional[float] = None, log: bool = True) -> QueryResult:
+        """Run one statement, returning at most row_limit rows (cached until the file changes).
+
+        log=False keeps internal lookups (schema, slot values) out of the query log.
+        """
+        key = (normalize_sql(sql), self._version())
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+        conn = self.connection()
+        start = time.perf_counter()
+        cursor = self._fetch(lambda: conn.execute(sql), timeout)
+        rows = self._fetch(lambda: cursor.fetchmany(self.row_limit + 1), timeout)
+        columns = tuple(column[0] for column in cursor.description or ())
+        cursor.close()
+        if log:
+            self._log(key[0], time.perf_counter() - start, len(rows))
+        result = QueryResult(
+            columns=columns,
+            rows=tuple(rows[:self.row_limit]),
+            truncated=len(rows) > self.row_limit,
+        )
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return result
+
+    def _log(self, sql: str, seconds: float, rows: int):
+        if not self.query_log:
+            return
+        entry = json.dumps({"sql": sql, "seconds": round(seconds, 6), "rows": rows, "at": time.time()})
+        with self._lock, open(self.query_log, "a") as f:
+            f.write(entry + "\n")
+
+    def explain(self, sql: str) -> List[tuple]:
+        """EXPLAIN QUERY PLAN rows; raises sqlite3.Error if the SQL doesn't compile."""
+        conn = self.connection()
+        return self._fetch(lambda: conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall(), None)
+
+    def run_text(self, sql: str, max_chars: int = 20_000) -> str:
+        """Like QuerySQLDatabaseTool: result text for the LLM, or the error message."""
+        try:
+            return self.run(sql).to_text(max_chars)
+        except (sqlite3.Error, TimeoutError) as error:
+            return f"Error: {error}"
+
+    def stream(self, sql: str, batch_size: int = 500, timeout: Optional[float] = None) -> Iterator[List[tuple]]:
+        """Yield rows in batches without a row limit or caching; the timeout applies per batch."""
+        conn = self.connection()
+        cursor = self._fetch(lambda: conn.execute(sql), timeout)
+        try:
+            while True:
+                rows = self._fetch(lambda: cursor.fetchmany(batch_size), timeout)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
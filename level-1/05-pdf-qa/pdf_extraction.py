@@ -0,0 +1,86 @@
+"""Parallel page-level PDF text extraction.
+
+PyPDFLoader extracts pages one after another on a single core. Here a PDF's
+pages are split into ranges, each range is extracted in a worker process, and
+pages come back as Documents in page order with PyPDFLoader's metadata
+({"source": ..., "page": ...}).
+
+Workers are always started with "spawn", never fork: forking a process that
+already runs threads (a uvicorn worker, Streamlit) can deadlock the child on a
+lock another thread held. Scripts that use this module must therefore keep
+their top-level work under `if __name__ == "__main__":`, since spawned workers
+re-import the main module.
+"""
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterator, List, Optional
+
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+PAGES_PER_SHARD = int(os.getenv("PDF_PAGES_PER_SHARD", "16"))
+MAX_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+
+
+@lru_cache()
+def get_executor() -> Executor:
+    # One pool per process, shared by every extraction
+    return ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+@lru_cache(maxsize=2)
+def _open(path: str, mtime: float) -> PdfReader:
+    # Opening re-reads the file and its page tree, so each process keeps the
+    # last readers around for the other shards of the same file
+    return PdfReader(path)
+
+
+def _extract_range(path: str, mtime: float, start: int, stop: int) -> List[Optional[str]]:
+    """Extract pages [start, stop); a page that fails to parse comes back as None."""
+    reader = _open(path, mtime)
+    texts = []
+    for number in range(start, stop):
+        try:
+            texts.append(reader.pages[number].extract_text())
+        except Exception as error:
+            print(f"⚠️ Skipping text of page {number} in {path}: {error}")
+            texts.append(None)
+    return texts
+
+
+def _to_documents(texts: List[Optional[str]], source: str, start: int) -> Iterator[Document]:
+    for offset, text in enumerate(texts):
+        metadata = {"source": source, "page": start + offset}
+        if text is None:
+            metadata["extraction_error"] = True
+        yield Document(page_content=text or "", metadata=metadata)
+
+
+def lazy_load_pdf(path: str, source: Optional[str] = None, pages_per_shard: int = PAGES_PER_SHARD) -> Iterator[Document]:
+    """Yield one Document per page, in order, as soon as its page range is extracted."""
+    source = source or path
+    mtime = os.path.getmtime(path)
+    num_pages = len(_open(path, mtime).pages)
+    shards = [(start, min(start + pages_per_shard, num_pages)) for start in range(0, num_pages, pages_per_shard)]
+
+    # Not worth a round trip to the pool for small documents
+    if len(shards) <= 1 or MAX_WORKERS <= 1:
+        for start, stop in shards:
+            yield from _to_documents(_extract_range(path, mtime, start, stop), source, start)
+        return
+
+    futures = [get_executor().submit(_extract_range, path, mtime, start, stop) for start, stop in shards]
+    try:
+        for (start, _), future in zip(shards, futures):
+            yield from _to_documents(future.result(), source, start)
+    finally:
+        # The caller may stop early; don't leave the remaining shards running
+        for future in futures:
+            future.cancel()
+
+
+def load_pdf(path: str, source: Optional[str] = None) -> List[Document]:
+    return list(lazy_load_pdf(path, source))
+
@@ -0,0 +1,164 @@
+# ================================================
+# Batched query embeddings for any vector store
+# ================================================
+"""
+Every similarity_search embeds its query with its own embed_query call, so
+retriever.batch([...]) or several users searching at once means one
+embeddings request per query. Two ways to share requests:
+
+- BatchedQueryEmbeddings wraps an Embeddings object. Queries that arrive
+  within max_wait seconds of each other (from threads or asyncio tasks) are
+  embedded together with a single embed_documents call. Give it to Chroma,
+  FAISS or NumpyVectorStore as their embedding and nothing else changes.
+
+- BatchingRetriever wraps a vector store. Its batch()/abatch() embed an
+  explicit list of queries in one request and then search by vector.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Set
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import RunnableConfig
+from langchain_core.vectorstores import VectorStore
+
+
+class BatchedQueryEmbeddings(Embeddings):
+    """Coalesces concurrent embed_query calls into one embed_documents request.
+
+    The first query to arrive opens a batch that waits up to max_wait seconds
+    (or until max_batch_size queries are queued), then embeds everything
+    queued so far and hands each caller its own vector.
+    """
+
+    def __init__(self, embeddings: Embeddings, max_wait: float = 0.01, max_batch_size: int = 256):
+        self.embeddings = embeddings
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self._condition = threading.Condition()
+        self._pending: List[tuple] = []
+        self._async_pending: Dict[asyncio.AbstractEventLoop, tuple] = {}
+        self._flushes: Set[asyncio.Task] = set()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        future = Future()
+        with self._condition:
+            self._pending.append((text, future))
+            leader = len(self._pending) == 1
+            if len(self._pending) >= self.max_batch_size:
+                self._condition.notify_all()
+        if leader:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._pending) >= self.max_batch_size, timeout=self.max_wait)
+                batch, self._pending = self._pending, []
+            try:
+                vectors = self.embeddings.embed_documents([text for text, _ in batch])
+            except Exception as error:
+                for _, waiting in batch:
+                    waiting.set_exception(error)
+            else:
+                for (_, waiting), vector in zip(batch, vectors):
+                    waiting.set_result(vector)
+        return future.result()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_pending:
+            # The batch is flushed by a task of its own rather than by the first
+            # caller, so cancelling any caller never strands the rest of the batch
+            self._async_pending[loop] = ([], asyncio.Event())
+            flush = loop.create_task(self._aflush(loop, *self._async_pending[loop]))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+        batch, full = self._async_pending[loop]
+        future = loop.create_future()
+        batch.append((text, future))
+        if len(batch) >= self.max_batch_size:
+            full.set()
+        return await future
+
+    async def _aflush(self, loop: asyncio.AbstractEventLoop, batch: List[tuple], full: asyncio.Event) -> None:
+        """Wait for company, then embed whatever has queued up."""
+        try:
+            try:
+                await asyncio.wait_for(full.wait(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+            del self._async_pending[loop]  # later queries start the next batch
+            live = [(text, waiting) for text, waiting in batch if not waiting.done()]  # skip cancelled callers
+            if not live:
+                return
+            try:
+                vectors = await self.embeddings.aembed_documents([text for text, _ in live])
+            except Exception as error:
+                for _, waiting in live:
+                    if not waiting.done():
+                        waiting.set_exception(error)
+            else:
+                for (_, waiting), vector in zip(live, vectors):
+                    if not waiting.done():
+                        waiting.set_result(vector)
+        finally:
+            # If the flush itself was cancelled (loop shutting down), nobody is left waiting on it
+            if loop in self._async_pending and self._async_pending[loop][0] is batch:
+                del self._async_pending[loop]
+            for _, waiting in batch:
+                waiting.cancel()  # no-op for callers that already have their vector
+
+
+class BatchingRetriever(BaseRetriever):
+    """Retriever over any VectorStore that embeds a batch of queries with one request."""
+
+    vectorstore: VectorStore
+    search_kwargs: dict = {}
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _search(self, vectors: List[List[float]]) -> List[List[Document]]:
+        return [self.vectorstore.similarity_search_by_vector(vector, **self.search_kwargs) for vector in vectors]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self._search([self.vectorstore.embeddings.embed_query(query)])[0]
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        vector = await self.vectorstore.embeddings.aembed_query(query)
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: self._search([vector])[0])
+
+    def batch(
+        self,
+        inputs: List[str],
+        config: Optional[RunnableConfig] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[List[Document]]:
+        # Per-call configs (callbacks, tags) keep the normal one-run-per-input path
+        if config is not None or not inputs:
+            return super().batch(inputs, config, return_exceptions=return_exceptions, **kwargs)
+        return self._search(self.vectorstore.embeddings.embed_documents(list(inputs)))
+
+    async def abatch(
+        self,
+        inputs: List[str],
+        config: Optional[RunnableConfig] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[List[Document]]:
+        if config is not None or not inputs:
+            return await super().abatch(inputs, config, return_exceptions=return_exceptions, **kwargs)
+        vectors = await self.vectorstore.embeddings.aembed_documents(list(inputs))
+        return await asyncio.get_running_loop().run_in_executor(None, self._search, vectors)
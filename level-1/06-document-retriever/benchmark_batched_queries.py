@@ -0,0 +1,92 @@
+# ================================================
+# Benchmark: batched query embeddings on Chroma and FAISS
+# ================================================
+"""
+Runs 1, 10 and 100 simultaneous searches against Chroma and FAISS with a fake
+embeddings API that takes a fixed time per request plus a little per text,
+like a remote API. Compares:
+
+  as_retriever  retriever.batch(queries) on the plain store (one embed per query)
+  threads       N threads calling similarity_search at once (one embed per query)
+  windowed      the same N threads, store built with BatchedQueryEmbeddings
+  explicit      BatchingRetriever(...).batch(queries) (one embed for all)
+
+No API calls are made. Run from this folder:
+    python benchmark_batched_queries.py --latency 0.08
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from batched_queries import BatchedQueryEmbeddings, BatchingRetriever
+
+
+class SlowFakeEmbeddings(Embeddings):
+    def __init__(self, latency: float, per_text: float = 0.0002, dimensions: int = 256):
+        self.latency = latency
+        self.per_text = per_text
+        self.dimensions = dimensions
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _vector(self, text):
+        return np.random.default_rng(abs(hash(text)) % 2**32).normal(size=self.dimensions).tolist()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency + self.per_text * len(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def measure(label, fake, run, count):
+    fake.calls = 0
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"    {label:<13} {elapsed * 1000:8.1f} ms  {count / elapsed:8.1f} queries/s  {fake.calls:4d} embed calls")
+
+
+def main(latency: float):
+    from langchain_chroma import Chroma
+    from langchain_community.vectorstores import FAISS
+
+    texts = [f"document number {i}" for i in range(200)]
+    stores = {
+        "Chroma": lambda embedding, name: Chroma.from_texts(texts, embedding, collection_name=name),
+        "FAISS": lambda embedding, name: FAISS.from_texts(texts, embedding),
+    }
+    for store_name, build in stores.items():
+        fake = SlowFakeEmbeddings(latency)
+        plain = build(fake, "plain")
+        windowed = build(BatchedQueryEmbeddings(fake), "windowed")
+        print(f"{store_name} ({latency * 1000:.0f} ms per embeddings request)")
+        for count in (1, 10, 100):
+            queries = [f"question {i}" for i in range(count)]
+            print(f"  {count} simultaneous queries")
+
+            def threaded(store):
+                with ThreadPoolExecutor(max_workers=count) as pool:
+                    list(pool.map(lambda query: store.similarity_search(query, k=1), queries))
+
+            measure("as_retriever", fake, lambda: plain.as_retriever(search_kwargs={"k": 1}).batch(queries), count)
+            measure("threads", fake, lambda: threaded(plain), count)
+            measure("windowed", fake, lambda: threaded(windowed), count)
+            measure("explicit", fake, lambda: BatchingRetriever(vectorstore=plain, search_kwargs={"k": 1}).batch(queries), count)
+        if store_name == "Chroma":
+            plain.delete_collection()
+            windowed.delete_collection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.08)
+    args = parser.parse_args()
+    main(args.latency)
@@ -0,0 +1,110 @@
+# ================================================
+# Benchmark: NumpyVectorStore vs Chroma
+# ================================================
+"""
+Builds both stores from the same random 1536-dimension vectors (the size of
+OpenAI's embeddings) and compares build time, memory, single-query latency
+and a batch of queries through retriever.batch(). No API calls are made:
+the fake embedder looks vectors up instead of computing them.
+
+Run from this folder:
+    python benchmark_vectorstore.py --sizes 500 2000 5000
+"""
+import argparse
+import gc
+import os
+import resource
+import statistics
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from numpy_vectorstore import NumpyVectorStore
+
+DIMENSIONS = 1536
+
+
+class LookupEmbeddings(Embeddings):
+    """Returns a fixed random vector per text, so both stores see identical data."""
+
+    def __init__(self, seed: int = 0):
+        self.rng = np.random.default_rng(seed)
+        self.vectors = {}
+
+    def _vector(self, text):
+        if text not in self.vectors:
+            self.vectors[text] = self.rng.normal(size=DIMENSIONS).astype(np.float32).tolist()
+        return self.vectors[text]
+
+    def embed_documents(self, texts):
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def rss_mb():
+    gc.collect()
+    try:
+        with open("/proc/self/statm") as f:  # Linux: current resident set
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:  # elsewhere only the peak is available (bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e6
+
+
+def run(name, build, texts, metadatas, queries, embeddings):
+    before = rss_mb()
+    start = time.perf_counter()
+    store = build(texts, embeddings, metadatas)
+    build_s = time.perf_counter() - start
+    memory = rss_mb() - before
+
+    latencies = []
+    for query in queries[:200]:
+        start = time.perf_counter()
+        store.similarity_search(query, k=4)
+        latencies.append(time.perf_counter() - start)
+
+    retriever = store.as_retriever(search_kwargs={"k": 4})
+    start = time.perf_counter()
+    retriever.batch(queries)
+    batch_s = time.perf_counter() - start
+
+    filtered_start = time.perf_counter()
+    for query in queries[:200]:
+        store.similarity_search(query, k=4, filter={"tenant": "t3"})
+    filtered_ms = (time.perf_counter() - filtered_start) / 200 * 1000
+
+    print(f"  {name:<7} build {build_s:6.2f} s  memory {memory:7.1f} MB  "
+          f"p50 {statistics.median(latencies) * 1000:6.2f} ms  filtered {filtered_ms:6.2f} ms  "
+          f"batch of {len(queries)} {batch_s * 1000:8.1f} ms")
+    return store
+
+
+def main(sizes, queries):
+    from langchain_chroma import Chroma
+
+    for size in sizes:
+        embeddings = LookupEmbeddings()
+        texts = [f"chunk {i}" for i in range(size)]
+        metadatas = [{"tenant": f"t{i % 10}"} for i in range(size)]
+        query_texts = [f"query {i}" for i in range(queries)]
+        embeddings.embed_documents(texts + query_texts)  # generate vectors up front
+
+        print(f"{size} chunks, {queries} queries")
+        run("numpy", lambda t, e, m: NumpyVectorStore.from_texts(t, e, metadatas=m), texts, metadatas, query_texts, embeddings)
+        store = run(
+            "chroma",
+            lambda t, e, m: Chroma.from_texts(t, e, metadatas=m, collection_name=f"bench-{size}"),
+            texts, metadatas, query_texts, embeddings,
+        )
+        store.delete_collection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+    main(args.sizes, args.queries)
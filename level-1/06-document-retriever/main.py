@@ -45,14 +45,18 @@ documents = [
 ]
 
 # ----------------------------------------
-# Store the documents in a vector database using Chroma and OpenAI embeddings
-from langchain_chroma import Chroma
+# Store the documents in an in-memory vector store using OpenAI embeddings
+# (a handful of documents doesn't need a database; Chroma.from_documents
+# takes the same arguments if you want one)
 from langchain_openai import OpenAIEmbeddings
+from numpy_vectorstore import NumpyVectorStore
+from batched_queries import BatchedQueryEmbeddings
 
-# Create a vector store by embedding the documents
-vectorstore = Chroma.from_documents(
+# Create a vector store by embedding the documents. Queries searched at the
+# same time (like the .batch() calls below) share one embeddings request.
+vectorstore = NumpyVectorStore.from_documents(
     documents,
-    embedding=OpenAIEmbeddings(),
+    embedding=BatchedQueryEmbeddings(OpenAIEmbeddings()),
 )
 
 # ----------------------------------------
@@ -81,7 +85,7 @@ retriever = vectorstore.as_retriever(
     search_kwargs={"k": 1},
 )
 
-# Batch search for "John" and "Robert"
+# Batch search for "John" and "Robert" (one embedding request, one matrix multiply)
 response = retriever.batch(["John", "Robert"])
 
 print("\n----------\n")
@@ -98,7 +102,7 @@ from langchain_core.runnables import RunnableLambda
 # Wrap the similarity_search function with RunnableLambda and bind top 1 result
 retriever = RunnableLambda(vectorstore.similarity_search).bind(k=1)
 
-# Batch search using the runnable retriever
+# Batch search using the runnable retriever (both queries are embedded together)
 response = retriever.batch(["John", "Robert"])
 
 print("\n----------\n")
@@ -154,19 +158,20 @@ print("\n----------\n")
    Each `Document` contains some text (`page_content`) and metadata (like a source label). These will be used in retrieval tasks.
 
 4. Embeddings and Vector Store:
-   `OpenAIEmbeddings` turns text into numerical vectors. `Chroma` stores these vectors and lets us search them efficiently based on similarity.
+   `OpenAIEmbeddings` turns text into numerical vectors. `NumpyVectorStore` (see `numpy_vectorstore.py`) keeps them in one NumPy matrix and searches them with a matrix multiply; for small corpora this is faster and lighter than a database like `Chroma`, which offers the same interface.
 
 5. Similarity Search:
    This is how we retrieve relevant documents. A search for "John" will return documents that talk about John Kennedy or similar topics.
 
 6. similarity_search_with_score():
-   This is like similarity_search but also shows how closely each result matches your query (as a score).
+   This is like similarity_search but also shows how closely each result matches your query (as a score). Here the score is cosine similarity, so higher means closer (Chroma reports a distance, where lower means closer).
 
 7. Retriever:
    Instead of manually calling similarity_search every time, we can turn our vectorstore into a `retriever`, which can be used in pipelines.
 
 8. RunnableLambda:
    This wraps a function (like similarity_search) to make it usable inside LangChain pipelines and lets you bind parameters.
+   `.batch()` runs the searches concurrently, and `BatchedQueryEmbeddings` (see `batched_queries.py`) collects their queries into a single embeddings request.
 
 9. Prompt Template:
    This helps you structure how questions are asked to the LLM. You can insert `{question}` and `{context}` dynamically.
@@ -0,0 +1,210 @@
+# ================================================
+# A small in-memory vector store built on NumPy
+# ================================================
+"""
+For a few hundred or a few thousand chunks, a full vector database is more
+machinery than the search needs. NumpyVectorStore keeps every embedding as a
+normalized row of one contiguous float32 matrix, so cosine similarity for a
+whole batch of queries is a single matrix multiply, and the top k rows come
+from np.argpartition instead of a full sort. Metadata filters are boolean
+masks over the rows.
+
+It implements LangChain's VectorStore interface, so as_retriever() works as
+usual; the retriever it returns also answers retriever.batch([...]) with one
+embedding request and one matrix multiply.
+"""
+import uuid
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import RunnableConfig
+from langchain_core.vectorstores import VectorStore, VectorStoreRetriever
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class NumpyVectorStore(VectorStore):
+    """In-process vector store; scores are cosine similarities (higher is closer)."""
+
+    def __init__(self, embedding: Embeddings):
+        self._embedding = embedding
+        self._matrix = np.empty((0, 0), dtype=np.float32)  # rows beyond _size are spare capacity
+        self._size = 0
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        self._masks: dict = {}  # (key, value) -> boolean mask, rebuilt after writes
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    # ----------------------------------------
+    # Writing
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = _normalize(np.asarray(self._embedding.embed_documents(texts), dtype=np.float32))
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+
+        needed = self._size + len(texts)
+        if self._matrix.shape[0] < needed:
+            # Grow geometrically so repeated adds stay amortized O(n)
+            grown = np.empty((max(needed, 2 * self._matrix.shape[0]), vectors.shape[1]), dtype=np.float32)
+            if self._size:
+                grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size:needed] = vectors
+        self._size = needed
+
+        self._ids += ids
+        self._texts += texts
+        self._metadatas += metadatas
+        self._masks.clear()
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if ids is None:
+            return False
+        drop = set(ids)
+        keep = np.array([doc_id not in drop for doc_id in self._ids], dtype=bool)
+        self._matrix = np.ascontiguousarray(self._matrix[:self._size][keep])
+        self._size = len(self._matrix)
+        self._ids = [value for value, kept in zip(self._ids, keep) if kept]
+        self._texts = [value for value, kept in zip(self._texts, keep) if kept]
+        self._metadatas = [value for value, kept in zip(self._metadatas, keep) if kept]
+        self._masks.clear()
+        return True
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        store = cls(embedding)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+    # ----------------------------------------
+    # Searching
+
+    def _mask(self, filter: Optional[dict]) -> Optional[np.ndarray]:
+        """Rows whose metadata equals every key/value in filter (None means all rows)."""
+        if not filter:
+            return None
+        mask = np.ones(self._size, dtype=bool)
+        for key, value in filter.items():
+            if (key, value) not in self._masks:
+                self._masks[(key, value)] = np.fromiter(
+                    (metadata.get(key) == value for metadata in self._metadatas), dtype=bool, count=self._size
+                )
+            mask &= self._masks[(key, value)]
+        return mask
+
+    def _top_k(self, scores: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        # scores: (queries, rows); returns (row, score) pairs best-first for each query
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return [[] for _ in scores]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        return [
+            [(int(row), float(score)) for row, score in zip(rows, row_scores) if score > -np.inf]
+            for rows, row_scores in zip(top, top_scores)
+        ]
+
+    def similarity_search_by_vectors_with_score(
+        self, vectors: List[List[float]], k: int = 4, filter: Optional[dict] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """Search for several query vectors at once with one matrix multiply."""
+        if self._size == 0:
+            return [[] for _ in vectors]
+        queries = _normalize(np.asarray(vectors, dtype=np.float32))
+        scores = queries @ self._matrix[:self._size].T
+        mask = self._mask(filter)
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+        return [
+            [
+                (Document(page_content=self._texts[row], metadata=dict(self._metadatas[row])), score)
+                for row, score in hits
+            ]
+            for hits in self._top_k(scores, k)
+        ]
+
+    def batch_similarity_search_with_score(
+        self, queries: List[str], k: int = 4, filter: Optional[dict] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """Embed all queries in one request and search them together."""
+        if not queries:
+            return []
+        vectors = self._embedding.embed_documents(list(queries))
+        return self.similarity_search_by_vectors_with_score(vectors, k=k, filter=filter)
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        vector = self._embedding.embed_query(query)
+        return self.similarity_search_by_vectors_with_score([vector], k=k, filter=filter)[0]
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        hits = self.similarity_search_by_vectors_with_score([embedding], k=k, filter=filter)[0]
+        return [document for document, _ in hits]
+
+    def similarity_search(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [document for document, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def _select_relevance_score_fn(self):
+        # Cosine similarity in [-1, 1] -> relevance in [0, 1]
+        return lambda score: (score + 1) / 2
+
+    def as_retriever(self, **kwargs: Any) -> VectorStoreRetriever:
+        tags = kwargs.pop("tags", None) or []
+        tags.extend(self._get_retriever_tags())
+        return NumpyRetriever(vectorstore=self, tags=tags, **kwargs)
+
+
+class NumpyRetriever(VectorStoreRetriever):
+    """VectorStoreRetriever whose batch() runs plain similarity searches together."""
+
+    def batch(
+        self,
+        inputs: List[str],
+        config: Optional[Union[RunnableConfig, List[RunnableConfig]]] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[List[Document]]:
+        # Other search types (mmr, score threshold) or per-call callbacks take the normal path
+        if self.search_type != "similarity" or config is not None or not inputs:
+            return super().batch(inputs, config, return_exceptions=return_exceptions, **kwargs)
+        search_kwargs = dict(self.search_kwargs)
+        results = self.vectorstore.batch_similarity_search_with_score(
+            list(inputs), k=search_kwargs.pop("k", 4), filter=search_kwargs.pop("filter", None)
+        )
+        return [[document for document, _ in hits] for hits in results]
@@ -0,0 +1,109 @@
+# ================================================
+# Benchmark: history-aware retrieval latency per turn type
+# ================================================
+"""
+Times one retrieval step for each kind of turn with:
+
+  langchain     create_history_aware_retriever
+  fast          create_fast_history_aware_retriever(speculative=False)
+  speculative   create_fast_history_aware_retriever(speculative=True)
+
+The rewrite LLM and the retriever are fakes that sleep for a fixed time
+(an LLM round trip and an embeddings call + search), so the numbers show
+which calls each turn makes. No API calls are made. Run from this folder:
+    python benchmark_history_retriever.py --llm-latency 0.8 --retrieval-latency 0.15
+"""
+import argparse
+import statistics
+import time
+from typing import List
+
+from langchain.chains import create_history_aware_retriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import RunnableLambda
+
+from fast_history_retriever import FastHistoryAwareRetriever
+
+HISTORY = [
+    HumanMessage(content="What is this article about?"),
+    AIMessage(content="It is Paul Graham's essay on why startups that make something people want tend to be good."),
+]
+# (turn, history, question, does the rewrite change the question?)
+TURNS = [
+    ("first turn", [], "What is this article about?", False),
+    ("standalone follow-up", HISTORY, "What does Paul Graham say about charities?", False),
+    ("referring follow-up", HISTORY, "Why does he think that?", True),
+    ("referring, rewrite unchanged", HISTORY, "Why are these startups good?", False),
+]
+
+prompt = ChatPromptTemplate.from_messages([
+    ("system", "Formulate a standalone question which can be understood without the chat history."),
+    MessagesPlaceholder("chat_history"),
+    ("human", "{input}"),
+])
+
+
+class SlowRetriever(BaseRetriever):
+    latency: float
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        time.sleep(self.latency)
+        return [Document(page_content=f"chunk about {query}")]
+
+
+def fake_llm(latency):
+    def rewrite(prompt_value):
+        time.sleep(latency)
+        question = prompt_value.to_messages()[-1].content
+        changed = next(changes for _, _, text, changes in TURNS if text == question)
+        return f"Why does Paul Graham think startups should make something people want? ({question})" if changed else question
+
+    return RunnableLambda(rewrite)
+
+
+def median_ms(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main(llm_latency, retrieval_latency, repeat):
+    llm = fake_llm(llm_latency)
+    retriever = SlowRetriever(latency=retrieval_latency)
+    builders = {
+        "langchain": lambda: create_history_aware_retriever(llm, retriever, prompt),
+        "fast": lambda: FastHistoryAwareRetriever(llm, retriever, prompt, speculative=False).as_runnable(),
+        "speculative": lambda: FastHistoryAwareRetriever(llm, retriever, prompt, speculative=True).as_runnable(),
+    }
+    print(f"rewrite LLM {llm_latency * 1000:.0f} ms, retrieval {retrieval_latency * 1000:.0f} ms, median of {repeat}")
+    print(f"  {'turn':<30}" + "".join(f"{name:>13}" for name in builders))
+    for label, history, question, _ in TURNS:
+        inputs = {"input": question, "chat_history": history}
+        # A fresh retriever per run so the rewrite cache doesn't answer
+        row = [median_ms(lambda: build().invoke(inputs), repeat) for build in builders.values()]
+        print(f"  {label:<30}" + "".join(f"{ms:10.0f} ms" for ms in row))
+
+    label, history, question, _ = TURNS[2]
+    inputs = {"input": question, "chat_history": history}
+    row = []
+    for build in builders.values():
+        chain = build()
+        chain.invoke(inputs)  # same history and question seen before
+        row.append(median_ms(lambda: chain.invoke(inputs), repeat))
+    print(f"  {'repeated referring follow-up':<30}" + "".join(f"{ms:10.0f} ms" for ms in row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--retrieval-latency", type=float, default=0.15)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.llm_latency, args.retrieval_latency, args.repeat)
@@ -0,0 +1,161 @@
+"""
+History-aware retriever that only pays for a question rewrite when it helps.
+
+create_history_aware_retriever asks the LLM to rewrite every follow-up
+question into a standalone one before retrieving, which adds a full LLM
+round trip to each turn. create_fast_history_aware_retriever is a drop-in
+replacement (same inputs: {"input", "chat_history"}; same output: documents)
+that:
+
+    - skips the rewrite when there is no history, or when the question has no
+      referring words ("it", "that", "what about ...", or "the paper" right
+      after a turn about a paper) and can be understood on its own; pass
+      needs_rewrite=lambda question, chat_history: True to always rewrite,
+      or a stricter check of your own
+    - caches rewrites by (digest of the chat history, question)
+    - with speculative=True, retrieves for the raw question while the
+      rewrite runs; if the rewrite comes back unchanged those documents are
+      used and the second retrieval is skipped
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence
+
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import BaseMessage, get_buffer_string
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import BasePromptTemplate
+from langchain_core.retrievers import RetrieverLike
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+# Words and phrases that point back into the conversation
+REFERRING = re.compile(
+    r"\b(it|its|it's|they|them|their|theirs|this|that|these|those|he|him|his|she|her|hers|"
+    r"former|latter|above|previous|previously|earlier|before|again|same|else|other|another|"
+    r"more|also|too|one|ones|there|then)\b"
+    r"|^\s*(and|but|or|so|what about|how about|why|why not|really|ok|okay)\b",
+    re.IGNORECASE,
+)
+# "the paper" refers back only if the last few messages mentioned a paper;
+# "the capital of France" with no capital in sight stands on its own
+DEFINITE = re.compile(r"\bthe\s+(\w+)", re.IGNORECASE)
+WORD = re.compile(r"\w+")
+RECENT_MESSAGES = 4
+MIN_STANDALONE_WORDS = 4  # shorter questions ("and why?") are almost always follow-ups
+
+
+def _stem(word: str) -> str:
+    word = word.lower()
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def needs_rewrite(question: str, chat_history: Sequence[BaseMessage] = ()) -> bool:
+    """Cheap check for whether a question depends on the conversation so far."""
+    if len(question.split()) < MIN_STANDALONE_WORDS or REFERRING.search(question) is not None:
+        return True
+    nouns = {_stem(noun) for noun in DEFINITE.findall(question)}
+    if not nouns:
+        return False
+    recent = get_buffer_string(list(chat_history)[-RECENT_MESSAGES:])
+    return not nouns.isdisjoint(_stem(word) for word in WORD.findall(recent))
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", "", text.lower()).split())
+
+
+class FastHistoryAwareRetriever:
+    def __init__(
+        self,
+        llm: BaseLanguageModel,
+        retriever: RetrieverLike,
+        prompt: BasePromptTemplate,
+        speculative: bool = True,
+        cache_size: int = 1024,
+        needs_rewrite: Callable[[str, Sequence[BaseMessage]], bool] = needs_rewrite,
+    ):
+        if "input" not in prompt.input_variables:
+            raise ValueError(f"Expected `input` to be a prompt variable, but got {prompt.input_variables}")
+        self.rewrite_chain = prompt | llm | StrOutputParser()
+        self.retriever = retriever
+        self.speculative = speculative
+        self.cache_size = cache_size
+        self.needs_rewrite = needs_rewrite
+        self._cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ContextThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative-retrieval")
+        self.stats = {"no_history": 0, "standalone": 0, "cached": 0, "rewritten": 0, "speculative_hits": 0}
+
+    def close(self):
+        """Stop the speculative retrieval threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _cache_key(self, inputs: dict) -> tuple:
+        history = get_buffer_string(inputs["chat_history"])
+        return hashlib.sha256(history.encode("utf-8")).hexdigest(), _normalize(inputs["input"])
+
+    def _cached(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def _remember(self, key: tuple, question: str):
+        with self._lock:
+            self._cache[key] = question
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def __call__(self, inputs: dict, config: RunnableConfig) -> List[Document]:
+        question = inputs["input"]
+        if not inputs.get("chat_history"):
+            self._count("no_history")
+            return self.retriever.invoke(question, config)
+        if not self.needs_rewrite(question, inputs["chat_history"]):
+            self._count("standalone")
+            return self.retriever.invoke(question, config)
+
+        key = self._cache_key(inputs)
+        rewritten = self._cached(key)
+        if rewritten is not None:
+            self._count("cached")
+            return self.retriever.invoke(rewritten, config)
+
+        self._count("rewritten")
+        if not self.speculative:
+            rewritten = self.rewrite_chain.invoke(inputs, config).strip()
+            self._remember(key, rewritten)
+            return self.retriever.invoke(rewritten, config)
+
+        raw_documents = self._executor.submit(self.retriever.invoke, question, config)
+        rewritten = self.rewrite_chain.invoke(inputs, config).strip()
+        self._remember(key, rewritten)
+        if _normalize(rewritten) == _normalize(question):
+            self._count("speculative_hits")
+            return raw_documents.result()
+        raw_documents.cancel()  # only helps if it hasn't started yet
+        return self.retriever.invoke(rewritten, config)
+
+    def as_runnable(self) -> Runnable:
+        return RunnableLambda(self).with_config(run_name="chat_retriever_chain")
+
+
+def create_fast_history_aware_retriever(
+    llm: BaseLanguageModel,
+    retriever: RetrieverLike,
+    prompt: BasePromptTemplate,
+    speculative: bool = True,
+    cache_size: int = 1024,
+    needs_rewrite: Callable[[str, Sequence[BaseMessage]], bool] = needs_rewrite,
+) -> Runnable:
+    """Same contract as create_history_aware_retriever. Build FastHistoryAwareRetriever directly to read its stats."""
+    return FastHistoryAwareRetriever(llm, retriever, prompt, speculative, cache_size, needs_rewrite).as_runnable()
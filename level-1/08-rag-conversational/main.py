@@ -13,12 +13,10 @@ from langchain_chroma import Chroma
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import AIMessage, HumanMessage
-from langchain.chains import (
-    create_retrieval_chain,
-    create_history_aware_retriever,
-)
+from langchain.chains import create_retrieval_chain
+from fast_history_retriever import FastHistoryAwareRetriever
 from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_community.chat_message_histories import ChatMessageHistory
+from session_store import SessionStore
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.runnables.history import RunnableWithMessageHistory
 
@@ -83,10 +81,12 @@ contextualize_q_prompt = ChatPromptTemplate.from_messages([
     ("human", "{input}"),
 ])
 
-# Create a retriever that takes chat history into account
-history_aware_retriever = create_history_aware_retriever(
-    llm, retriever, contextualize_q_prompt
-)
+# Create a retriever that takes chat history into account.
+# Like create_history_aware_retriever, but the extra LLM rewrite only runs for follow-ups
+# that refer back to the conversation ("what did he mean by that?"), rewrites are cached,
+# and retrieval for the raw question runs while the rewrite is in flight.
+fast_retriever = FastHistoryAwareRetriever(llm, retriever, contextualize_q_prompt)
+history_aware_retriever = fast_retriever.as_runnable()
 
 # Prompt that also includes chat history
 qa_prompt = ChatPromptTemplate.from_messages([
@@ -119,12 +119,11 @@ print(response["answer"])
 # ========== 10. Add Session Management (Multiple Users) ==========
 # Allows saving separate chat histories using session IDs
 
-store = {}
+# Bounded: least recently used and idle sessions are evicted, so memory can't grow forever
+store = SessionStore(max_sessions=10_000, ttl=3600, max_messages=100)
 
 def get_session_history(session_id: str) -> BaseChatMessageHistory:
-    if session_id not in store:
-        store[session_id] = ChatMessageHistory()
-    return store[session_id]
+    return store.get_session_history(session_id)
 
 conversational_rag_chain = RunnableWithMessageHistory(
     rag_chain,
@@ -155,6 +154,10 @@ for message in store["001"].messages:
     prefix = "AI" if isinstance(message, AIMessage) else "User"
     print(f"{prefix}: {message.content}\n")
 
+# How each question reached the retriever (skipped, cached or rewritten)
+print("Rewrite stats:", fast_retriever.stats)
+fast_retriever.close()
+
 
 
 # --------------------- CODE NOTES ---------------------
@@ -181,9 +184,14 @@ for message in store["001"].messages:
 
 # 8. RAG with Chat History:
 #    We simulate conversations and keep track of chat history to handle follow-up questions more intelligently.
+#    Rewriting a follow-up into a standalone question costs an extra LLM call, so FastHistoryAwareRetriever
+#    (fast_history_retriever.py) skips it when the question doesn't refer back to the chat, caches rewrites,
+#    and retrieves for the raw question in parallel in case the rewrite comes back unchanged.
 
 # 9. Session Management:
 #    This allows each user or session to have its own separate memory using session IDs.
+#    SessionStore (session_store.py) caps the number of sessions and messages and drops idle
+#    sessions, so a long-running server doesn't leak memory; it can also spill them to SQLite.
 
 # 10. Final Output:
 #    We print answers and show the chat history to see how the model tracks previous questions.
@@ -0,0 +1,216 @@
+"""
+Bounded in-memory session store for RunnableWithMessageHistory.
+
+A plain dict of ChatMessageHistory objects grows forever: every session_id
+ever seen keeps all of its messages, each one a full pydantic message object.
+SessionStore keeps memory bounded:
+
+    - at most max_sessions sessions, least recently used evicted first
+    - sessions idle for longer than ttl seconds are evicted
+    - at most max_messages per session (oldest dropped)
+    - messages are stored as small __slots__ records with interned role
+      strings and rebuilt as LangChain messages only when read
+
+With spill_path set, evicted sessions are written to a SQLite file and
+loaded back the next time their session_id is used, so eviction frees
+memory without forgetting the conversation.
+
+    store = SessionStore(max_sessions=10_000, ttl=3600, max_messages=100)
+    RunnableWithMessageHistory(chain, store.get_session_history)
+"""
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    message_to_dict,
+    messages_from_dict,
+)
+
+PLAIN_TYPES = {"human": HumanMessage, "ai": AIMessage, "system": SystemMessage}
+
+
+class StoredMessage:
+    """One message: role and text, plus the full dict only if it carries anything else."""
+
+    __slots__ = ("type", "content", "extra")
+
+    def __init__(self, type: str, content, extra: Optional[dict] = None):
+        self.type = sys.intern(type)
+        self.content = content
+        self.extra = extra
+
+    @classmethod
+    def from_message(cls, message: BaseMessage) -> "StoredMessage":
+        plain = (
+            type(message) is PLAIN_TYPES.get(message.type)
+            and not message.additional_kwargs
+            and not message.response_metadata
+            and not message.name
+            and not message.id
+        )
+        return cls(message.type, message.content, None if plain else message_to_dict(message))
+
+    def to_message(self) -> BaseMessage:
+        if self.extra is None:
+            return PLAIN_TYPES[self.type](content=self.content)
+        return messages_from_dict([self.extra])[0]
+
+    def to_json(self):
+        return self.extra or [self.type, self.content]
+
+    @classmethod
+    def from_json(cls, value) -> "StoredMessage":
+        if isinstance(value, dict):
+            return cls(value["type"], value["data"]["content"], value)
+        return cls(value[0], value[1])
+
+
+class BoundedChatMessageHistory(BaseChatMessageHistory):
+    def __init__(self, store: "SessionStore", session_id: str, records: Sequence[StoredMessage] = ()):
+        self._store = store
+        self.session_id = session_id
+        self.records = list(records)  # a list is ~500 bytes smaller than a deque per session
+        self.last_used = time.monotonic()
+        self.evicted = False
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        return [record.to_message() for record in self.records]
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        records = [StoredMessage.from_message(message) for message in messages]
+        self._extend(records)
+        if self.evicted:
+            self._store._reattach(self, records)  # evicted while a chain was still using it
+
+    def _extend(self, records: List[StoredMessage]):
+        self.records.extend(records)
+        cap = self._store.max_messages
+        if cap is not None and len(self.records) > cap:
+            del self.records[:-cap]
+
+    def clear(self) -> None:
+        self.records.clear()
+
+
+class SessionStore:
+    def __init__(
+        self,
+        max_sessions: int = 10_000,
+        ttl: Optional[float] = 3600.0,
+        max_messages: Optional[int] = 100,
+        spill_path: Optional[str] = None,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self.spill_path = spill_path
+        self._sessions: "OrderedDict[str, BoundedChatMessageHistory]" = OrderedDict()  # oldest use first
+        self._lock = threading.RLock()
+        self._db = None
+        if spill_path:
+            self._db = sqlite3.connect(spill_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")  # a lost spill only loses an idle session
+            self._db.execute("CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, messages TEXT)")
+            self._db.commit()
+        self.stats = {"created": 0, "evicted": 0, "expired": 0, "spilled": 0, "reloaded": 0}
+
+    def get_session_history(self, session_id: str) -> BaseChatMessageHistory:
+        """Pass this to RunnableWithMessageHistory in place of the dict-based function."""
+        with self._lock:
+            self._expire()
+            history = self._sessions.get(session_id)
+            if history is not None:
+                self._sessions.move_to_end(session_id)
+                history.last_used = time.monotonic()
+                return history
+            history = BoundedChatMessageHistory(self, session_id, self._reload(session_id))
+            self._sessions[session_id] = history
+            self._evict_overflow()
+            return history
+
+    __getitem__ = get_session_history
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    # ----------------------------------------
+    # Eviction
+
+    def _expire(self):
+        if self.ttl is None:
+            return
+        cutoff = time.monotonic() - self.ttl
+        while self._sessions:
+            session_id, history = next(iter(self._sessions.items()))
+            if history.last_used > cutoff:
+                break  # the rest were used more recently
+            self._evict(session_id)
+            self.stats["expired"] += 1
+
+    def _evict_overflow(self):
+        while len(self._sessions) > self.max_sessions:
+            self._evict(next(iter(self._sessions)))
+            self.stats["evicted"] += 1
+
+    def _evict(self, session_id: str):
+        history = self._sessions.pop(session_id)
+        history.evicted = True
+        if self._db is not None and history.records:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?)",
+                (session_id, json.dumps([record.to_json() for record in history.records])),
+            )
+            self._db.commit()
+            self.stats["spilled"] += 1
+
+    def _reattach(self, history: BoundedChatMessageHistory, records: List[StoredMessage]):
+        with self._lock:
+            current = self._sessions.get(history.session_id)
+            if current is not None:
+                current._extend(records)  # reloaded meanwhile: add just the new messages
+                return
+            if self._db is not None:
+                self._db.execute("DELETE FROM sessions WHERE session_id = ?", (history.session_id,))
+                self._db.commit()
+            history.evicted = False
+            history.last_used = time.monotonic()
+            self._sessions[history.session_id] = history
+            self._sessions.move_to_end(history.session_id)
+            self._evict_overflow()
+
+    def _reload(self, session_id: str) -> List[StoredMessage]:
+        if self._db is None:
+            self.stats["created"] += 1
+            return []
+        row = self._db.execute("SELECT messages FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            self.stats["created"] += 1
+            return []
+        self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        self._db.commit()
+        self.stats["reloaded"] += 1
+        return [StoredMessage.from_json(value) for value in json.loads(row[0])]
+
+    def close(self):
+        """Spill every live session (if spilling is on) and close the SQLite file."""
+        with self._lock:
+            if self._db is not None:
+                for session_id in list(self._sessions):
+                    self._evict(session_id)
+                self._db.close()
+                self._db = None
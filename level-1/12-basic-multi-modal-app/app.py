@@ -6,9 +6,13 @@ import os
 
 from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings
-from langchain.storage import InMemoryStore
 from langchain.retrievers.multi_vector import MultiVectorRetriever
 
+from sqlite_docstore import SQLiteDocStore
+
+# Must be the first Streamlit command, before the cached loader below shows its spinner
+st.set_page_config(page_title="MultiModal RAG App", layout="wide")
+
 # ----------------------------
 # STEP 1: Load environment and setup
 # ----------------------------
@@ -20,29 +24,37 @@ embedder = OpenAIEmbeddings()
 # ----------------------------
 # Important: these must match what you used in main.py
 VECTOR_COLLECTION = "multi_modal_rag"
-vectorstore = Chroma(
-    collection_name=VECTOR_COLLECTION,
-    embedding_function=embedder,
-    persist_directory=".chroma_store"  # optional if you persist
-)
-
-# Simulated docstore with example contents (in real case, reload from disk)
-docstore = InMemoryStore()
-# You could serialize raw_docs from main.py and load them here
-# For demo purposes, we’ll leave it empty
-
-retriever = MultiVectorRetriever(
-    vectorstore=vectorstore,
-    docstore=docstore,
-    id_key="uid"
-)
+PERSIST_DIRECTORY = ".chroma_store"
+DOCSTORE_PATH = ".chroma_store/docstore.sqlite3"
+
+
+@st.cache_resource  # opened once per server, not on every Streamlit rerun
+def load_retriever():
+    vectorstore = Chroma(
+        collection_name=VECTOR_COLLECTION,
+        embedding_function=embedder,
+        persist_directory=PERSIST_DIRECTORY,
+    )
+    # Parent documents written by main.py; each query is one batched mget
+    docstore = SQLiteDocStore(DOCSTORE_PATH)
+    retriever = MultiVectorRetriever(
+        vectorstore=vectorstore,
+        docstore=docstore,
+        id_key="uid"
+    )
+    return retriever, len(docstore)
+
+
+retriever, docstore_size = load_retriever()
 
 # ----------------------------
 # STEP 3: Streamlit UI
 # ----------------------------
-st.set_page_config(page_title="MultiModal RAG App", layout="wide")
 st.title("🧠 MultiModal PDF Q&A (LangChain + GPT-4o)")
 
+if docstore_size == 0:
+    st.warning("No documents found in .chroma_store — run `python main.py` first.")
+
 query = st.text_input("Ask a question about your PDF:", "")
 
 if query:
@@ -51,6 +63,6 @@ if query:
 
     st.subheader("📄 RAG Answers")
     for i, doc in enumerate(results):
-        st.markdown(f"**Result {i+1}**")
+        st.markdown(f"**Result {i+1}** ({doc.metadata.get('type', 'text')})")
         st.write(doc.page_content)
         st.markdown("---")
@@ -0,0 +1,190 @@
+# element_summarizer.py
+
+"""
+Concurrent, cached summaries of the elements partition_pdf returns.
+
+Summarizing one element at a time spends almost all of its time waiting on
+the network. ElementSummarizer instead:
+
+- sends text and table summaries through llm_text.batch_as_completed with a
+  max_concurrency limit, and image descriptions through llm_vision the same
+  way, with both groups running at the same time
+- caches every summary on disk under a hash of the element's content (the
+  image bytes for images) plus the model and prompt, so re-running on the
+  same PDF only calls the LLM for new or previously failed elements
+- prints progress and a throughput report as results come in
+"""
+
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import SystemMessage, HumanMessage
+
+TEXT_SYSTEM = "You are a helpful assistant that summarizes PDF text."
+TABLE_SYSTEM = "You are a helpful assistant that summarizes table data."
+IMAGE_SYSTEM = "You are an expert at describing images."
+
+
+class SummaryCache:
+    """One small JSON file per summary: <folder>/<hash[:2]>/<hash>.json."""
+
+    def __init__(self, folder=".summary_cache"):
+        self.folder = folder
+
+    def _path(self, key):
+        return os.path.join(self.folder, key[:2], key + ".json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)["summary"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key, summary):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary}, f)
+        os.replace(tmp, path)  # atomic: an interrupted run never leaves a half-written entry
+
+
+class Progress:
+    def __init__(self, total, every=2.0):
+        self.total = total
+        self.every = every
+        self.done = self.cached = self.failed = 0
+        self.start = self.last = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def update(self, cached=False, failed=False):
+        with self.lock:
+            self.done += 1
+            self.cached += cached
+            self.failed += failed
+            now = time.perf_counter()
+            if now - self.last >= self.every or self.done == self.total:
+                self.last = now
+                print(f"📝 {self.done}/{self.total} elements ({self.cached} cached, {self.failed} failed), "
+                      f"{self.rate():.1f}/s")
+
+    def rate(self):
+        return self.done / max(time.perf_counter() - self.start, 1e-9)
+
+
+def _model_name(llm):
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+
+def _digest(*parts):
+    sha = hashlib.sha256()
+    for part in parts:
+        sha.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+def text_messages(system, prompt, content):
+    return [SystemMessage(content=system), HumanMessage(content=f"{prompt}\n\n{content}")]
+
+
+def image_messages(image_bytes, mime):
+    b64_image = base64.b64encode(image_bytes).decode("utf-8")
+    return [
+        SystemMessage(content=IMAGE_SYSTEM),
+        HumanMessage(content=[
+            {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64_image}"}},
+            {"type": "text", "text": "Describe this image in detail from a PDF report."},
+        ]),
+    ]
+
+
+class ElementSummarizer:
+    def __init__(self, llm_text, llm_vision, cache_dir=".summary_cache", max_concurrency=8, max_image_concurrency=4):
+        self.llm_text = llm_text
+        self.llm_vision = llm_vision
+        self.cache = SummaryCache(cache_dir)
+        self.max_concurrency = max_concurrency
+        self.max_image_concurrency = max_image_concurrency
+        self.progress = None
+        self.stats = {"elements": 0, "cached": 0, "llm_calls": 0, "failed": 0, "seconds": 0.0}
+
+    def _run(self, llm, jobs, max_concurrency):
+        """jobs: list of (cache key, messages builder). Returns summaries in order (None where the call failed)."""
+        summaries = [None] * len(jobs)
+        todo = []
+        for index, (key, _) in enumerate(jobs):
+            summaries[index] = self.cache.get(key)
+            if summaries[index] is not None:
+                self.progress.update(cached=True)
+            else:
+                todo.append(index)
+        if not todo:
+            return summaries
+
+        inputs = [jobs[index][1]() for index in todo]
+        outputs = llm.batch_as_completed(inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True)
+        for position, output in outputs:
+            index = todo[position]
+            if isinstance(output, Exception):
+                print(f"⚠️ Summary failed, will retry on the next run: {output}")
+                self.progress.update(failed=True)
+                continue
+            summaries[index] = output.content
+            self.cache.set(jobs[index][0], output.content)  # saved as it arrives, so an interrupted run keeps it
+            self.progress.update()
+        return summaries
+
+    def _text_jobs(self, elements, system, prompt):
+        model = _model_name(self.llm_text)
+        return [
+            (_digest(model, system, prompt, element), lambda element=element: text_messages(system, prompt, element))
+            for element in elements
+        ]
+
+    def _image_jobs(self, images):
+        """images: file paths, or PreparedImage objects from image_preprocessor (already resized and re-encoded)."""
+        model = _model_name(self.llm_vision)
+        jobs = []
+        for image in images:
+            if isinstance(image, str):
+                with open(image, "rb") as f:
+                    image_bytes, mime = f.read(), mimetypes.guess_type(image)[0] or "image/png"
+            else:
+                image_bytes, mime = image.data, image.mime
+            jobs.append((_digest(model, IMAGE_SYSTEM, image_bytes), lambda data=image_bytes, mime=mime: image_messages(data, mime)))
+        return jobs
+
+    def summarize_all(self, text_elements, table_elements, images):
+        """Returns (text summaries, table summaries, image summaries), each aligned with its input list."""
+        text_jobs = self._text_jobs(text_elements, TEXT_SYSTEM, "Summarize the following:")
+        table_jobs = self._text_jobs(table_elements, TABLE_SYSTEM, "Summarize the following table:")
+        image_jobs = self._image_jobs(images)
+        self.progress = Progress(len(text_jobs) + len(table_jobs) + len(image_jobs))
+
+        # Text and vision models have separate rate limits: run both groups at once
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            texts = pool.submit(self._run, self.llm_text, text_jobs + table_jobs, self.max_concurrency)
+            images = pool.submit(self._run, self.llm_vision, image_jobs, self.max_image_concurrency)
+            text_and_tables, image_summaries = texts.result(), images.result()
+
+        progress = self.progress
+        self.stats["elements"] += progress.total
+        self.stats["cached"] += progress.cached
+        self.stats["failed"] += progress.failed
+        self.stats["llm_calls"] += progress.total - progress.cached
+        self.stats["seconds"] += time.perf_counter() - progress.start
+        return text_and_tables[:len(text_jobs)], text_and_tables[len(text_jobs):], image_summaries
+
+    def report(self):
+        stats = self.stats
+        return (f"✅ {stats['elements']} elements summarized in {stats['seconds']:.1f} s "
+                f"({stats['elements'] / max(stats['seconds'], 1e-9):.1f}/s): {stats['cached']} from cache, "
+                f"{stats['llm_calls']} LLM calls, {stats['failed']} failed")
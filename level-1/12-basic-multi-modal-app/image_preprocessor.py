@@ -0,0 +1,211 @@
+# image_preprocessor.py
+
+"""
+Shrink, dedupe and filter extracted figures before they go to the vision model.
+
+partition_pdf writes every figure at full resolution, including logos, rules
+and the same chart repeated on several pages. GPT-4o downscales anything
+larger than 2048px to fit 2048x2048 and then to 768px on the shortest side
+before it tiles the image into 512px tiles (85 + 170 tokens per tile), so
+pixels beyond that cost upload time and nothing else. preprocess_images:
+
+- decodes each image with PIL in a process pool
+- drops tiny decorative images (icons, bullets, separators)
+- downsizes to the vision model's effective resolution and re-encodes as
+  JPEG, or as a palette PNG for flat charts and diagrams when that is smaller
+- skips duplicates and near-duplicates: a perceptual hash (dHash) finds
+  candidates, and a pixel comparison of small grayscale thumbnails confirms
+  them, since charts drawn from the same template often share a dHash
+- reports payload bytes, image tokens and an estimate of upload and vision
+  time before and after
+"""
+
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from PIL import Image
+
+MAX_LONG_SIDE = 2048     # GPT-4o fits images into 2048x2048 ...
+MAX_SHORT_SIDE = 768     # ... then scales the shortest side down to 768
+MIN_SIDE = 64            # smaller than this on either side: an icon or a rule line
+MIN_AREA = 150 * 150
+DUPLICATE_DISTANCE = 6   # dHash bits that may differ between duplicate candidates (out of 64)
+THUMBNAIL_SIDE = 64      # grayscale thumbnail compared pixel by pixel to confirm a candidate
+PIXEL_TOLERANCE = 48     # gray levels rescaling and re-encoding may shift a thumbnail pixel by
+MAX_CHANGED_PIXELS = 8   # thumbnail pixels beyond that tolerance still counted as the same image
+MAX_ASPECT_CHANGE = 0.02
+
+# Assumptions behind the time estimate in format_report
+UPLOAD_BYTES_PER_SECOND = 2_500_000  # a 20 Mbit/s uplink
+SECONDS_PER_DESCRIPTION = 4.0        # one GPT-4o image description, mostly output generation
+
+
+@dataclass
+class PreparedImage:
+    path: str
+    data: bytes
+    mime: str
+    width: int
+    height: int
+    original_bytes: int
+    original_size: tuple
+    dhash: int
+    thumbnail: bytes
+
+
+def vision_tokens(width, height):
+    """Image tokens GPT-4o charges for a high-detail image of this size."""
+    scale = min(1.0, MAX_LONG_SIDE / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, MAX_SHORT_SIDE / min(width, height))
+    width, height = width * scale, height * scale
+    tiles = -(-int(width) // 512) * -(-int(height) // 512)
+    return 85 + 170 * tiles
+
+
+def _target_size(width, height):
+    scale = min(1.0, MAX_LONG_SIDE / max(width, height), MAX_SHORT_SIDE / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def dhash(image, size=8):
+    """64-bit difference hash: robust to rescaling and re-encoding, not to crops."""
+    pixels = list(image.convert("L").resize((size + 1, size), Image.LANCZOS).getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left, right = pixels[row * (size + 1) + col], pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def thumbnail(image, side=THUMBNAIL_SIDE):
+    return image.convert("L").resize((side, side), Image.LANCZOS).tobytes()
+
+
+def is_duplicate(image, other, duplicate_distance=DUPLICATE_DISTANCE):
+    """Same picture up to rescaling and re-encoding: dHash narrows it down, the thumbnails decide."""
+    if bin(image.dhash ^ other.dhash).count("1") > duplicate_distance:
+        return False
+    if abs(image.width * other.height - other.width * image.height) > MAX_ASPECT_CHANGE * image.width * other.height:
+        return False
+    changed = sum(abs(a - b) > PIXEL_TOLERANCE for a, b in zip(image.thumbnail, other.thumbnail))
+    return changed <= MAX_CHANGED_PIXELS
+
+
+def estimated_seconds(payload_bytes, descriptions):
+    """Rough sequential time to upload the base64 payload and get the descriptions back."""
+    return payload_bytes * 4 / 3 / UPLOAD_BYTES_PER_SECOND + descriptions * SECONDS_PER_DESCRIPTION
+
+
+def prepare_image(path, jpeg_quality=85):
+    """Runs in a worker process. Returns a PreparedImage, or (path, reason, size) if the image is skipped."""
+    original_bytes = os.path.getsize(path)
+    try:
+        with Image.open(path) as image:
+            image.load()
+            original_format = image.format
+    except (OSError, ValueError) as error:
+        return path, f"unreadable ({error})", None
+
+    width, height = image.size
+    if min(width, height) < MIN_SIDE or width * height < MIN_AREA:
+        return path, "tiny", (width, height)
+
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        background = Image.new("RGB", image.size, "white")  # flatten transparency onto white, like the page
+        background.paste(image.convert("RGBA"), mask=image.convert("RGBA").split()[-1])
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    flat = image.getcolors(256) is not None  # decided before resizing, which blends in new colors
+    target = _target_size(width, height)
+    if target != image.size:
+        image = image.resize(target, Image.LANCZOS)
+
+    jpeg = io.BytesIO()
+    image.save(jpeg, format="JPEG", quality=jpeg_quality, optimize=True, progressive=True)
+    data, mime = jpeg.getvalue(), "image/jpeg"
+    if flat:
+        # Charts and diagrams: a palette PNG keeps text sharp and is usually smaller than JPEG
+        png = io.BytesIO()
+        image.quantize(256).save(png, format="PNG", optimize=True)
+        if len(png.getvalue()) <= len(data):
+            data, mime = png.getvalue(), "image/png"
+
+    original_mime = Image.MIME.get(original_format)
+    if target == (width, height) and original_bytes <= len(data) and original_mime in ("image/jpeg", "image/png"):
+        with open(path, "rb") as f:  # already small and compact: re-encoding would only add bytes
+            data, mime = f.read(), original_mime
+
+    return PreparedImage(
+        path=path,
+        data=data,
+        mime=mime,
+        width=image.size[0],
+        height=image.size[1],
+        original_bytes=original_bytes,
+        original_size=(width, height),
+        dhash=dhash(image),
+        thumbnail=thumbnail(image),
+    )
+
+
+def preprocess_images(image_paths, max_workers=None, duplicate_distance=DUPLICATE_DISTANCE):
+    """Returns (images to describe, report dict). Order follows image_paths; the first copy of a duplicate wins."""
+    start = time.perf_counter()
+    image_paths = sorted(image_paths)
+    if len(image_paths) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(prepare_image, image_paths, chunksize=4))
+    else:
+        results = [prepare_image(path) for path in image_paths]
+
+    original_sizes = [result[2] if isinstance(result, tuple) else result.original_size for result in results]
+    kept, skipped = [], {}
+    for result in results:
+        if isinstance(result, tuple):
+            path, reason, _ = result
+            skipped[path] = reason
+            continue
+        duplicate_of = next((image.path for image in kept if is_duplicate(result, image, duplicate_distance)), None)
+        if duplicate_of:
+            skipped[result.path] = f"duplicate of {os.path.basename(duplicate_of)}"
+        else:
+            kept.append(result)
+
+    bytes_before = sum(os.path.getsize(path) for path in image_paths)
+    bytes_after = sum(len(image.data) for image in kept)
+    report = {
+        "images": len(image_paths),
+        "kept": len(kept),
+        "tiny": sum(reason == "tiny" for reason in skipped.values()),
+        "duplicates": sum(reason.startswith("duplicate") for reason in skipped.values()),
+        "unreadable": sum(reason.startswith("unreadable") for reason in skipped.values()),
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "tokens_before": sum(vision_tokens(*size) for size in original_sizes if size),
+        "tokens_after": sum(vision_tokens(image.width, image.height) for image in kept),
+        # Before this stage every figure was sent as is, one vision call each
+        "est_seconds_before": estimated_seconds(bytes_before, len(image_paths)),
+        "est_seconds_after": estimated_seconds(bytes_after, len(kept)),
+        "seconds": time.perf_counter() - start,
+        "skipped": skipped,
+    }
+    return kept, report
+
+
+def format_report(report):
+    before, after = report["bytes_before"], report["bytes_after"]
+    return (
+        f"🖼️ {report['images']} images → {report['kept']} to describe "
+        f"({report['tiny']} tiny, {report['duplicates']} duplicates, {report['unreadable']} unreadable) "
+        f"in {report['seconds']:.1f} s; payload {before / 1024:.0f} KB → {after / 1024:.0f} KB "
+        f"(-{1 - after / max(before, 1):.0%}), image tokens {report['tokens_before']} → {report['tokens_after']}, "
+        f"est. upload + vision time {report['est_seconds_before']:.1f} s → {report['est_seconds_after']:.1f} s "
+        f"({report['images']} → {report['kept']} calls, sequential)"
+    )
@@ -1,21 +1,18 @@
 # main.py
 
 import os
-import base64
-import uuid
+import hashlib
 from dotenv import load_dotenv
-from PIL import Image
-import mimetypes
-
-from unstructured.partition.pdf import partition_pdf
 
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.documents import Document
 from langchain_community.vectorstores import Chroma
-from langchain.storage import InMemoryStore
 from langchain.retrievers.multi_vector import MultiVectorRetriever
 
-from langchain.schema import SystemMessage, HumanMessage
+from element_summarizer import ElementSummarizer
+from image_preprocessor import preprocess_images, format_report
+from parallel_partition import partition_pdf_parallel
+from sqlite_docstore import SQLiteDocStore
 
 # -----------------------------
 # STEP 1: Load environment + setup
@@ -23,121 +20,129 @@ from langchain.schema import SystemMessage, HumanMessage
 load_dotenv()
 pdf_path = "startupai-financial-report-v2.pdf"
 output_folder = "figures"
+PERSIST_DIRECTORY = ".chroma_store"                 # shared with app.py
+DOCSTORE_PATH = ".chroma_store/docstore.sqlite3"    # shared with app.py
 os.makedirs(output_folder, exist_ok=True)
 
 # Ensure OCR is enabled for unstructured
 os.environ["OCR_AGENT"] = "pytesseract"
 
-# -----------------------------
-# STEP 2: Partition the PDF
-# -----------------------------
-raw_pdf_elements = partition_pdf(
-    filename=pdf_path,
-    extract_images_in_pdf=True,
-    infer_table_structure=True,
-    output_image_dir_path=output_folder,
-)
-
-# -----------------------------
-# STEP 3: Separate elements
-# -----------------------------
-text_elements, table_elements, image_paths = [], [], []
-
-for element in raw_pdf_elements:
-    if "Table" in str(type(element)):
-        table_elements.append(element.text)
-    elif "Text" in str(type(element)):
-        text_elements.append(element.text)
-
-for fname in os.listdir(output_folder):
-    if fname.lower().endswith((".png", ".jpg", ".jpeg")):
-        image_paths.append(os.path.join(output_folder, fname))
-
-# -----------------------------
-# STEP 4: Initialize LLMs + Embedder
-# -----------------------------
-llm_text = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
-llm_vision = ChatOpenAI(model="gpt-4o", temperature=0, max_tokens=500)
-embedder = OpenAIEmbeddings()
-
-# -----------------------------
-# STEP 5: Summarize and assign unique IDs
-# -----------------------------
-summaries = []         # Vector DB content
-raw_docs = {}          # UID → Original content map
-
-# -- Text
-for i, chunk in enumerate(text_elements):
-    messages = [
-        SystemMessage(content="You are a helpful assistant that summarizes PDF text."),
-        HumanMessage(content=f"Summarize the following:\n\n{chunk}")
-    ]
-    summary = llm_text.invoke(messages).content
-    uid = str(uuid.uuid4())
-    summaries.append(Document(page_content=summary, metadata={"uid": uid, "type": "text"}))
-    raw_docs[uid] = chunk
-
-# -- Tables
-for i, table in enumerate(table_elements):
-    messages = [
-        SystemMessage(content="You are a helpful assistant that summarizes table data."),
-        HumanMessage(content=f"Summarize the following table:\n\n{table}")
-    ]
-    summary = llm_text.invoke(messages).content
-    uid = str(uuid.uuid4())
-    summaries.append(Document(page_content=summary, metadata={"uid": uid, "type": "table"}))
-    raw_docs[uid] = table
-
-# -- Images (base64)
-for i, path in enumerate(image_paths):
-    with open(path, "rb") as f:
-        img_bytes = f.read()
-        b64_image = base64.b64encode(img_bytes).decode("utf-8")
-
-    mime = mimetypes.guess_type(path)[0] or "image/png"
-    image_dict = {
-        "type": "image_url",
-        "image_url": {"url": f"data:{mime};base64,{b64_image}"}
-    }
-
-    messages = [
-        SystemMessage(content="You are an expert at describing images."),
-        HumanMessage(content=[
-            image_dict,
-            {"type": "text", "text": "Describe this image in detail from a PDF report."}
-        ])
-    ]
-    summary = llm_vision.invoke(messages).content
-    uid = str(uuid.uuid4())
-    summaries.append(Document(page_content=summary, metadata={"uid": uid, "type": "image"}))
-    raw_docs[uid] = f"<Image: {os.path.basename(path)}>"
-
-# -----------------------------
-# STEP 6: Store in Chroma + DocStore
-# -----------------------------
-vectorstore = Chroma.from_documents(
-    summaries,
-    embedding=embedder,
-    collection_name="multi_modal_rag"
-)
-
-docstore = InMemoryStore()
-for uid, content in raw_docs.items():
-    docstore.mset([(uid, content)])
-
-retriever = MultiVectorRetriever(
-    vectorstore=vectorstore,
-    docstore=docstore,
-    id_key="uid",
-)
-
-# -----------------------------
-# STEP 7: Run a test query
-# -----------------------------
-query = "What is the ROI and total sales of the company?"
-results = retriever.get_relevant_documents(query)
-
-print("\n--- RAG Results for Query ---")
-for i, doc in enumerate(results):
-    print(f"[{i+1}] {doc}\n")
 
+# Steps 2-7 run inside main(): partitioning and image preprocessing use process
+# pools, and on Windows/macOS each worker process re-imports this file.
+def main():
+    # -----------------------------
+    # STEP 2: Partition the PDF
+    # -----------------------------
+    # Page ranges are partitioned in parallel processes and cached per page in
+    # .partition_cache, so re-running on an amended PDF only redoes changed pages.
+    raw_pdf_elements, image_paths = partition_pdf_parallel(
+        pdf_path,
+        output_folder,
+        partition_kwargs={"extract_images_in_pdf": True, "infer_table_structure": True},
+    )
+
+    # -----------------------------
+    # STEP 3: Separate elements
+    # -----------------------------
+    text_elements, table_elements = [], []
+
+    for element in raw_pdf_elements:
+        if "Table" in str(type(element)):
+            table_elements.append(element.text)
+        elif "Text" in str(type(element)):
+            text_elements.append(element.text)
+
+    # Drop tiny and duplicate figures, downsize the rest to what the vision model actually sees
+    images, image_report = preprocess_images(image_paths)
+    print(format_report(image_report))
+
+    # -----------------------------
+    # STEP 4: Initialize LLMs + Embedder
+    # -----------------------------
+    llm_text = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
+    llm_vision = ChatOpenAI(model="gpt-4o", temperature=0, max_tokens=500)
+    embedder = OpenAIEmbeddings()
+
+    # -----------------------------
+    # STEP 5: Summarize and assign unique IDs
+    # -----------------------------
+    # Text/table summaries and image descriptions run concurrently and are cached
+    # in .summary_cache by content hash, so a re-run only summarizes new elements.
+    summarizer = ElementSummarizer(llm_text, llm_vision, cache_dir=".summary_cache", max_concurrency=8)
+    text_summaries, table_summaries, image_summaries = summarizer.summarize_all(
+        text_elements, table_elements, images
+    )
+    print(summarizer.report())
+
+    summaries = []         # Vector DB content
+    raw_docs = {}          # UID → Original content map
+    produced = set()       # UIDs of every element in this PDF, summarized this run or not
+
+    for kind, contents, keys, kind_summaries in [
+        ("text", text_elements, text_elements, text_summaries),
+        ("table", table_elements, table_elements, table_summaries),
+        # Images are keyed by their bytes, so a changed figure gets a new UID even if its file name didn't change
+        ("image", [f"<Image: {os.path.basename(image.path)}>" for image in images], [image.data for image in images],
+         image_summaries),
+    ]:
+        for content, key, summary in zip(contents, keys, kind_summaries):
+            # Content-derived UID: re-running on the same PDF updates entries instead of duplicating them
+            key = key if isinstance(key, bytes) else key.encode("utf-8")
+            uid = hashlib.sha256(kind.encode("utf-8") + b"\0" + key).hexdigest()
+            produced.add(uid)
+            if summary is None:
+                continue  # failed this run; retried next time
+            summaries.append(Document(page_content=summary, metadata={"uid": uid, "type": kind}))
+            raw_docs[uid] = Document(page_content=content, metadata={"uid": uid, "type": kind})
+
+    # -----------------------------
+    # STEP 6: Store in Chroma + DocStore (both persisted in .chroma_store for app.py)
+    # -----------------------------
+    vectorstore = Chroma(
+        collection_name="multi_modal_rag",
+        embedding_function=embedder,
+        persist_directory=PERSIST_DIRECTORY,
+    )
+
+    # Only embed summaries that are new or whose text changed (e.g. a new summary prompt or model)
+    unique_summaries = {doc.metadata["uid"]: doc for doc in summaries}
+    stored = vectorstore.get(include=["documents"])
+    existing = dict(zip(stored["ids"], stored["documents"]))
+    new_summaries = [doc for uid, doc in unique_summaries.items() if uid not in existing]
+    changed = [doc for uid, doc in unique_summaries.items() if uid in existing and existing[uid] != doc.page_content]
+    if new_summaries:
+        vectorstore.add_documents(new_summaries, ids=[doc.metadata["uid"] for doc in new_summaries])
+    if changed:
+        vectorstore.update_documents([doc.metadata["uid"] for doc in changed], changed)
+
+    # Elements no longer in the PDF (removed pages, replaced figures) leave both stores
+    stale = sorted(set(existing) - produced)
+    if stale:
+        vectorstore.delete(ids=stale)
+    print(f"🗂️ {len(new_summaries)} new, {len(changed)} updated and {len(stale)} removed summaries "
+          f"in {PERSIST_DIRECTORY}")
+
+    docstore = SQLiteDocStore(DOCSTORE_PATH)
+    docstore.mset(list(raw_docs.items()))  # one transaction for all parent documents
+    docstore.mdelete([uid for uid in docstore.yield_keys() if uid not in produced])
+
+    retriever = MultiVectorRetriever(
+        vectorstore=vectorstore,
+        docstore=docstore,
+        id_key="uid",
+    )
+
+    # -----------------------------
+    # STEP 7: Run a test query
+    # -----------------------------
+    query = "What is the ROI and total sales of the company?"
+    results = retriever.get_relevant_documents(query)
+
+    print("\n--- RAG Results for Query ---")
+    for i, doc in enumerate(results):
+        print(f"[{i+1}] ({doc.metadata['type']}) {doc.page_content}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# parallel_partition.py
+
+"""
+Page-sharded, cached partition_pdf.
+
+partition_pdf runs layout detection, table structure inference and OCR over
+the whole PDF on one core. partition_pdf_parallel instead:
+
+- hashes every page (the page written out as a one-page PDF, plus the
+  partition settings) and reuses cached elements and figures for pages it has
+  already seen, so an amended report only re-partitions the changed pages
+- splits the remaining pages into contiguous page ranges and partitions each
+  range in its own process, with its own image output folder
+- merges everything back in page order, renumbering pages and figure files
+  as if the whole PDF had been partitioned in one go
+
+    elements, image_paths = partition_pdf_parallel("report.pdf", "figures", max_workers=4)
+"""
+
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader, PdfWriter
+from unstructured.partition.pdf import partition_pdf
+
+try:
+    from unstructured.staging.base import elements_from_dicts
+except ImportError:  # older unstructured releases
+    from unstructured.staging.base import dict_to_elements as elements_from_dicts
+
+PARTITION_KWARGS = {"extract_images_in_pdf": True, "infer_table_structure": True}
+IMAGE_NAME = re.compile(r"^(?P<kind>[a-z]+)-(?P<page>\d+)-(?P<number>\d+)\.(?P<ext>\w+)$", re.IGNORECASE)
+
+
+def _page_pdf(reader, indexes):
+    writer = PdfWriter()
+    for index in indexes:
+        writer.add_page(reader.pages[index])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _page_key(page_bytes, partition_kwargs):
+    import unstructured
+
+    settings = json.dumps(
+        {"kwargs": partition_kwargs, "ocr": os.environ.get("OCR_AGENT"), "version": unstructured.__version__},
+        sort_keys=True,
+    )
+    return hashlib.sha256(page_bytes + settings.encode("utf-8")).hexdigest()
+
+
+def _partition_shard(shard_pdf, first_page, image_dir, partition_kwargs):
+    """Runs in a worker process: partition one page range, renumbered to its pages in the full PDF."""
+    raw_dir = os.path.join(image_dir, "raw")  # figures named by shard page; moved out renamed to PDF page
+    elements = partition_pdf(filename=shard_pdf, output_image_dir_path=raw_dir, **partition_kwargs)
+    renamed = {}
+    for name in os.listdir(raw_dir) if os.path.isdir(raw_dir) else []:
+        match = IMAGE_NAME.match(name)
+        if match:
+            page = int(match["page"]) + first_page - 1
+            new_name = f"{match['kind']}-{page}-{match['number']}.{match['ext']}"
+            os.replace(os.path.join(raw_dir, name), os.path.join(image_dir, new_name))
+            renamed[name] = new_name
+
+    dicts = []
+    for element in elements:
+        element_dict = element.to_dict()
+        metadata = element_dict.setdefault("metadata", {})
+        metadata["page_number"] = (metadata.get("page_number") or 1) + first_page - 1
+        metadata.pop("filename", None)
+        metadata.pop("file_directory", None)
+        if metadata.get("image_path"):
+            metadata["image_path"] = renamed.get(os.path.basename(metadata["image_path"]), os.path.basename(metadata["image_path"]))
+        dicts.append(element_dict)
+    return dicts, sorted(renamed.values())
+
+
+class PageCache:
+    """<folder>/<page hash>/elements.json plus that page's figure files."""
+
+    def __init__(self, folder=".partition_cache"):
+        self.folder = folder
+
+    def get(self, key):
+        try:
+            with open(os.path.join(self.folder, key, "elements.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, entry, image_dir):
+        """entry: {"page": ..., "elements": [...], "images": [...]} with images found in image_dir."""
+        tmp = tempfile.mkdtemp(dir=self.folder, prefix=".tmp-")
+        for name in entry["images"]:
+            shutil.copy(os.path.join(image_dir, name), tmp)
+        with open(os.path.join(tmp, "elements.json"), "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        final = os.path.join(self.folder, key)
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(tmp, final)  # the entry appears complete or not at all
+
+    def restore(self, key, entry, page, output_folder):
+        """Copy a cached page's figures into output_folder, renumbered to `page`; returns (element dicts, image paths)."""
+        renamed = {}
+        for name in entry["images"]:
+            match = IMAGE_NAME.match(name)
+            new_name = f"{match['kind']}-{page}-{match['number']}.{match['ext']}" if match else name
+            shutil.copy(os.path.join(self.folder, key, name), os.path.join(output_folder, new_name))
+            renamed[name] = new_name
+        elements = []
+        for element_dict in entry["elements"]:
+            element_dict = json.loads(json.dumps(element_dict))
+            metadata = element_dict.setdefault("metadata", {})
+            metadata["page_number"] = page  # the same page may have moved in an amended PDF
+            if metadata.get("image_path"):
+                metadata["image_path"] = os.path.join(output_folder, renamed.get(metadata["image_path"], metadata["image_path"]))
+            elements.append(element_dict)
+        return elements, [os.path.join(output_folder, renamed[name]) for name in entry["images"]]
+
+
+def _shards(pages, count):
+    """Split sorted page numbers into up to `count` runs of consecutive pages of similar size."""
+    runs, run = [], []
+    for page in pages:
+        if run and page != run[-1] + 1:
+            runs.append(run)
+            run = []
+        run.append(page)
+    if run:
+        runs.append(run)
+    size = max(1, math.ceil(len(pages) / max(count, 1)))
+    return [run[start:start + size] for run in runs for start in range(0, len(run), size)]
+
+
+def partition_pdf_parallel(pdf_path, output_folder, max_workers=None, cache_dir=".partition_cache",
+                           partition_kwargs=None):
+    """Returns (elements in page order, figure paths in output_folder), like one partition_pdf call."""
+    start = time.perf_counter()
+    partition_kwargs = {**PARTITION_KWARGS, **(partition_kwargs or {})}
+    max_workers = max_workers or os.cpu_count() or 1
+    os.makedirs(output_folder, exist_ok=True)
+    os.makedirs(cache_dir, exist_ok=True)
+    cache = PageCache(cache_dir)
+
+    reader = PdfReader(pdf_path)
+    page_count = len(reader.pages)
+    keys = {page: _page_key(_page_pdf(reader, [page - 1]), partition_kwargs) for page in range(1, page_count + 1)}
+
+    by_page, image_paths = {}, []
+    for page, key in keys.items():
+        entry = cache.get(key)
+        if entry is not None:
+            by_page[page], images = cache.restore(key, entry, page, output_folder)
+            image_paths += images
+    todo = [page for page in keys if page not in by_page]
+    shards = _shards(todo, max_workers)
+
+    with tempfile.TemporaryDirectory(prefix="partition-") as work:
+        jobs = []
+        for number, pages in enumerate(shards):
+            shard_pdf = os.path.join(work, f"shard-{number}.pdf")
+            with open(shard_pdf, "wb") as f:
+                f.write(_page_pdf(reader, [page - 1 for page in pages]))
+            image_dir = os.path.join(work, f"images-{number}")  # one folder per worker: no file name collisions
+            os.makedirs(image_dir)
+            jobs.append((shard_pdf, pages[0], image_dir))
+
+        if len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+                futures = [pool.submit(_partition_shard, *job, partition_kwargs) for job in jobs]
+                results = [future.result() for future in futures]
+        else:
+            results = [_partition_shard(*job, partition_kwargs) for job in jobs]
+
+        for (_, _, image_dir), pages, (dicts, images) in zip(jobs, shards, results):
+            for page in pages:
+                page_dicts = [d for d in dicts if d["metadata"]["page_number"] == page]
+                page_images = [name for name in images if int(IMAGE_NAME.match(name)["page"]) == page]
+                cache.set(keys[page], {"page": page, "elements": page_dicts, "images": page_images}, image_dir)
+                for element_dict in page_dicts:
+                    if element_dict["metadata"].get("image_path"):
+                        element_dict["metadata"]["image_path"] = os.path.join(output_folder, element_dict["metadata"]["image_path"])
+                by_page[page] = page_dicts
+            for name in images:
+                shutil.copy(os.path.join(image_dir, name), os.path.join(output_folder, name))
+                image_paths.append(os.path.join(output_folder, name))
+
+    merged = [element_dict for page in sorted(by_page) for element_dict in by_page[page]]
+    print(f"📄 {page_count} pages partitioned in {time.perf_counter() - start:.1f} s: "
+          f"{page_count - len(todo)} from cache, {len(todo)} in {len(shards)} shards on {min(max_workers, len(shards))} processes")
+    return elements_from_dicts(merged), sorted(image_paths, key=_page_order)
+
+
+def _page_order(path):
+    match = IMAGE_NAME.match(os.path.basename(path))
+    return (int(match["page"]), int(match["number"]), match["kind"]) if match else (math.inf, 0, path)
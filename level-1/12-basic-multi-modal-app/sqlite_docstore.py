@@ -0,0 +1,84 @@
+# sqlite_docstore.py
+
+"""
+A file-backed docstore for MultiVectorRetriever.
+
+main.py writes the parent documents (raw text, tables and image references)
+here and app.py reads them back, so the Streamlit UI works without re-running
+the partition/summarize pipeline. It lives next to the Chroma collection:
+
+    .chroma_store/chroma.sqlite3     summaries + embeddings (Chroma)
+    .chroma_store/docstore.sqlite3   uid -> parent Document (this store)
+
+mset writes all pairs in one transaction and mget reads all keys with one
+query, so each retriever lookup is a single batched read.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.stores import BaseStore
+
+MAX_VARIABLES = 900  # stay under SQLite's default limit of 999 bound parameters per statement
+
+
+class SQLiteDocStore(BaseStore[str, Document]):
+    def __init__(self, path=".chroma_store/docstore.sqlite3"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        # Streamlit serves each session from its own thread: share one connection behind a lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS docs (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.commit()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _dumps(document: Document) -> str:
+        return json.dumps({"page_content": document.page_content, "metadata": document.metadata}, ensure_ascii=False)
+
+    @staticmethod
+    def _loads(value: str) -> Document:
+        return Document(**json.loads(value))
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[Document]]:
+        found = {}
+        with self.lock:
+            for start in range(0, len(keys), MAX_VARIABLES):
+                chunk = list(keys[start:start + MAX_VARIABLES])
+                rows = self.conn.execute(
+                    f"SELECT key, value FROM docs WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                )
+                found.update(rows)
+        return [self._loads(found[key]) if key in found else None for key in keys]
+
+    def mset(self, key_value_pairs: Sequence[Tuple[str, Document]]) -> None:
+        rows = [(key, self._dumps(document)) for key, document in key_value_pairs]
+        with self.lock, self.conn:  # one transaction for the whole batch
+            self.conn.executemany("INSERT OR REPLACE INTO docs (key, value) VALUES (?, ?)", rows)
+
+    def mdelete(self, keys: Sequence[str]) -> None:
+        with self.lock, self.conn:
+            for start in range(0, len(keys), MAX_VARIABLES):
+                chunk = list(keys[start:start + MAX_VARIABLES])
+                self.conn.execute(f"DELETE FROM docs WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+
+    def yield_keys(self, *, prefix: Optional[str] = None) -> Iterator[str]:
+        with self.lock:
+            if prefix:
+                rows = self.conn.execute("SELECT key FROM docs WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)).fetchall()
+            else:
+                rows = self.conn.execute("SELECT key FROM docs").fetchall()
+        for (key,) in rows:
+            yield key
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
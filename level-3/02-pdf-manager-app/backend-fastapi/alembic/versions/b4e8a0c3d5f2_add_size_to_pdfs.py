@@ -0,0 +1,25 @@
+"""add size to pdfs
+
+Revision ID: b4e8a0c3d5f2
+Revises: 7c1d2e4f9a10
+Create Date: 2026-10-19 14:03:52.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e8a0c3d5f2'
+down_revision: Union[str, None] = '7c1d2e4f9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('pdfs', sa.Column('size', sa.BigInteger, nullable=True))
+
+def downgrade():
+    op.drop_column('pdfs', 'size')
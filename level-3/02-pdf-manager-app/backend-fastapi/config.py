@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from google.cloud import storage
 
@@ -15,11 +16,17 @@ class Settings:
         self.APP_NAME = os.getenv("APP_NAME", "Full Stack PDF CRUD App")
         self.GCP_CREDENTIALS_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "secrets/gcs-key.json")
         self.GCP_BUCKET_NAME = os.getenv("GCP_BUCKET_NAME")
+        # "gcs" (default) or "local" for offline testing
+        self.STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "gcs")
+        self.LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", "local-storage")
+        self.UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+        self.UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
 
     @staticmethod
+    @lru_cache()
     def get_gcs_client():
-        import os
-        from google.cloud import storage
+        # Built once per process so the credentials are read a single time
+        # and the underlying HTTP session (connection pool) is reused.
 
         # Load path from env var (Render sets this)
         credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "secrets/gcs-key.json")
@@ -27,4 +34,3 @@ class Settings:
 
         return storage.Client.from_service_account_json(credentials_path)
 
-
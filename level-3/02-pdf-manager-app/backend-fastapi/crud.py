@@ -1,8 +1,9 @@
-from sqlalchemy.orm import Session
+from typing import List
+from uuid import uuid4
+from sqlalchemy.orm import Session, undefer_group
 from fastapi import UploadFile, HTTPException
 import models, schemas
-from config import Settings
-from google.cloud import storage
+import storage
 from google.api_core.exceptions import GoogleAPIError
 
 
@@ -19,25 +20,34 @@ def read_pdfs(db: Session, selected: bool = None):
         pdfs = db.query(models.PDF).all()
     else:
         pdfs = db.query(models.PDF).filter(models.PDF.selected == selected).all()
-    return [schemas.PDFResponse.from_orm(pdf) for pdf in pdfs]
+    return [schemas.PDFSummary.from_orm(pdf) for pdf in pdfs]
 
 
 def read_pdf(db: Session, id: int):
-    pdf = db.query(models.PDF).filter(models.PDF.id == id).first()
+    pdf = db.query(models.PDF).options(undefer_group("detail")).filter(models.PDF.id == id).first()
     if pdf:
         return schemas.PDFResponse.from_orm(pdf)
     return None
 
 
-def update_pdf(db: Session, id: int, pdf: schemas.PDFRequest):
+def update_pdf(db: Session, id: int, pdf: schemas.PDFUpdateRequest):
     db_pdf = db.query(models.PDF).filter(models.PDF.id == id).first()
     if db_pdf is None:
         return None
     update_data = pdf.dict(exclude_unset=True)
+    old_file, old_sha256 = db_pdf.file, db_pdf.sha256
+    file_changed = update_data.get("file", old_file) != old_file
+    if file_changed:
+        # The row no longer points at the content it was hashed from: it takes on
+        # the hash of the blob it points at now, if that is one of our uploads
+        owner = _find_by_file(db, update_data["file"])
+        update_data["sha256"], update_data["size"] = (owner.sha256, owner.size) if owner is not None else (None, None)
     for key, value in update_data.items():
         setattr(db_pdf, key, value)
     db.commit()
     db.refresh(db_pdf)
+    if file_changed:
+        _release_blob(db, old_sha256, old_file)
     return schemas.PDFResponse.from_orm(db_pdf)
 
 
@@ -45,25 +55,101 @@ def delete_pdf(db: Session, id: int):
     db_pdf = db.query(models.PDF).filter(models.PDF.id == id).first()
     if db_pdf is None:
         return None
+    file_url, sha256 = db_pdf.file, db_pdf.sha256
     db.delete(db_pdf)
     db.commit()
+    _release_blob(db, sha256, file_url)
     return True
 
 
-def upload_pdf(db: Session, file: UploadFile, file_name: str):
-    client = Settings.get_gcs_client()
-    bucket = client.bucket(Settings().GCP_BUCKET_NAME)
-    blob = bucket.blob(file_name)
+# A row keeps its sha256 only while its file is the blob uploaded for that hash
+# (update_pdf clears or replaces it when the file changes), so hashed rows can
+# be trusted for deduplication
+def _find_by_hash(db: Session, sha256: str):
+    return db.query(models.PDF).options(undefer_group("detail")).filter(models.PDF.sha256 == sha256).first()
+
+
+def _find_by_file(db: Session, file_url: str):
+    return (
+        db.query(models.PDF)
+        .options(undefer_group("detail"))
+        .filter(models.PDF.file == file_url, models.PDF.sha256.isnot(None))
+        .first()
+    )
+
+
+def _blob_references(db: Session, sha256: str, file_url: str):
+    # The blob's reference count is the number of rows pointing at it
+    return db.query(models.PDF).filter(models.PDF.sha256 == sha256, models.PDF.file == file_url).count()
+
+
+def _release_blob(db: Session, sha256: str, file_url: str):
+    # Only blobs we uploaded ourselves (hashed) are removed from storage, and
+    # only once no other upload of the same content still points at them
+    if sha256 is not None and _blob_references(db, sha256, file_url) == 0:
+        try:
+            storage.delete_file(file_url)
+        except (GoogleAPIError, OSError) as e:
+            print(f"⚠️ Could not delete stored file {file_url}: {e}")
+
+
+def _save_upload(db: Session, name: str, file_url: str, sha256: str, size: int):
+    # Every upload gets its own row; identical content shares file_url
+    db_pdf = models.PDF(name=name, selected=False, file=file_url, sha256=sha256, size=size)
+    db.add(db_pdf)
+    db.commit()
+    db.refresh(db_pdf)
+    return db_pdf
 
+
+def upload_pdf(db: Session, file: UploadFile, file_name: str):
     try:
-        blob.upload_from_file(file.file, content_type=file.content_type)
-        file_url = f"https://storage.googleapis.com/{bucket.name}/{file_name}"
+        # Identical content is stored once: a re-upload gets a new row for the existing blob
+        sha256 = storage.hash_file(file.file)
+        existing = _find_by_hash(db, sha256)
+        if existing is not None:
+            db_pdf = _save_upload(db, file.filename, existing.file, sha256, existing.size)
+            return schemas.PDFResponse.from_orm(db_pdf)
 
-        db_pdf = models.PDF(name=file.filename, selected=False, file=file_url)
-        db.add(db_pdf)
-        db.commit()
-        db.refresh(db_pdf)
+        file_url, stats = storage.upload_file(file.file, file_name, file.content_type)
+        db_pdf = _save_upload(db, file.filename, file_url, sha256, stats.size)
 
         return schemas.PDFResponse.from_orm(db_pdf)
     except GoogleAPIError as e:
         raise HTTPException(status_code=500, detail=f"GCS error: {str(e)}")
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Storage error: {str(e)}")
+
+
+def upload_pdfs(db: Session, files: List[UploadFile]):
+    hashes = [storage.hash_file(file.file) for file in files]
+    known = {
+        db_pdf.sha256: (db_pdf.file, db_pdf.size)
+        for db_pdf in db.query(models.PDF)
+        .options(undefer_group("detail"))
+        .filter(models.PDF.sha256.in_(set(hashes)))
+        .all()
+    }
+
+    # Upload each new content hash once, even if it appears several times in the batch
+    pending = {}
+    for file, sha256 in zip(files, hashes):
+        if sha256 not in known and sha256 not in pending:
+            pending[sha256] = file
+    items = [(file.file, f"{uuid4()}-{file.filename}", file.content_type) for file in pending.values()]
+
+    try:
+        results = storage.upload_files(items)
+    except GoogleAPIError as e:
+        raise HTTPException(status_code=500, detail=f"GCS error: {str(e)}")
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Storage error: {str(e)}")
+    for sha256, (file_url, stats) in zip(pending, results):
+        known[sha256] = (file_url, stats.size)
+
+    db_pdfs = []
+    for file, sha256 in zip(files, hashes):
+        file_url, size = known[sha256]
+        db_pdfs.append(_save_upload(db, file.filename, file_url, sha256, size))
+
+    return [schemas.PDFResponse.from_orm(db_pdf) for db_pdf in db_pdfs]
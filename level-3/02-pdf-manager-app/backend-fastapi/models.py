@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, Column, LargeBinary, Integer, Text
+from sqlalchemy import BigInteger, Boolean, Column, LargeBinary, Integer, String, Text
+from sqlalchemy.orm import deferred
 from database import Base
 
 class PDF(Base):
@@ -6,5 +7,9 @@ class PDF(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(Text)
-    file = Column(Text)
-    selected = Column(Boolean, default=False)
\ No newline at end of file
+    # Heavy columns are deferred into the "detail" group so list queries skip them
+    file = deferred(Column(Text), group="detail")
+    selected = Column(Boolean, default=False)
+    # Content hash of uploaded files; identical uploads get their own rows but share one blob
+    sha256 = Column(String(64), index=True)
+    size = Column(BigInteger)
\ No newline at end of file
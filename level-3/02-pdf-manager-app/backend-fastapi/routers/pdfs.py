@@ -1,8 +1,10 @@
 from typing import List
 from sqlalchemy.orm import Session
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.responses import RedirectResponse
 import schemas
 import crud
+import storage
 from database import SessionLocal
 from uuid import uuid4
 
@@ -36,7 +38,15 @@ def upload_pdf(
 ):
     return crud.upload_pdf(db, file, file_name)
 
-@router.get("", response_model=List[schemas.PDFResponse])
+@router.post("/upload-many", response_model=List[schemas.PDFResponse], status_code=status.HTTP_201_CREATED)
+def upload_pdfs(files: List[UploadFile] = File(...), db: Session = Depends(get_db)):
+    return crud.upload_pdfs(db, files)
+
+@router.get("/upload-metrics")
+def get_upload_metrics():
+    return storage.upload_metrics.snapshot()
+
+@router.get("", response_model=List[schemas.PDFSummary])
 def get_pdfs(selected: bool = None, db: Session = Depends(get_db)):
     return crud.read_pdfs(db, selected)
 
@@ -47,8 +57,15 @@ def get_pdf_by_id(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="PDF not found")
     return pdf
 
+@router.get("/{id}/file")
+def get_pdf_file(id: int, db: Session = Depends(get_db)):
+    pdf = crud.read_pdf(db, id)
+    if pdf is None:
+        raise HTTPException(status_code=404, detail="PDF not found")
+    return RedirectResponse(pdf.file)
+
 @router.put("/{id}", response_model=schemas.PDFResponse)
-def update_pdf(id: int, pdf: schemas.PDFRequest, db: Session = Depends(get_db)):
+def update_pdf(id: int, pdf: schemas.PDFUpdateRequest, db: Session = Depends(get_db)):
     updated_pdf = crud.update_pdf(db, id, pdf)
     if updated_pdf is None:
         raise HTTPException(status_code=404, detail="PDF not found")
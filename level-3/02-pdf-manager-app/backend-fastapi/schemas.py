@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from typing import Optional
 
 class PDFRequest(BaseModel):
@@ -6,11 +6,30 @@ class PDFRequest(BaseModel):
     selected: bool
     file: str
 
-class PDFResponse(BaseModel):
+# Partial update: any field may be left out, but none may be set to null
+class PDFUpdateRequest(BaseModel):
+    name: Optional[str] = None
+    selected: Optional[bool] = None
+    file: Optional[str] = None
+
+    @validator("name", "selected", "file", pre=True)
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+# Lightweight projection used for listing (no file URL or other heavy columns)
+class PDFSummary(BaseModel):
     id: int
     name: str
     selected: bool
-    file: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
 
     class Config:
-        orm_mode = True  # ✅ enables from_orm()
\ No newline at end of file
+        orm_mode = True  # ✅ enables from_orm()
+
+# Full projection, loaded on demand for a single PDF
+class PDFResponse(PDFSummary):
+    file: str
\ No newline at end of file
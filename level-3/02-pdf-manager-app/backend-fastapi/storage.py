@@ -0,0 +1,169 @@
+import hashlib
+import os
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
+from typing import BinaryIO, List, Tuple
+
+from google.api_core.exceptions import NotFound
+
+from config import Settings
+
+# GCS resumable uploads require the chunk size to be a multiple of 256 KB
+GCS_CHUNK_MULTIPLE = 256 * 1024
+
+
+@dataclass
+class UploadStats:
+    name: str
+    size: int
+    seconds: float
+
+    @property
+    def mb_per_s(self) -> float:
+        if self.seconds <= 0:
+            return 0.0
+        return self.size / (1024 * 1024) / self.seconds
+
+
+class UploadMetrics:
+    """Process-wide upload counters (throughput and latency)."""
+
+    def __init__(self, window: int = 200):
+        self._lock = Lock()
+        self._latencies = deque(maxlen=window)
+        self.uploads = 0
+        self.total_bytes = 0
+        self.total_seconds = 0.0
+
+    def record(self, stats: UploadStats):
+        with self._lock:
+            self.uploads += 1
+            self.total_bytes += stats.size
+            self.total_seconds += stats.seconds
+            self._latencies.append(stats.seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            uploads = self.uploads
+            total_bytes = self.total_bytes
+            total_seconds = self.total_seconds
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+            return round(latencies[index] * 1000, 2)
+
+        total_mb = total_bytes / (1024 * 1024)
+        return {
+            "uploads": uploads,
+            "total_mb": round(total_mb, 3),
+            "avg_mb_per_s": round(total_mb / total_seconds, 3) if total_seconds else 0.0,
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+
+
+upload_metrics = UploadMetrics()
+
+
+def _stream_size(fileobj: BinaryIO) -> int:
+    # UploadFile spools to disk, so seeking to the end is cheap
+    position = fileobj.tell()
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell() - position
+    fileobj.seek(position)
+    return size
+
+
+def hash_file(fileobj: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of the spooled upload, read in chunks and rewound afterwards."""
+    digest = hashlib.sha256()
+    position = fileobj.tell()
+    for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+        digest.update(chunk)
+    fileobj.seek(position)
+    return digest.hexdigest()
+
+
+class GCSStorage:
+    def __init__(self, bucket_name: str, chunk_size: int, public: bool = False):
+        self.bucket_name = bucket_name
+        # Round down to a valid resumable chunk size (at least one 256 KB block)
+        self.chunk_size = max(GCS_CHUNK_MULTIPLE, chunk_size - chunk_size % GCS_CHUNK_MULTIPLE)
+        self.public = public
+
+    def upload(self, fileobj: BinaryIO, name: str, content_type: str = None) -> str:
+        bucket = Settings.get_gcs_client().bucket(self.bucket_name)
+        # Setting chunk_size switches the client to a resumable, chunked upload
+        # that reads straight from the spooled file instead of buffering it.
+        blob = bucket.blob(name, chunk_size=self.chunk_size)
+        extra = {"predefined_acl": "publicRead"} if self.public else {}
+        blob.upload_from_file(fileobj, content_type=content_type, **extra)
+        return f"https://storage.googleapis.com/{self.bucket_name}/{name}"
+
+    def delete(self, file_url: str):
+        name = file_url.split(f"/{self.bucket_name}/", 1)[-1]
+        try:
+            Settings.get_gcs_client().bucket(self.bucket_name).blob(name).delete()
+        except NotFound:
+            pass
+
+
+class LocalStorage:
+    """Filesystem backend for offline development and testing."""
+
+    def __init__(self, root: str, chunk_size: int):
+        self.root = root
+        self.chunk_size = chunk_size
+        os.makedirs(self.root, exist_ok=True)
+
+    def upload(self, fileobj: BinaryIO, name: str, content_type: str = None) -> str:
+        path = os.path.abspath(os.path.join(self.root, os.path.basename(name)))
+        with open(path, "wb") as out:
+            shutil.copyfileobj(fileobj, out, self.chunk_size)
+        return path
+
+    def delete(self, file_url: str):
+        path = os.path.join(self.root, os.path.basename(file_url))
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@lru_cache()
+def get_storage():
+    settings = Settings()
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(settings.LOCAL_STORAGE_DIR, settings.UPLOAD_CHUNK_SIZE)
+    return GCSStorage(settings.GCP_BUCKET_NAME, settings.UPLOAD_CHUNK_SIZE)
+
+
+def upload_file(fileobj: BinaryIO, name: str, content_type: str = None) -> Tuple[str, UploadStats]:
+    size = _stream_size(fileobj)
+    start = time.perf_counter()
+    url = get_storage().upload(fileobj, name, content_type)
+    stats = UploadStats(name=name, size=size, seconds=time.perf_counter() - start)
+    upload_metrics.record(stats)
+    print(f"📤 Uploaded {name}: {stats.size} bytes in {stats.seconds * 1000:.1f} ms ({stats.mb_per_s:.2f} MB/s)")
+    return url, stats
+
+
+def delete_file(file_url: str):
+    get_storage().delete(file_url)
+
+
+def upload_files(items: List[Tuple[BinaryIO, str, str]], max_workers: int = None) -> List[Tuple[str, UploadStats]]:
+    """Upload several (fileobj, name, content_type) items concurrently, preserving order."""
+    if not items:
+        return []
+    max_workers = max_workers or Settings().UPLOAD_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(upload_file, *item) for item in items]
+        return [future.result() for future in futures]
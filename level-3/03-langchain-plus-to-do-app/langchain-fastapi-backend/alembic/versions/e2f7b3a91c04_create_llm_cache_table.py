@@ -0,0 +1,35 @@
+"""create llm_cache table
+
+Revision ID: e2f7b3a91c04
+Revises: ad1c380734f8
+Create Date: 2026-10-19 16:41:07.530219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f7b3a91c04'
+down_revision: Union[str, None] = 'ad1c380734f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute("""
+    create table llm_cache(
+        key varchar(64) primary key,
+        llm_hash varchar(64) not null,
+        response text not null,
+        created_at timestamp not null,
+        last_used_at timestamp not null,
+        hits integer not null default 0
+    )
+    """)
+    op.execute("create index ix_llm_cache_last_used_at on llm_cache (last_used_at);")
+
+def downgrade():
+    op.execute("drop table llm_cache;")
@@ -0,0 +1,89 @@
+"""Benchmark the todo LLM endpoints' execution models with a fake LLM.
+
+Compares, for N simultaneous requests:
+  - blocking: sync chain.invoke inside an async endpoint (previous behaviour)
+  - async:    await chain.ainvoke per request
+  - batch:    one /todos/write-poems style call via chains.generate_many
+
+No OpenAI calls are made. Run from this folder:
+    python benchmark_llm_concurrency.py --requests 50 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# chains.py builds an OpenAI client and the response cache at import; neither is used here
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("LLM_CACHE_URL", "sqlite://")
+for name in ("DATABASE_USER", "DATABASE_PASSWORD", "DATABASE_HOST", "DATABASE_NAME"):
+    os.environ.setdefault(name, "benchmark")
+os.environ.setdefault("DATABASE_PORT", "5432")
+
+from langchain_core.language_models.llms import LLM
+
+import chains
+
+
+class SlowFakeLLM(LLM):
+    """Returns a canned poem after a fixed delay, like a remote model would."""
+
+    latency: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return "A poem about " + prompt.strip().splitlines()[-1].strip()
+
+    async def _acall(self, prompt, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return "A poem about " + prompt.strip().splitlines()[-1].strip()
+
+
+async def measure(label, coro_factory, requests):
+    # A heartbeat task shows how long the event loop was unable to run anything else
+    max_lag = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal max_lag
+        while running:
+            tick = time.perf_counter()
+            await asyncio.sleep(0.01)
+            max_lag = max(max_lag, time.perf_counter() - tick - 0.01)
+
+    beat = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await coro_factory()
+    elapsed = time.perf_counter() - start
+    running = False
+    await beat
+    print(f"{label:<10} {elapsed:8.2f} s  {requests / elapsed:8.1f} req/s  max loop stall {max_lag * 1000:8.1f} ms")
+
+
+async def main(requests: int, latency: float, concurrency: int):
+    chain = chains.write_poem_prompt | SlowFakeLLM(latency=latency)
+    texts = [f"todo number {i}" for i in range(requests)]
+
+    async def blocking_handler(text):
+        return chain.invoke({'text': text})
+
+    async def async_handler(text):
+        return await chain.ainvoke({'text': text})
+
+    print(f"{requests} requests, {latency * 1000:.0f} ms fake LLM latency, batch concurrency {concurrency}\n")
+    await measure("blocking", lambda: asyncio.gather(*(blocking_handler(t) for t in texts)), requests)
+    await measure("async", lambda: asyncio.gather(*(async_handler(t) for t in texts)), requests)
+    await measure("batch", lambda: chains.generate_many(chain, texts, concurrency), requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("POEM_CONCURRENCY", "5")))
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency, args.concurrency))
@@ -0,0 +1,45 @@
+import asyncio
+from typing import List
+
+from langchain import OpenAI, PromptTemplate
+
+from llm_cache import llm_cache
+
+# LANGCHAIN
+# temperature=0 makes outputs repeatable, so responses are served from the cache
+langchain_llm = OpenAI(temperature=0, cache=llm_cache)
+
+summarize_template_string = """
+        Provide a summary for the following text:
+        {text}
+"""
+
+summarize_prompt = PromptTemplate(
+    template=summarize_template_string,
+    input_variables=['text'],
+)
+
+write_poem_template_string = """
+        Write a short poem with the following text:
+        {text}
+"""
+
+write_poem_prompt = PromptTemplate(
+    template=write_poem_template_string,
+    input_variables=['text'],
+)
+
+# Runnable chains expose ainvoke, so LLM calls don't block the event loop
+summarize_chain = summarize_prompt | langchain_llm
+write_poem_chain = write_poem_prompt | langchain_llm
+
+
+async def generate_many(chain, texts: List[str], max_concurrency: int) -> List[str]:
+    """Run the chain over many texts concurrently, at most max_concurrency at a time."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def generate(text: str) -> str:
+        async with semaphore:
+            return await chain.ainvoke({'text': text})
+
+    return await asyncio.gather(*(generate(text) for text in texts))
@@ -1,3 +1,4 @@
+from typing import List
 from sqlalchemy.orm import Session
 import models, schemas
 
@@ -17,6 +18,9 @@ def read_todos(db: Session, completed: bool):
 def read_todo(db: Session, id: int):
     return db.query(models.ToDo).filter(models.ToDo.id == id).first()
 
+def read_todos_by_ids(db: Session, ids: List[int]):
+    return db.query(models.ToDo).filter(models.ToDo.id.in_(ids)).order_by(models.ToDo.id).all()
+
 def update_todo(db: Session, id: int, todo: schemas.ToDoRequest):
     db_todo = db.query(models.ToDo).filter(models.ToDo.id == id).first()
     if db_todo is None:
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import engine as app_engine
+
+
+class SQLTTLCache(BaseCache):
+    """LLM response cache stored in a SQL table, with a TTL and an LRU size limit.
+
+    Entries are keyed by the LLM configuration (model name and parameters) and
+    the fully rendered prompt, so any change to the template or to its inputs
+    (e.g. renaming a todo) is a cache miss.
+    """
+
+    def __init__(self, engine, ttl_seconds: int, max_entries: int):
+        self.Session = sessionmaker(bind=engine)
+        self.ttl = timedelta(seconds=ttl_seconds) if ttl_seconds > 0 else None
+        self.max_entries = max_entries
+
+    @staticmethod
+    def _hash(*parts: str) -> str:
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._hash(llm_string, prompt)
+        now = datetime.utcnow()
+        with self.Session() as session:
+            entry = session.get(models.LLMCacheEntry, key)
+            if entry is None:
+                return None
+            if self.ttl is not None and entry.created_at < now - self.ttl:
+                session.delete(entry)
+                session.commit()
+                return None
+            entry.last_used_at = now
+            entry.hits += 1
+            session.commit()
+            return [loads(generation) for generation in json.loads(entry.response)]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        now = datetime.utcnow()
+        entry = models.LLMCacheEntry(
+            key=self._hash(llm_string, prompt),
+            llm_hash=self._hash(llm_string),
+            response=json.dumps([dumps(generation) for generation in return_val]),
+            created_at=now,
+            last_used_at=now,
+            hits=0,
+        )
+        with self.Session() as session:
+            try:
+                session.merge(entry)
+                session.commit()
+            except IntegrityError:
+                # Another worker cached the same prompt concurrently
+                session.rollback()
+                return
+            self._evict(session)
+
+    def _evict(self, session):
+        # Keep the most recently used max_entries rows
+        stale = (
+            select(models.LLMCacheEntry.key)
+            .order_by(models.LLMCacheEntry.last_used_at.desc())
+            .offset(self.max_entries)
+        )
+        session.execute(delete(models.LLMCacheEntry).where(models.LLMCacheEntry.key.in_(stale)))
+        if self.ttl is not None:
+            expired = models.LLMCacheEntry.created_at < datetime.utcnow() - self.ttl
+            session.execute(delete(models.LLMCacheEntry).where(expired))
+        session.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self.Session() as session:
+            session.execute(delete(models.LLMCacheEntry))
+            session.commit()
+
+
+def build_llm_cache() -> SQLTTLCache:
+    # Defaults to the app's Postgres (table created by Alembic). LLM_CACHE_URL
+    # can point at a local SQLite file instead, e.g. sqlite:///llm_cache.db
+    url = os.getenv("LLM_CACHE_URL")
+    engine = create_engine(url) if url else app_engine
+    if url:
+        models.LLMCacheEntry.__table__.create(engine, checkfirst=True)
+    return SQLTTLCache(
+        engine,
+        ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+    )
+
+
+llm_cache = build_llm_cache()
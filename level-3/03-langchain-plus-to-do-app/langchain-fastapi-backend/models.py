@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -9,4 +9,15 @@ class ToDo(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
-    completed = Column(Boolean, default=False)
\ No newline at end of file
+    completed = Column(Boolean, default=False)
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True)
+    llm_hash = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    last_used_at = Column(DateTime, nullable=False, index=True)
+    hits = Column(Integer, default=0, nullable=False)
\ No newline at end of file
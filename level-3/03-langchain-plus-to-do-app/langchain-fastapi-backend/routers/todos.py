@@ -1,11 +1,14 @@
+import os
 from typing import List
 from sqlalchemy.orm import Session
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import schemas
 import crud
+import chains
+import summarization
 from database import SessionLocal
-from langchain import OpenAI, PromptTemplate
-from langchain.chains import LLMChain
 
 router = APIRouter(
     prefix="/todos"
@@ -50,47 +53,34 @@ def delete_todo(id: int, db: Session = Depends(get_db)):
     
     
 # LANGCHAIN
-langchain_llm = OpenAI(temperature=0)
-
-summarize_template_string = """
-        Provide a summary for the following text:
-        {text}
-"""
-
-summarize_prompt = PromptTemplate(
-    template=summarize_template_string,
-    input_variables=['text'],
-)
-
-summarize_chain = LLMChain(
-    llm=langchain_llm,
-    prompt=summarize_prompt,
-)
+# Max concurrent LLM calls for one batch request
+POEM_CONCURRENCY = int(os.getenv("POEM_CONCURRENCY", "5"))
 
 @router.post('/summarize-text')
-async def summarize_text(text: str):
-    summary = summarize_chain.run(text=text)
+async def summarize_text(request: schemas.SummarizeRequest, stream: bool = False):
+    # Long texts are split by tokens and summarized map-reduce style
+    if stream:
+        return StreamingResponse(summarization.stream_summary(request.text), media_type="text/plain")
+    summary = await summarization.summarize(request.text)
     return {'summary': summary}
 
-write_poem_template_string = """
-        Write a short poem with the following text:
-        {text}
-"""
-
-write_poem_prompt = PromptTemplate(
-    template=write_poem_template_string,
-    input_variables=['text'],
-)
-
-write_poem_chain = LLMChain(
-    llm=langchain_llm,
-    prompt=write_poem_prompt,
-)
-
 @router.post("/write-poem/{id}")
 async def write_poem_by_id(id: int, db: Session = Depends(get_db)):
-    todo = crud.read_todo(db, id)
+    # The session is synchronous, so query it from the threadpool
+    todo = await run_in_threadpool(crud.read_todo, db, id)
     if todo is None:
         raise HTTPException(status_code=404, detail="to do not found")
-    poem = write_poem_chain.run(text=todo.name)
-    return {'poem': poem}
\ No newline at end of file
+    poem = await chains.write_poem_chain.ainvoke({'text': todo.name})
+    return {'poem': poem}
+
+@router.post("/write-poems")
+async def write_poems(request: schemas.ToDoIdsRequest, db: Session = Depends(get_db)):
+    todos = await run_in_threadpool(crud.read_todos_by_ids, db, request.ids)
+    found = {todo.id for todo in todos}
+    poems = await chains.generate_many(
+        chains.write_poem_chain, [todo.name for todo in todos], POEM_CONCURRENCY
+    )
+    return {
+        'poems': [{'id': todo.id, 'poem': poem} for todo, poem in zip(todos, poems)],
+        'not_found': [id for id in request.ids if id not in found],
+    }
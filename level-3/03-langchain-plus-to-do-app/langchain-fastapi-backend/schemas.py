@@ -1,9 +1,16 @@
+from typing import List
 from pydantic import BaseModel
 
 class ToDoRequest(BaseModel):
     name: str
     completed: bool
 
+class ToDoIdsRequest(BaseModel):
+    ids: List[int]
+
+class SummarizeRequest(BaseModel):
+    text: str
+
 class ToDoResponse(BaseModel):
     name: str
     completed: bool
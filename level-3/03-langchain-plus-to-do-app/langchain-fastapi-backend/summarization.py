@@ -0,0 +1,46 @@
+import os
+from functools import lru_cache
+from typing import AsyncIterator
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+import chains
+
+# Chunk size is measured in model tokens, not characters
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+SUMMARY_CHUNK_OVERLAP = int(os.getenv("SUMMARY_CHUNK_OVERLAP", "200"))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "5"))
+MAX_REDUCE_LEVELS = 5
+
+
+@lru_cache()
+def get_splitter() -> RecursiveCharacterTextSplitter:
+    # Built on first use: loading the tiktoken encoding may download it
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        chunk_size=SUMMARY_CHUNK_TOKENS,
+        chunk_overlap=SUMMARY_CHUNK_OVERLAP,
+    )
+
+
+async def reduce_to_one_chunk(text: str) -> str:
+    """Summarize chunks concurrently, level by level, until the text fits in one prompt."""
+    splitter = get_splitter()
+    chunks = splitter.split_text(text)
+    for _ in range(MAX_REDUCE_LEVELS):
+        if len(chunks) <= 1:
+            break
+        summaries = await chains.generate_many(chains.summarize_chain, chunks, SUMMARY_CONCURRENCY)
+        chunks = splitter.split_text("\n\n".join(summaries))
+    return "\n\n".join(chunks)
+
+
+async def summarize(text: str) -> str:
+    reduced = await reduce_to_one_chunk(text)
+    return await chains.summarize_chain.ainvoke({'text': reduced})
+
+
+async def stream_summary(text: str) -> AsyncIterator[str]:
+    # Intermediate levels run to completion; only the final pass is streamed
+    reduced = await reduce_to_one_chunk(text)
+    async for token in chains.summarize_chain.astream({'text': reduced}):
+        yield token
@@ -0,0 +1,32 @@
+"""one row per upload: drop ref_count and the unique sha256 index
+
+Revision ID: 5e2b9d7a4c18
+Revises: f3a5c7e9b1d2
+Create Date: 2026-10-19 21:34:08.257913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b9d7a4c18'
+down_revision: Union[str, None] = 'f3a5c7e9b1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Duplicate uploads now get their own rows; a blob is referenced by every
+    # row with its sha256 and file URL, so the hash is no longer unique
+    op.drop_index('ix_pdfs_sha256', table_name='pdfs')
+    op.create_index('ix_pdfs_sha256', 'pdfs', ['sha256'], unique=False)
+    op.drop_column('pdfs', 'ref_count')
+
+def downgrade():
+    # Fails if the same content was uploaded more than once since the upgrade
+    op.add_column('pdfs', sa.Column('ref_count', sa.Integer, nullable=False, server_default='1'))
+    op.drop_index('ix_pdfs_sha256', table_name='pdfs')
+    op.create_index('ix_pdfs_sha256', 'pdfs', ['sha256'], unique=True)
@@ -0,0 +1,30 @@
+"""add sha256 and ref_count to pdfs
+
+Revision ID: 7c1d2e4f9a10
+Revises: 30a84d438097
+Create Date: 2026-10-19 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d2e4f9a10'
+down_revision: Union[str, None] = '30a84d438097'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('pdfs', sa.Column('sha256', sa.String(64), nullable=True))
+    op.add_column('pdfs', sa.Column('ref_count', sa.Integer, nullable=False, server_default='1'))
+    # NULL hashes (rows created from a URL) are allowed to repeat
+    op.create_index('ix_pdfs_sha256', 'pdfs', ['sha256'], unique=True)
+
+def downgrade():
+    op.drop_index('ix_pdfs_sha256', table_name='pdfs')
+    op.drop_column('pdfs', 'ref_count')
+    op.drop_column('pdfs', 'sha256')
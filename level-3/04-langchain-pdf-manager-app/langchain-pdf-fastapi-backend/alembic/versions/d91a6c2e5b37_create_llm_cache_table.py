@@ -0,0 +1,35 @@
+"""create llm_cache table
+
+Revision ID: d91a6c2e5b37
+Revises: b4e8a0c3d5f2
+Create Date: 2026-10-19 16:52:44.871530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91a6c2e5b37'
+down_revision: Union[str, None] = 'b4e8a0c3d5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'llm_cache',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('llm_hash', sa.String(64), nullable=False),
+        sa.Column('response', sa.Text, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('last_used_at', sa.DateTime, nullable=False),
+        sa.Column('hits', sa.Integer, nullable=False, server_default='0')
+    )
+    op.create_index('ix_llm_cache_last_used_at', 'llm_cache', ['last_used_at'])
+
+def downgrade():
+    op.drop_index('ix_llm_cache_last_used_at', table_name='llm_cache')
+    op.drop_table('llm_cache')
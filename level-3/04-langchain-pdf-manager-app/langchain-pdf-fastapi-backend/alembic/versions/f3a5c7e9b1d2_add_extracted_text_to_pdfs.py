@@ -0,0 +1,25 @@
+"""add extracted_text to pdfs
+
+Revision ID: f3a5c7e9b1d2
+Revises: d91a6c2e5b37
+Create Date: 2026-10-19 18:20:15.904362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a5c7e9b1d2'
+down_revision: Union[str, None] = 'd91a6c2e5b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('pdfs', sa.Column('extracted_text', sa.Text, nullable=True))
+
+def downgrade():
+    op.drop_column('pdfs', 'extracted_text')
@@ -2,6 +2,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
+from functools import lru_cache
 from google.cloud import storage
 from pydantic_settings import BaseSettings
 
@@ -14,9 +15,18 @@ class Settings(BaseSettings):
     APP_NAME: str = "Full Stack PDF CRUD App"
     GOOGLE_APPLICATION_CREDENTIALS: str = "secrets/gcs-key.json"
     GCP_BUCKET_NAME: str
+    STORAGE_BACKEND: str = "gcs"  # "gcs" or "local" for offline testing
+    LOCAL_STORAGE_DIR: str = "local-storage"
+    UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024
+    UPLOAD_CONCURRENCY: int = 4
+    PDF_TEXT_CACHE_DIR: str = "pdf-text-cache"
+    PDF_TEXT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
 
     @staticmethod
+    @lru_cache()
     def get_gcs_client():
+        # One client per process: credentials are read once and the HTTP
+        # connection pool is reused across uploads.
         credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "secrets/gcs-key.json")
         print("📁 Using GCS creds path:", credentials_path)
         return storage.Client.from_service_account_json(credentials_path)
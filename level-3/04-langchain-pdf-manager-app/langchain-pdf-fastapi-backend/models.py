@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, Column, LargeBinary, Integer, Text
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, LargeBinary, Integer, String, Text
+from sqlalchemy.orm import deferred
 from database import Base
 
 class PDF(Base):
@@ -6,5 +7,21 @@ class PDF(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(Text)
-    file = Column(Text)
+    # Heavy columns are deferred into the "detail" group so list queries skip them
+    file = deferred(Column(Text), group="detail")
     selected = Column(Boolean, default=False)
+    # Content hash of uploaded files; identical uploads get their own rows but share one blob
+    sha256 = Column(String(64), index=True)
+    size = Column(BigInteger)
+    # Full text extracted from the PDF, filled on first use (e.g. summarization)
+    extracted_text = deferred(Column(Text), group="text")
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True)
+    llm_hash = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    last_used_at = Column(DateTime, nullable=False, index=True)
+    hits = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,152 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from functools import lru_cache
+from threading import Lock
+from typing import List
+
+import requests
+from langchain_core.documents import Document
+
+from config import Settings
+from pdf_extraction import load_pdf
+
+
+class PDFTextCache:
+    """On-disk cache of per-page PDF text, keyed by the PDF's URL (or local path).
+
+    Remote PDFs are revalidated with a conditional GET (ETag / Last-Modified),
+    so an unchanged file costs a 304 instead of a download and a re-parse.
+    Each document is stored as one gzip-compressed JSONL file (one page per
+    line), and the least recently used documents are evicted once the cache
+    grows past max_bytes.
+    """
+
+    def __init__(self, root: str, max_bytes: int, timeout: float = 30.0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._lock = Lock()
+        self._http = requests.Session()  # reuse connections across fetches
+        os.makedirs(self.root, exist_ok=True)
+        self._index_path = os.path.join(self.root, "index.json")
+        self._index = self._read_index()
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _pages_path(self, source: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(source.encode("utf-8")).hexdigest() + ".jsonl.gz")
+
+    def load(self, source: str) -> List[Document]:
+        """Return one Document per page, fetching and parsing only when the PDF changed."""
+        with self._lock:
+            entry = self._index.get(source)
+        if entry is not None and not os.path.exists(entry["path"]):
+            entry = None
+
+        documents, validators = self._fetch(source, entry)
+        if documents is None:
+            try:
+                documents = self._read_pages(entry["path"])
+            except FileNotFoundError:
+                # Evicted by a concurrent load since the check above: a cache miss
+                documents, validators = self._fetch(source, None)
+
+        with self._lock:
+            if not validators:
+                entry["last_used"] = time.time()
+            else:
+                path = self._pages_path(source)
+                entry = {"path": path, "size": self._write_pages(path, documents), **validators}
+                entry["last_used"] = time.time()
+                self._index[source] = entry
+                self._evict()
+            self._write_index()
+        return documents
+
+    def _fetch(self, source: str, entry):
+        if source.startswith(("http://", "https://")):
+            return self._load_remote(source, entry)
+        return self._load_local(source, entry)
+
+    def _load_remote(self, url: str, entry):
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with self._http.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 304 and entry is not None:
+                return None, {}
+            response.raise_for_status()
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    tmp.write(chunk)
+            validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+        try:
+            return self._parse(tmp.name, url), validators
+        finally:
+            os.remove(tmp.name)
+
+    def _load_local(self, path: str, entry):
+        stat = os.stat(path)
+        validators = {"mtime": stat.st_mtime, "file_size": stat.st_size}
+        if entry is not None and all(entry.get(k) == v for k, v in validators.items()):
+            return None, {}
+        return self._parse(path, path), validators
+
+    @staticmethod
+    def _parse(path: str, source: str) -> List[Document]:
+        return load_pdf(path, source=source)
+
+    @staticmethod
+    def _write_pages(path: str, documents: List[Document]) -> int:
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for document in documents:
+                f.write(json.dumps({"text": document.page_content, "metadata": document.metadata}) + "\n")
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    @staticmethod
+    def _read_pages(path: str) -> List[Document]:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return [
+                Document(page_content=page["text"], metadata=page["metadata"])
+                for page in map(json.loads, f)
+            ]
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        for source, entry in sorted(self._index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            del self._index[source]
+            if os.path.exists(entry["path"]):
+                os.remove(entry["path"])
+
+
+@lru_cache()
+def get_pdf_text_cache() -> PDFTextCache:
+    settings = Settings()
+    return PDFTextCache(settings.PDF_TEXT_CACHE_DIR, settings.PDF_TEXT_CACHE_MAX_BYTES)
@@ -2,32 +2,33 @@ from typing import List
 
 # === LangChain + OpenAI (Plugin-based) Imports ===
 from langchain_openai import OpenAI, OpenAIEmbeddings
-from langchain_core.prompts import PromptTemplate
-from langchain.chains.llm import LLMChain
 from langchain.chains.retrieval_qa.base import RetrievalQA
 
 # === LangChain Community Components ===
 from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders.pdf import PyPDFLoader
 
 # === LangChain Text Processing ===
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 # === Pydantic schema for question-based endpoint ===
-from schemas import QuestionRequest
+from schemas import QuestionRequest, SummarizeRequest
 
 
 from sqlalchemy.orm import Session
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.responses import RedirectResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import schemas
 import crud
+import storage
 from database import SessionLocal
+import summarization
+from pdf_text_cache import get_pdf_text_cache
 
 from uuid import uuid4
 
 # === Instantiate Language Models ===
-llm = OpenAI()  # Used in RetrievalQA
-langchain_llm = OpenAI(temperature=0)  # Used in summarization
+llm = OpenAI()  # Used in RetrievalQA (the summarization model lives in summarization.py)
 
 # === API Router for /pdfs endpoints ===
 router = APIRouter(prefix="/pdfs")
@@ -54,7 +55,15 @@ def upload_pdf(
 ):
     return crud.upload_pdf(db, file, file_name)
 
-@router.get("", response_model=List[schemas.PDFResponse])
+@router.post("/upload-many", response_model=List[schemas.PDFResponse], status_code=status.HTTP_201_CREATED)
+def upload_pdfs(files: List[UploadFile] = File(...), db: Session = Depends(get_db)):
+    return crud.upload_pdfs(db, files)
+
+@router.get("/upload-metrics")
+def get_upload_metrics():
+    return storage.upload_metrics.snapshot()
+
+@router.get("", response_model=List[schemas.PDFSummary])
 def get_pdfs(selected: bool = None, db: Session = Depends(get_db)):
     return crud.read_pdfs(db, selected)
 
@@ -65,8 +74,15 @@ def get_pdf_by_id(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="PDF not found")
     return pdf
 
+@router.get("/{id}/file")
+def get_pdf_file(id: int, db: Session = Depends(get_db)):
+    pdf = crud.read_pdf(db, id)
+    if pdf is None:
+        raise HTTPException(status_code=404, detail="PDF not found")
+    return RedirectResponse(pdf.file)
+
 @router.put("/{id}", response_model=schemas.PDFResponse)
-def update_pdf(id: int, pdf: schemas.PDFRequest, db: Session = Depends(get_db)):
+def update_pdf(id: int, pdf: schemas.PDFUpdateRequest, db: Session = Depends(get_db)):
     updated_pdf = crud.update_pdf(db, id, pdf)
     if updated_pdf is None:
         raise HTTPException(status_code=404, detail="PDF not found")
@@ -80,24 +96,22 @@ def delete_pdf(id: int, db: Session = Depends(get_db)):
 
 # === LangChain Summarization Route ===
 
-summarize_template_string = """
-        Provide a summary for the following text:
-        {text}
-"""
-
-summarize_prompt = PromptTemplate(
-    template=summarize_template_string,
-    input_variables=['text'],
-)
-
-summarize_chain = LLMChain(
-    llm=langchain_llm,
-    prompt=summarize_prompt,
-)
-
 @router.post('/summarize-text')
-async def summarize_text(text: str):
-    summary = summarize_chain.run(text=text)
+async def summarize_text(request: SummarizeRequest, stream: bool = False, db: Session = Depends(get_db)):
+    if (request.text is None) == (request.pdf_id is None):
+        raise HTTPException(status_code=422, detail="Provide either text or pdf_id")
+
+    text = request.text
+    if request.pdf_id is not None:
+        # Reuses the text extracted on a previous call instead of re-downloading the PDF
+        text = await run_in_threadpool(crud.read_pdf_text, db, request.pdf_id)
+        if text is None:
+            raise HTTPException(status_code=404, detail="PDF not found")
+
+    # Long texts are split by tokens and summarized map-reduce style
+    if stream:
+        return StreamingResponse(summarization.stream_summary(text), media_type="text/plain")
+    summary = await summarization.summarize(text)
     return {'summary': summary}
 
 # === LangChain PDF Q&A Route ===
@@ -108,9 +122,8 @@ def qa_pdf_by_id(id: int, question_request: QuestionRequest, db: Session = Depen
     if pdf is None:
         raise HTTPException(status_code=404, detail="PDF not found")
 
-    # Load PDF and chunk it
-    loader = PyPDFLoader(pdf.file)
-    document = loader.load()
+    # Load PDF pages (downloaded and parsed only when the file changed) and chunk them
+    document = get_pdf_text_cache().load(pdf.file)
 
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=3000, chunk_overlap=400)
     document_chunks = text_splitter.split_documents(document)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
 
 class PDFRequest(BaseModel):
@@ -6,15 +6,39 @@ class PDFRequest(BaseModel):
     selected: bool
     file: str
 
-class PDFResponse(BaseModel):
+# Partial update: any field may be left out, but none may be set to null
+class PDFUpdateRequest(BaseModel):
+    name: Optional[str] = None
+    selected: Optional[bool] = None
+    file: Optional[str] = None
+
+    @field_validator("name", "selected", "file", mode="before")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+# Lightweight projection used for listing (no file URL or other heavy columns)
+class PDFSummary(BaseModel):
     id: int
     name: str
     selected: bool
-    file: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+# Full projection, loaded on demand for a single PDF
+class PDFResponse(PDFSummary):
+    file: str
+
+# ✅ For summarization: raw text, or the id of a stored PDF
+class SummarizeRequest(BaseModel):
+    text: Optional[str] = None
+    pdf_id: Optional[int] = None
+
 # ✅ For PDF Question Answering
 class QuestionRequest(BaseModel):
     question: str
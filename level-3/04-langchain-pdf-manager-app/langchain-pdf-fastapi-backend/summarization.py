@@ -0,0 +1,74 @@
+import asyncio
+import os
+from functools import lru_cache
+from typing import AsyncIterator, List
+
+from langchain_openai import OpenAI
+from langchain_core.prompts import PromptTemplate
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from llm_cache import llm_cache
+
+# === Summarization Settings (chunk sizes are in model tokens) ===
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+SUMMARY_CHUNK_OVERLAP = int(os.getenv("SUMMARY_CHUNK_OVERLAP", "200"))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "5"))
+MAX_REDUCE_LEVELS = 5
+
+# === Summarization Chain ===
+langchain_llm = OpenAI(temperature=0, cache=llm_cache)  # deterministic, so cached
+
+summarize_template_string = """
+        Provide a summary for the following text:
+        {text}
+"""
+
+summarize_prompt = PromptTemplate(
+    template=summarize_template_string,
+    input_variables=['text'],
+)
+
+summarize_chain = summarize_prompt | langchain_llm
+
+
+@lru_cache()
+def get_splitter() -> RecursiveCharacterTextSplitter:
+    # Built on first use: loading the tiktoken encoding may download it
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        chunk_size=SUMMARY_CHUNK_TOKENS,
+        chunk_overlap=SUMMARY_CHUNK_OVERLAP,
+    )
+
+
+async def summarize_many(texts: List[str]) -> List[str]:
+    semaphore = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+
+    async def summarize_one(text: str) -> str:
+        async with semaphore:
+            return await summarize_chain.ainvoke({'text': text})
+
+    return await asyncio.gather(*(summarize_one(text) for text in texts))
+
+
+async def reduce_to_one_chunk(text: str) -> str:
+    """Summarize chunks concurrently, level by level, until the text fits in one prompt."""
+    splitter = get_splitter()
+    chunks = splitter.split_text(text)
+    for _ in range(MAX_REDUCE_LEVELS):
+        if len(chunks) <= 1:
+            break
+        summaries = await summarize_many(chunks)
+        chunks = splitter.split_text("\n\n".join(summaries))
+    return "\n\n".join(chunks)
+
+
+async def summarize(text: str) -> str:
+    reduced = await reduce_to_one_chunk(text)
+    return await summarize_chain.ainvoke({'text': reduced})
+
+
+async def stream_summary(text: str) -> AsyncIterator[str]:
+    # Intermediate levels run to completion; only the final pass is streamed
+    reduced = await reduce_to_one_chunk(text)
+    async for token in summarize_chain.astream({'text': reduced}):
+        yield token
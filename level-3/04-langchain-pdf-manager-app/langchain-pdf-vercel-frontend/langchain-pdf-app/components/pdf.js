@@ -21,7 +21,7 @@ export default function PDFComponent(props) {
         onChange={(e) => onChange(e, pdf.id)}
       />
       <a
-        href={pdf.file}
+        href={`${process.env.NEXT_PUBLIC_API_URL}/pdfs/${pdf.id}/file`}
         target="_blank"
         rel="noopener noreferrer"
         className={styles.viewPdfLink}
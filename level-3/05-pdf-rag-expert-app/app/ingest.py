@@ -2,12 +2,16 @@ import os
 import hashlib
 from pathlib import Path
 from typing import List
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_community.vectorstores import LanceDB
 from langchain_openai import OpenAIEmbeddings
 import lancedb
 from dotenv import load_dotenv
 
+try:
+    from app.pdf_extraction import lazy_load_pdf
+except ImportError:  # run as a script: python app/ingest.py
+    from pdf_extraction import lazy_load_pdf
+
 load_dotenv()
 
 # Connect to local LanceDB folder
@@ -27,9 +31,6 @@ def hash_text(text: str) -> str:
 
 def ingest_single_pdf(file_path: str):
     """Ingest one PDF file (used by /upload endpoint)."""
-    loader = PyPDFLoader(file_path)
-    documents = loader.load()
-
     # Generate hashes for current chunks
     new_docs = []
     existing_hashes = {
@@ -37,7 +38,7 @@ def ingest_single_pdf(file_path: str):
         for doc in vector_store.similarity_search(" ", k=1000)
     }
 
-    for doc in documents:
+    for doc in lazy_load_pdf(file_path):
         chunk_hash = hash_text(doc.page_content)
         if chunk_hash not in existing_hashes:
             doc.metadata["hash"] = chunk_hash
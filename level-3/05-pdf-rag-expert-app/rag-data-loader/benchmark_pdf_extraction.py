@@ -0,0 +1,93 @@
+# rag-data-loader/benchmark_pdf_extraction.py
+"""Benchmark PyPDFLoader against the parallel extractor on a synthetic PDF.
+
+Builds an N-page text PDF (no extra dependencies), then times:
+  - PyPDFLoader(...).load()        sequential, one core
+  - pdf_extraction.load_pdf(...)   page ranges across a process pool
+  - time to first page from pdf_extraction.lazy_load_pdf(...)
+
+Run from this folder:
+    python benchmark_pdf_extraction.py --pages 500 --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+LINES_PER_PAGE = 45
+
+
+def write_synthetic_pdf(path: str, pages: int):
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for number in range(pages):
+        lines = [
+            f"({'Page %d line %d: shipment routing, demand forecasting and warehouse automation.' % (number + 1, line)}) Tj T*"
+            for line in range(LINES_PER_PAGE)
+        ]
+        stream = ("BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(lines) + " ET").encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for object_id, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % object_id + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f} s")
+    return result, elapsed
+
+
+def main(pages: int, workers: int):
+    # Set before import: the pool size is read when pdf_extraction loads
+    os.environ["PDF_EXTRACTION_WORKERS"] = str(workers)
+    from langchain_community.document_loaders import PyPDFLoader
+    import pdf_extraction
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.pdf")
+        write_synthetic_pdf(path, pages)
+        print(f"{pages} pages, {os.path.getsize(path) / 1e6:.1f} MB, {workers} workers, "
+              f"{pdf_extraction.PAGES_PER_SHARD} pages per shard\n")
+
+        # Warm the pool so worker start-up is not billed to the first run
+        pdf_extraction.get_executor().submit(int).result()
+
+        sequential, sequential_time = timed("PyPDFLoader.load()", lambda: PyPDFLoader(path).load())
+        parallel, parallel_time = timed("load_pdf()", lambda: pdf_extraction.load_pdf(path))
+        timed("lazy_load_pdf() first page", lambda: next(pdf_extraction.lazy_load_pdf(path)))
+
+        assert [doc.page_content for doc in sequential] == [doc.page_content for doc in parallel]
+        assert [doc.metadata["page"] for doc in parallel] == list(range(pages))
+        print(f"\nspeedup {sequential_time / parallel_time:.2f}x, identical text and page order")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    main(args.pages, args.workers)
@@ -0,0 +1,118 @@
+# rag-data-loader/benchmark_semantic_chunking.py
+"""Benchmark pooled vs re-embedded chunk vectors with a fake embedding API.
+
+The fake embedder hashes words into a bag-of-words vector, passes it through a
+fixed random non-linear projection, and sleeps per call and per word, like a
+remote API billed by token. For each mode this reports how many texts and
+words were embedded, how many API calls were made, wall time, and how close
+pooled chunk vectors are to re-embedded ones (cosine similarity, and how
+often both pick the same top chunk for a query sentence). The fake model is
+nearly linear, so its agreement numbers are optimistic; check retrieval on
+real embeddings before relying on pooled vectors.
+
+No OpenAI calls are made. Run from this folder:
+    python benchmark_semantic_chunking.py --documents 200 --sentences 60
+"""
+import argparse
+import hashlib
+import random
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from semantic_chunking import SemanticChunkEmbedder
+
+TOPICS = {
+    "logistics": "shipment route warehouse truck delivery pallet freight carrier dock inventory",
+    "finance": "invoice payment budget revenue margin ledger audit forecast cost account",
+    "weather": "storm rain forecast wind temperature cloud humidity pressure front snow",
+    "health": "patient clinic dose symptom therapy nurse diagnosis recovery allergy trial",
+}
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self, dimensions: int = 256, call_latency: float = 0.05, word_latency: float = 0.00005):
+        self.dimensions = dimensions
+        self.call_latency = call_latency
+        self.word_latency = word_latency
+        self.projection = np.random.default_rng(0).normal(size=(dimensions, dimensions)).astype(np.float32)
+        self.calls = 0
+        self.texts = 0
+        self.words = 0
+
+    def _vector(self, words: list) -> list:
+        counts = np.zeros(self.dimensions, dtype=np.float32)
+        for word in words:
+            counts[int(hashlib.md5(word.strip(".?!").encode()).hexdigest(), 16) % self.dimensions] += 1
+        return np.tanh(self.projection @ (counts / max(len(words), 1))).tolist()
+
+    def embed_documents(self, texts):
+        words = [text.lower().split() for text in texts]
+        self.calls += 1
+        self.texts += len(texts)
+        self.words += sum(map(len, words))
+        time.sleep(self.call_latency + self.word_latency * sum(map(len, words)))
+        return [self._vector(text_words) for text_words in words]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def synthetic_documents(count: int, sentences: int, seed: int = 0):
+    rng = random.Random(seed)
+    documents = []
+    for number in range(count):
+        parts, topic = [], rng.choice(list(TOPICS))
+        for _ in range(sentences):
+            if rng.random() < 0.1:  # change the subject now and then
+                topic = rng.choice(list(TOPICS))
+            words = rng.sample(TOPICS[topic].split(), 6) + rng.sample("the a of and to in for with".split(), 3)
+            rng.shuffle(words)
+            parts.append(" ".join(words).capitalize() + ".")
+        documents.append(Document(page_content=" ".join(parts), metadata={"source": f"doc-{number}.pdf"}))
+    return documents
+
+
+def main(documents: int, sentences: int, batch_size: int):
+    corpus = synthetic_documents(documents, sentences)
+    print(f"{documents} documents x {sentences} sentences, {batch_size} documents per batch\n")
+
+    results = {}
+    for mode in ("pooled", "reembed"):
+        embeddings = FakeEmbeddings()
+        embedder = SemanticChunkEmbedder(embeddings, chunk_vectors=mode)
+        start = time.perf_counter()
+        chunks, vectors = [], []
+        for offset in range(0, len(corpus), batch_size):
+            batch_chunks, batch_vectors = embedder(corpus[offset:offset + batch_size])
+            chunks += batch_chunks
+            vectors += batch_vectors
+        elapsed = time.perf_counter() - start
+        results[mode] = (chunks, np.asarray(vectors))
+        print(f"{mode:<8} {len(chunks):6d} chunks  {embeddings.texts:7d} texts  {embeddings.words:8d} words embedded  "
+              f"{embeddings.calls:4d} calls  {elapsed:7.2f} s")
+
+    pooled_chunks, pooled = results["pooled"]
+    _, reembedded = results["reembed"]
+    reembedded = reembedded / np.linalg.norm(reembedded, axis=1, keepdims=True)
+    similarity = np.einsum("ij,ij->i", pooled, reembedded)
+
+    # Query with random sentences and compare which chunk each index ranks first
+    rng = random.Random(1)
+    queries = [rng.choice(chunk.page_content.split(". ")) for chunk in rng.sample(pooled_chunks, 200)]
+    query_vectors = np.asarray(FakeEmbeddings(call_latency=0, word_latency=0).embed_documents(queries))
+    same_top = np.mean(np.argmax(query_vectors @ pooled.T, axis=1) == np.argmax(query_vectors @ reembedded.T, axis=1))
+
+    print(f"\npooled vs re-embedded chunk vectors: mean cosine {similarity.mean():.3f} "
+          f"(min {similarity.min():.3f}), same top-1 chunk for {same_top:.0%} of {len(queries)} queries")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--sentences", type=int, default=60)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+    main(args.documents, args.sentences, args.batch_size)
@@ -0,0 +1,133 @@
+# rag-data-loader/pdf_extraction.py
+"""Parallel page-level PDF text extraction.
+
+PyPDFLoader extracts pages one after another on a single core. Here a PDF's
+pages are split into ranges, each range is extracted in a worker process, and
+pages come back as Documents in page order with PyPDFLoader's metadata
+({"source": ..., "page": ...}).
+
+Workers are always started with "spawn", never fork: forking a process that
+already runs threads (a uvicorn worker, Streamlit) can deadlock the child on a
+lock another thread held. Scripts that use this module must therefore keep
+their top-level work under `if __name__ == "__main__":`, since spawned workers
+re-import the main module.
+"""
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+PAGES_PER_SHARD = int(os.getenv("PDF_PAGES_PER_SHARD", "16"))
+MAX_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+
+
+@lru_cache()
+def get_executor() -> Executor:
+    # One pool per process, shared by every extraction
+    return ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+@lru_cache(maxsize=2)
+def _open(path: str, mtime: float) -> PdfReader:
+    # Opening re-reads the file and its page tree, so each process keeps the
+    # last readers around for the other shards of the same file
+    return PdfReader(path)
+
+
+def _extract_range(path: str, mtime: float, start: int, stop: int) -> List[Optional[str]]:
+    """Extract pages [start, stop); a page that fails to parse comes back as None."""
+    reader = _open(path, mtime)
+    texts = []
+    for number in range(start, stop):
+        try:
+            texts.append(reader.pages[number].extract_text())
+        except Exception as error:
+            print(f"⚠️ Skipping text of page {number} in {path}: {error}")
+            texts.append(None)
+    return texts
+
+
+def _to_documents(texts: List[Optional[str]], source: str, start: int) -> Iterator[Document]:
+    for offset, text in enumerate(texts):
+        metadata = {"source": source, "page": start + offset}
+        if text is None:
+            metadata["extraction_error"] = True
+        yield Document(page_content=text or "", metadata=metadata)
+
+
+def lazy_load_pdf(path: str, source: Optional[str] = None, pages_per_shard: int = PAGES_PER_SHARD) -> Iterator[Document]:
+    """Yield one Document per page, in order, as soon as its page range is extracted."""
+    source = source or path
+    mtime = os.path.getmtime(path)
+    num_pages = len(_open(path, mtime).pages)
+    shards = [(start, min(start + pages_per_shard, num_pages)) for start in range(0, num_pages, pages_per_shard)]
+
+    # Not worth a round trip to the pool for small documents
+    if len(shards) <= 1 or MAX_WORKERS <= 1:
+        for start, stop in shards:
+            yield from _to_documents(_extract_range(path, mtime, start, stop), source, start)
+        return
+
+    futures = [get_executor().submit(_extract_range, path, mtime, start, stop) for start, stop in shards]
+    try:
+        for (start, _), future in zip(shards, futures):
+            yield from _to_documents(future.result(), source, start)
+    finally:
+        # The caller may stop early; don't leave the remaining shards running
+        for future in futures:
+            future.cancel()
+
+
+def load_pdf(path: str, source: Optional[str] = None) -> List[Document]:
+    return list(lazy_load_pdf(path, source))
+
+
+def _load_with(loader_cls, path: str) -> List[Document]:
+    return loader_cls(path).load()
+
+
+def lazy_load_pdf_files(paths: Iterable[str], loader_cls=None) -> Iterator[Document]:
+    """Yield Documents for each PDF in paths, file by file in the given order.
+
+    By default pages are extracted with lazy_load_pdf. A LangChain loader class
+    (e.g. UnstructuredPDFLoader) can be passed instead; its files are then
+    parsed in parallel, one file per worker, with only a few files in flight
+    so memory does not grow with the number of files.
+    """
+    if loader_cls is None:
+        for path in paths:
+            yield from lazy_load_pdf(path)
+        return
+
+    paths = iter(paths)
+    pending = deque(
+        (path, get_executor().submit(_load_with, loader_cls, path))
+        for path in islice(paths, MAX_WORKERS * 2)
+    )
+    try:
+        while pending:
+            path, future = pending.popleft()
+            for next_path in islice(paths, 1):
+                pending.append((next_path, get_executor().submit(_load_with, loader_cls, next_path)))
+            try:
+                documents = future.result()
+            except Exception as error:
+                print(f"⚠️ Skipping {path}: {error}")
+                continue
+            yield from documents
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def lazy_load_pdf_directory(directory: str, glob: str = "**/*.pdf", loader_cls=None) -> Iterator[Document]:
+    """Yield Documents for every PDF under directory, in path order (see lazy_load_pdf_files)."""
+    paths = sorted(str(path) for path in Path(directory).glob(glob))
+    yield from lazy_load_pdf_files(paths, loader_cls)
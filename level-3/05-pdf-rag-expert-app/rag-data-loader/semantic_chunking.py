@@ -0,0 +1,99 @@
+# rag-data-loader/semantic_chunking.py
+"""Semantic chunking that embeds every sentence exactly once.
+
+SemanticChunker embeds each sentence to find breakpoints, and the chunks it
+returns are then embedded again when they are stored. Here sentence
+embeddings are requested in large batches across a whole batch of documents,
+breakpoints come from one vectorized cosine-distance pass per document, and
+chunk vectors can be pooled from the sentence vectors already in hand instead
+of paying for a second round of embeddings.
+"""
+import re
+from typing import List, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.?!])\s+")
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class SemanticChunkEmbedder:
+    """Splits documents at semantic breakpoints and returns (chunks, chunk vectors).
+
+    chunk_vectors="pooled" averages the sentence vectors of each chunk (no extra
+    API calls); "reembed" embeds the chunk texts, as PGVector.from_documents would.
+    Breakpoints follow SemanticChunker's defaults: each sentence is compared
+    with its neighbours (buffer_size on each side) and the document is split
+    where the distance to the next sentence is above the given percentile.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        chunk_vectors: str = "pooled",
+        breakpoint_percentile: float = 95,
+        buffer_size: int = 1,
+        embed_batch_size: int = 512,
+    ):
+        if chunk_vectors not in ("pooled", "reembed"):
+            raise ValueError(f"chunk_vectors must be 'pooled' or 'reembed', not {chunk_vectors!r}")
+        self.embeddings = embeddings
+        self.chunk_vectors = chunk_vectors
+        self.breakpoint_percentile = breakpoint_percentile
+        self.buffer_size = buffer_size
+        self.embed_batch_size = embed_batch_size
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), self.embed_batch_size):
+            vectors.extend(self.embeddings.embed_documents(texts[start:start + self.embed_batch_size]))
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _breakpoints(self, vectors: np.ndarray) -> np.ndarray:
+        """Indices i where a chunk ends after sentence i."""
+        if len(vectors) < 2:
+            return np.empty(0, dtype=int)
+        # Windowed sentence vectors: the mean of each sentence and its neighbours
+        padded = np.pad(vectors, ((self.buffer_size, self.buffer_size), (0, 0)))
+        sums = np.cumsum(np.vstack([np.zeros((1, vectors.shape[1]), dtype=vectors.dtype), padded]), axis=0)
+        width = 2 * self.buffer_size + 1
+        windows = _normalize(sums[width:] - sums[:-width])
+        distances = 1 - np.einsum("ij,ij->i", windows[:-1], windows[1:])
+        threshold = np.percentile(distances, self.breakpoint_percentile)
+        return np.flatnonzero(distances > threshold)
+
+    def __call__(self, documents: List[Document]) -> Tuple[List[Document], List[List[float]]]:
+        sentences_per_doc = [
+            [sentence for sentence in SENTENCE_SPLIT.split(document.page_content) if sentence.strip()]
+            for document in documents
+        ]
+        all_sentences = [sentence for sentences in sentences_per_doc for sentence in sentences]
+        if not all_sentences:
+            return [], []
+        sentence_vectors = _normalize(self._embed(all_sentences))
+
+        chunks, pooled = [], []
+        offset = 0
+        for document, sentences in zip(documents, sentences_per_doc):
+            vectors = sentence_vectors[offset:offset + len(sentences)]
+            offset += len(sentences)
+            if not sentences:
+                continue  # empty or scanned page, or a page that failed to extract
+            bounds = [0, *(self._breakpoints(vectors) + 1), len(sentences)]
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                if start == stop:
+                    continue
+                chunks.append(Document(page_content=" ".join(sentences[start:stop]), metadata=dict(document.metadata)))
+                pooled.append(vectors[start:stop].mean(axis=0))
+
+        if self.chunk_vectors == "reembed":
+            chunk_vectors = self._embed([chunk.page_content for chunk in chunks])
+        else:
+            chunk_vectors = _normalize(np.asarray(pooled))
+        return chunks, chunk_vectors.tolist()
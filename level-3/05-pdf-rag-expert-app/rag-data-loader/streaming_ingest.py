@@ -0,0 +1,167 @@
+# rag-data-loader/streaming_ingest.py
+"""Streaming, checkpointed ingestion into PGVector.
+
+Documents are read lazily and processed in bounded batches: each batch is
+chunked, embedded and bulk-inserted with COPY in the same transaction as a
+checkpoint row. Memory is bounded by the batch size rather than the corpus,
+and a crash resumes right after the last committed batch.
+"""
+import json
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_community.vectorstores.pgvector import PGVector
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from pdf_extraction import lazy_load_pdf_files
+
+# (chunks, one vector per chunk) for a batch of loaded documents
+BatchProcessor = Callable[[List[Document]], Tuple[List[Document], List[List[float]]]]
+
+
+@dataclass
+class Checkpoint:
+    """Position of the last committed document: its source file and index within that file."""
+
+    source: str
+    position: int
+    batches: int
+    chunks: int
+
+
+class PGVectorCopyWriter:
+    """Writes chunks into a PGVector collection with COPY, one transaction per batch."""
+
+    def __init__(self, connection_string: str, collection_name: str, embeddings: Embeddings):
+        # PGVector creates the vector extension, its tables and the collection row
+        self.store = PGVector(
+            connection_string=connection_string,
+            collection_name=collection_name,
+            embedding_function=embeddings,
+        )
+        self.collection_name = collection_name
+        # COPY needs psycopg 3 (the postgresql+psycopg:// driver)
+        self.engine = create_engine(connection_string)
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS rag_ingest_checkpoint ("
+                " collection_name TEXT PRIMARY KEY,"
+                " source TEXT NOT NULL,"
+                " position INTEGER NOT NULL,"
+                " batches INTEGER NOT NULL,"
+                " chunks INTEGER NOT NULL,"
+                " updated_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+            ))
+        self.collection_id = self._collection_id()
+
+    def _collection_id(self) -> str:
+        with Session(self.engine) as session:
+            return str(self.store.get_collection(session).uuid)
+
+    def load_checkpoint(self) -> Optional[Checkpoint]:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text("SELECT source, position, batches, chunks FROM rag_ingest_checkpoint WHERE collection_name = :name"),
+                {"name": self.collection_name},
+            ).first()
+        return Checkpoint(*row) if row else None
+
+    def reset(self):
+        """Drop the collection's embeddings and checkpoint to ingest from scratch."""
+        self.store.delete_collection()
+        self.store.create_collection()
+        self.collection_id = self._collection_id()
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM rag_ingest_checkpoint WHERE collection_name = :name"), {"name": self.collection_name})
+
+    def write_batch(self, chunks: List[Document], vectors: List[List[float]], checkpoint: Checkpoint):
+        with self.engine.begin() as conn:
+            cursor = conn.connection.cursor()
+            with cursor.copy(
+                "COPY langchain_pg_embedding (uuid, collection_id, embedding, document, cmetadata, custom_id) FROM STDIN"
+            ) as copy:
+                for chunk, vector in zip(chunks, vectors):
+                    row_id = str(uuid.uuid4())
+                    copy.write_row((
+                        row_id,
+                        self.collection_id,
+                        "[" + ",".join(map(str, vector)) + "]",
+                        chunk.page_content.replace("\x00", ""),  # Postgres text cannot hold NUL
+                        json.dumps(chunk.metadata),
+                        row_id,
+                    ))
+            conn.execute(
+                text(
+                    "INSERT INTO rag_ingest_checkpoint (collection_name, source, position, batches, chunks)"
+                    " VALUES (:name, :source, :position, :batches, :chunks)"
+                    " ON CONFLICT (collection_name) DO UPDATE SET source = EXCLUDED.source,"
+                    " position = EXCLUDED.position, batches = EXCLUDED.batches,"
+                    " chunks = EXCLUDED.chunks, updated_at = now()"
+                ),
+                {"name": self.collection_name, **checkpoint.__dict__},
+            )
+
+
+def _with_positions(documents: Iterable[Document]) -> Iterator[Tuple[Document, str, int]]:
+    # Documents arrive file by file; number them within their source file
+    source, position = None, -1
+    for document in documents:
+        if document.metadata.get("source") != source:
+            source, position = document.metadata.get("source"), -1
+        position += 1
+        yield document, source, position
+
+
+def _batched(items: Iterable, batch_size: int, max_batch_chars: int) -> Iterator[list]:
+    batch, chars = [], 0
+    for item in items:
+        batch.append(item)
+        chars += len(item[0].page_content)
+        if len(batch) >= batch_size or chars >= max_batch_chars:
+            yield batch
+            batch, chars = [], 0
+    if batch:
+        yield batch
+
+
+def stream_ingest(
+    directory: str,
+    writer: PGVectorCopyWriter,
+    process_batch: BatchProcessor,
+    glob: str = "**/*.pdf",
+    loader_cls=None,
+    batch_size: int = 32,
+    max_batch_chars: int = 2_000_000,
+) -> Checkpoint:
+    """Load, chunk, embed and store every PDF under directory, resuming from the last checkpoint."""
+    checkpoint = writer.load_checkpoint()
+    paths = sorted(str(path) for path in Path(directory).glob(glob))
+    if checkpoint is not None:
+        # Paths are processed in sorted order, so earlier files are already committed
+        paths = [path for path in paths if path >= checkpoint.source]
+        print(f"⏩ Resuming after {checkpoint.source} #{checkpoint.position} ({checkpoint.chunks} chunks committed)")
+    else:
+        checkpoint = Checkpoint(source="", position=-1, batches=0, chunks=0)
+
+    committed = (checkpoint.source, checkpoint.position)
+    documents = (
+        item for item in _with_positions(lazy_load_pdf_files(paths, loader_cls))
+        if (item[1], item[2]) > committed
+    )
+    for batch in _batched(documents, batch_size, max_batch_chars):
+        chunks, vectors = process_batch([document for document, _, _ in batch])
+        _, source, position = batch[-1]
+        checkpoint = Checkpoint(
+            source=source,
+            position=position,
+            batches=checkpoint.batches + 1,
+            chunks=checkpoint.chunks + len(chunks),
+        )
+        writer.write_batch(chunks, vectors, checkpoint)
+        print(f"💾 Batch {checkpoint.batches}: {len(batch)} documents → {len(chunks)} chunks (up to {source} #{position})")
+    return checkpoint